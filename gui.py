@@ -1096,7 +1096,7 @@ class PhoneAgentGUI:
         # 导入必要模块
         from phone_agent.agent import PhoneAgent, AgentConfig
         from phone_agent.model import ModelConfig
-        from phone_agent.device_factory import DeviceType, set_device_type
+        from phone_agent.device_factory import DeviceFactory, DeviceType
         # 从main.py导入检查函数
         import main
         
@@ -1119,7 +1119,8 @@ class PhoneAgentGUI:
             else:
                 device_type = DeviceType.HDC
                 device_type_str = "hdc"
-            set_device_type(device_type)
+            # 每个代理使用独立的设备后端，不修改全局设备类型
+            device_factory = DeviceFactory(device_type) if device_type else None
             safe_output(f"🔗 设备类型: {device_type_str.upper()}\n")
             
             # 解析设备ID（必须在检查系统要求之前）
@@ -1213,7 +1214,8 @@ class PhoneAgentGUI:
             safe_output("🚀 开始执行任务...\n")
             agent = PhoneAgent(
                 model_config=model_config,
-                agent_config=agent_config
+                agent_config=agent_config,
+                device_factory=device_factory
             )
             
             # 设置ADB/HDC路径（如果需要）
@@ -1310,6 +1312,11 @@ class PhoneAgentGUI:
                             safe_output("⚠️ 达到最大步数限制\n")
                             
                     finally:
+                        # 恢复输入法等设备状态（包括用户停止和异常的情况）
+                        try:
+                            agent.reset()
+                        except Exception as e:
+                            safe_output(f"⚠️ 恢复设备状态失败: {e}\n")
                         # 恢复原始输出
                         sys.stdout = original_stdout
                         
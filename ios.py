@@ -20,11 +20,10 @@ import subprocess
 import sys
 from urllib.parse import urlparse
 
-from openai import OpenAI
-
 from phone_agent.agent_ios import IOSAgentConfig, IOSPhoneAgent
 from phone_agent.config.apps_ios import list_supported_apps
 from phone_agent.model import ModelConfig
+from phone_agent.model.transport import get_openai_client
 from phone_agent.xctest import XCTestConnection, list_devices
 
 
@@ -185,8 +184,8 @@ def check_model_api(base_url: str, api_key: str, model_name: str) -> bool:
         # Parse the URL to get host and port
         parsed = urlparse(base_url)
 
-        # Create OpenAI client
-        client = OpenAI(base_url=base_url, api_key=api_key, timeout=10.0)
+        # Shared pooled client: the connection opened here is reused by the agent
+        client = get_openai_client(base_url, api_key).with_options(timeout=10.0)
 
         # Try to list models (this tests connectivity)
         models_response = client.models.list()
@@ -6,7 +6,8 @@ Usage:
     python main.py [OPTIONS]
 
 Environment Variables:
-    PHONE_AGENT_BASE_URL: Model API base URL (default: http://localhost:8000/v1)
+    PHONE_AGENT_BASE_URL: Model API base URL, comma-separated for several replicas
+        (default: http://localhost:8000/v1)
     PHONE_AGENT_MODEL: Model name (default: autoglm-phone-9b)
     PHONE_AGENT_API_KEY: API key for model authentication (default: EMPTY)
     PHONE_AGENT_MAX_STEPS: Maximum steps per task (default: 100)
@@ -20,7 +21,7 @@ import subprocess
 import sys
 from urllib.parse import urlparse
 
-from openai import OpenAI
+from openai import NotFoundError
 
 from phone_agent import PhoneAgent
 from phone_agent.agent import AgentConfig
@@ -29,7 +30,10 @@ from phone_agent.config.apps import list_supported_apps
 from phone_agent.config.apps_harmonyos import list_supported_apps as list_harmonyos_apps
 from phone_agent.config.apps_ios import list_supported_apps as list_ios_apps
 from phone_agent.device_factory import DeviceType, get_device_factory, set_device_type
-from phone_agent.model import ModelConfig
+from phone_agent.model import AdmissionConfig, ModelConfig
+from phone_agent.model.router import parse_endpoints
+from phone_agent.model.transport import get_openai_client
+from phone_agent.telemetry import TaskTrace, write_chrome_trace
 from phone_agent.xctest import XCTestConnection
 from phone_agent.xctest import list_devices as list_ios_devices
 
@@ -290,28 +294,33 @@ def check_model_api(base_url: str, model_name: str, api_key: str = "EMPTY") -> b
 
     all_passed = True
 
-    # Check 1: Network connectivity using chat API
+    # Check 1: Network connectivity (models list, chat API as fallback)
     print(f"1. Checking API connectivity ({base_url})...", end=" ")
     try:
-        # Create OpenAI client
-        client = OpenAI(base_url=base_url, api_key=api_key, timeout=30.0)
-
-        # Use chat completion to test connectivity (more universally supported than /models)
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=[{"role": "user", "content": "Hi"}],
-            max_tokens=5,
-            temperature=0.0,
-            stream=False,
-        )
+        # Shared pooled client: the connection opened here is reused by the agent
+        client = get_openai_client(base_url, api_key).with_options(timeout=30.0)
 
-        # Check if we got a valid response
-        if response.choices and len(response.choices) > 0:
+        try:
+            # Listing models is free and needs no inference
+            client.models.list()
             print("✅ OK")
-        else:
-            print("❌ FAILED")
-            print("   Error: Received empty response from API")
-            all_passed = False
+        except NotFoundError:
+            # Some servers lack /models; fall back to a minimal chat completion
+            response = client.chat.completions.create(
+                model=model_name,
+                messages=[{"role": "user", "content": "Hi"}],
+                max_tokens=1,
+                temperature=0.0,
+                stream=False,
+            )
+
+            # Check if we got a valid response
+            if response.choices and len(response.choices) > 0:
+                print("✅ OK")
+            else:
+                print("❌ FAILED")
+                print("   Error: Received empty response from API")
+                all_passed = False
 
     except Exception as e:
         print("❌ FAILED")
@@ -383,6 +392,12 @@ Examples:
     # List supported apps
     python main.py --list-apps
 
+    # Run a JSONL task queue on every connected ADB/HDC device
+    python main.py --fleet tasks.jsonl --fleet-output results.jsonl
+
+    # Time each step stage and write a Chrome trace (open in ui.perfetto.dev)
+    python main.py --trace trace.json "Open Settings"
+
     # iOS specific examples
     # Run with iOS device
     python main.py --device-type ios "Open Safari and search for iPhone tips"
@@ -406,7 +421,7 @@ Examples:
         "--base-url",
         type=str,
         default=os.getenv("PHONE_AGENT_BASE_URL", "http://localhost:8000/v1"),
-        help="Model API base URL",
+        help="Model API base URL; comma-separate several replicas to load-balance",
     )
 
     parser.add_argument(
@@ -430,6 +445,81 @@ Examples:
         help="Maximum steps per task",
     )
 
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Send a backup model request when the first token is unusually late",
+    )
+
+    parser.add_argument(
+        "--prefix-cache",
+        action="store_true",
+        help="Lay out prompts so vLLM/SGLang prefix caching can reuse them",
+    )
+
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=None,
+        help="Max in-flight model requests across all agents (default: unlimited)",
+    )
+
+    parser.add_argument(
+        "--max-rps",
+        type=float,
+        default=None,
+        help="Max model requests per second across all agents (default: unlimited)",
+    )
+
+    parser.add_argument(
+        "--max-tpm",
+        type=int,
+        default=None,
+        help="Max estimated model tokens per minute across all agents (default: unlimited)",
+    )
+
+    parser.add_argument(
+        "--response-cache",
+        action="store_true",
+        help="Reuse model responses for screens already seen in the same task",
+    )
+
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Record successful runs as trajectories for --replay (ADB/HDC only)",
+    )
+
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Replay a recorded trajectory without the model while screens match",
+    )
+
+    parser.add_argument(
+        "--fleet",
+        type=str,
+        metavar="TASKS",
+        help="Run tasks from a JSONL file ('-' for stdin) across all ADB/HDC devices",
+    )
+
+    parser.add_argument(
+        "--fleet-output",
+        type=str,
+        default="fleet_results.jsonl",
+        metavar="PATH",
+        help="JSONL file for per-task fleet results ('-' for stdout, "
+        "default: fleet_results.jsonl)",
+    )
+
+    parser.add_argument(
+        "--trace",
+        type=str,
+        metavar="PATH",
+        help="Write per-stage step timings as Chrome trace JSON and print a "
+        "summary per task (ADB/HDC only)",
+    )
+
     # Device options
     parser.add_argument(
         "--device-id",
@@ -469,6 +559,12 @@ Examples:
         help="Enable TCP/IP debugging on USB device (default port: 5555)",
     )
 
+    parser.add_argument(
+        "--scrcpy",
+        action="store_true",
+        help="Capture screenshots from a persistent scrcpy stream (ADB only, requires PyAV)",
+    )
+
     # iOS specific options
     parser.add_argument(
         "--wda-url",
@@ -681,6 +777,71 @@ def handle_device_commands(args) -> bool:
     return False
 
 
+def run_fleet(args, model_config: ModelConfig, agent_config: AgentConfig) -> None:
+    """
+    Run a JSONL task queue across every connected ADB and HDC device.
+
+    Args:
+        args: Parsed command line arguments.
+        model_config: Model configuration shared by all agents.
+        agent_config: Template agent configuration for each device.
+    """
+    from phone_agent.fleet import FleetRunner, discover_devices, read_tasks
+
+    devices = discover_devices()
+    if args.device_id:
+        devices = [d for d in devices if d.device_id == args.device_id]
+    if not devices:
+        print("❌ No ready ADB or HDC devices found for the fleet")
+        sys.exit(1)
+
+    print("=" * 50)
+    print(f"Fleet: {len(devices)} device(s)")
+    for device in devices:
+        print(f"  - {device.device_id} ({device.device_type.value.upper()})")
+    print(f"Results: {args.fleet_output}")
+    print("=" * 50)
+
+    task_stream = sys.stdin if args.fleet == "-" else open(args.fleet, encoding="utf-8")
+    output = (
+        sys.stdout
+        if args.fleet_output == "-"
+        else open(args.fleet_output, "a", encoding="utf-8")
+    )
+    try:
+        runner = FleetRunner(devices, model_config, agent_config, output)
+        results = runner.run(read_tasks(task_stream))
+    finally:
+        if task_stream is not sys.stdin:
+            task_stream.close()
+        if output is not sys.stdout:
+            output.close()
+
+    if args.trace:
+        write_chrome_trace(runner.traces, args.trace)
+        print(f"Trace: {args.trace}")
+
+    statuses: dict[str, int] = {}
+    for result in results:
+        statuses[result.status] = statuses.get(result.status, 0) + 1
+    summary = ", ".join(f"{k}: {v}" for k, v in sorted(statuses.items())) or "none"
+    print(f"\nFleet finished {len(results)} task(s) ({summary})")
+
+
+def report_trace(traces: list[TaskTrace], path: str) -> None:
+    """
+    Print the stage summary of the last task and write all traces to a file.
+
+    Args:
+        traces: Task traces of this session, oldest first.
+        path: Chrome trace JSON output path.
+    """
+    print("\nStage timings:")
+    print(traces[-1].summary())
+    write_chrome_trace(traces, path)
+    print(f"Trace: {path}\n")
+
+
 def main():
     """Main entry point."""
     args = parse_args()
@@ -741,18 +902,32 @@ def main():
         sys.exit(1)
 
     # Check model API connectivity and model availability
-    if not check_model_api(args.base_url, args.model, args.apikey):
-        sys.exit(1)
+    endpoints = parse_endpoints(args.base_url, args.apikey)
+    for endpoint in endpoints:
+        if not check_model_api(endpoint.base_url, args.model, args.apikey):
+            sys.exit(1)
 
     # Create configurations and agent based on device type
     model_config = ModelConfig(
-        base_url=args.base_url,
+        base_url=endpoints[0].base_url,
         model_name=args.model,
         api_key=args.apikey,
         lang=args.lang,
+        endpoints=endpoints if len(endpoints) > 1 else [],
+        hedge=args.hedge,
+        response_cache=args.response_cache,
+        admission=AdmissionConfig(
+            max_concurrency=args.max_concurrency or 0,
+            rps=args.max_rps or 0.0,
+            tpm=args.max_tpm or 0,
+        ),
     )
 
     if device_type == DeviceType.IOS:
+        if args.fleet or args.trace:
+            print("❌ --fleet and --trace support ADB and HDC devices only")
+            sys.exit(1)
+
         # Create iOS agent
         agent_config = IOSAgentConfig(
             max_steps=args.max_steps,
@@ -760,6 +935,7 @@ def main():
             device_id=args.device_id,
             verbose=not args.quiet,
             lang=args.lang,
+            prefix_cache=args.prefix_cache,
         )
 
         agent = IOSPhoneAgent(
@@ -773,8 +949,16 @@ def main():
             device_id=args.device_id,
             verbose=not args.quiet,
             lang=args.lang,
+            prefix_cache=args.prefix_cache,
+            use_scrcpy=args.scrcpy,
+            record_trajectory=args.record,
+            replay=args.replay,
         )
 
+        if args.fleet:
+            run_fleet(args, model_config, agent_config)
+            return
+
         agent = PhoneAgent(
             model_config=model_config,
             agent_config=agent_config,
@@ -788,7 +972,7 @@ def main():
         print("Phone Agent - AI-powered phone automation")
     print("=" * 50)
     print(f"Model: {model_config.model_name}")
-    print(f"Base URL: {model_config.base_url}")
+    print(f"Base URL: {', '.join(e.base_url for e in model_config.get_endpoints())}")
     print(f"Max Steps: {agent_config.max_steps}")
     print(f"Language: {agent_config.lang}")
     print(f"Device Type: {args.device_type.upper()}")
@@ -822,9 +1006,12 @@ def main():
         print(f"\nTask: {args.task}\n")
         result = agent.run(args.task)
         print(f"\nResult: {result}")
+        if args.trace:
+            report_trace([agent.trace], args.trace)
     else:
         # Interactive mode
         print("\nEntering interactive mode. Type 'quit' to exit.\n")
+        traces = []
 
         while True:
             try:
@@ -840,6 +1027,9 @@ def main():
                 print()
                 result = agent.run(task)
                 print(f"\nResult: {result}\n")
+                if args.trace:
+                    traces.append(agent.trace)
+                    report_trace(traces, args.trace)
                 agent.reset()
 
             except KeyboardInterrupt:
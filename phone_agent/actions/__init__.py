@@ -1,5 +1,12 @@
 """Action handling module for Phone Agent."""
 
 from phone_agent.actions.handler import ActionHandler, ActionResult
+from phone_agent.actions.handler_async import AsyncActionHandler
+from phone_agent.actions.keyboard import KeyboardSession
 
-__all__ = ["ActionHandler", "ActionResult"]
+__all__ = [
+    "ActionHandler",
+    "ActionResult",
+    "AsyncActionHandler",
+    "KeyboardSession",
+]
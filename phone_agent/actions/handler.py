@@ -7,8 +7,10 @@ import time
 from dataclasses import dataclass
 from typing import Any, Callable
 
+from phone_agent.actions.keyboard import KeyboardSession
 from phone_agent.config.timing import TIMING_CONFIG
-from phone_agent.device_factory import get_device_factory
+from phone_agent.device_factory import DeviceFactory, DeviceType, get_device_factory
+from phone_agent.text_chunks import PASTE_THRESHOLD
 
 
 @dataclass
@@ -30,6 +32,7 @@ class ActionHandler:
         confirmation_callback: Optional callback for sensitive action confirmation.
             Should return True to proceed, False to cancel.
         takeover_callback: Optional callback for takeover requests (login, captcha).
+        device_factory: Device backend to act on. Defaults to the global factory.
     """
 
     def __init__(
@@ -37,10 +40,17 @@ class ActionHandler:
         device_id: str | None = None,
         confirmation_callback: Callable[[str], bool] | None = None,
         takeover_callback: Callable[[str], None] | None = None,
+        device_factory: DeviceFactory | None = None,
     ):
         self.device_id = device_id
         self.confirmation_callback = confirmation_callback or self._default_confirmation
         self.takeover_callback = takeover_callback or self._default_takeover
+        self.device_factory = device_factory or get_device_factory()
+        self.keyboard = KeyboardSession(device_id, self.device_factory)
+
+    def reset(self) -> None:
+        """Release per-task device state, restoring the original keyboard."""
+        self.keyboard.restore()
 
     def execute(
         self, action: dict[str, Any], screen_width: int, screen_height: int
@@ -121,7 +131,7 @@ class ActionHandler:
         if not app_name:
             return ActionResult(False, False, "No app name specified")
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         success = device_factory.launch_app(app_name, self.device_id)
         if success:
             return ActionResult(True, False)
@@ -144,7 +154,7 @@ class ActionHandler:
                     message="User cancelled sensitive operation",
                 )
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.tap(x, y, self.device_id)
         return ActionResult(True, False)
 
@@ -152,23 +162,26 @@ class ActionHandler:
         """Handle text input action."""
         text = action.get("text", "")
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
+
+        min_wait = TIMING_CONFIG.stability.min_text_wait
 
-        # Switch to ADB keyboard
-        original_ime = device_factory.detect_and_set_adb_keyboard(self.device_id)
-        time.sleep(TIMING_CONFIG.action.keyboard_switch_delay)
+        # Switch to ADB keyboard once; it stays active until the task ends
+        self.keyboard.ensure_active()
 
         # Clear existing text and type new text
         device_factory.clear_text(self.device_id)
-        time.sleep(TIMING_CONFIG.action.text_clear_delay)
+        device_factory.wait_for_screen(
+            self.device_id, TIMING_CONFIG.action.text_clear_delay, min_wait
+        )
 
-        # Handle multiline text by splitting on newlines
-        device_factory.type_text(text, self.device_id)
-        time.sleep(TIMING_CONFIG.action.text_input_delay)
-
-        # Restore original keyboard
-        device_factory.restore_keyboard(original_ime, self.device_id)
-        time.sleep(TIMING_CONFIG.action.keyboard_restore_delay)
+        if len(text) >= PASTE_THRESHOLD:
+            device_factory.paste_text(text, self.device_id)
+        else:
+            device_factory.type_text(text, self.device_id)
+        device_factory.wait_for_screen(
+            self.device_id, TIMING_CONFIG.action.text_input_delay, min_wait
+        )
 
         return ActionResult(True, False)
 
@@ -183,19 +196,19 @@ class ActionHandler:
         start_x, start_y = self._convert_relative_to_absolute(start, width, height)
         end_x, end_y = self._convert_relative_to_absolute(end, width, height)
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.swipe(start_x, start_y, end_x, end_y, device_id=self.device_id)
         return ActionResult(True, False)
 
     def _handle_back(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle back button action."""
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.back(self.device_id)
         return ActionResult(True, False)
 
     def _handle_home(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle home button action."""
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.home(self.device_id)
         return ActionResult(True, False)
 
@@ -206,7 +219,7 @@ class ActionHandler:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.double_tap(x, y, self.device_id)
         return ActionResult(True, False)
 
@@ -217,7 +230,7 @@ class ActionHandler:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
         device_factory.long_press(x, y, device_id=self.device_id)
         return ActionResult(True, False)
 
@@ -235,6 +248,12 @@ class ActionHandler:
     def _handle_takeover(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle takeover request (login, captcha, etc.)."""
         message = action.get("message", "User intervention required")
+        if self.keyboard.is_active:
+            # Give the user their own keyboard back for logins and captchas
+            self.keyboard.restore()
+            self.device_factory.wait_for_screen(
+                self.device_id, TIMING_CONFIG.action.keyboard_restore_delay
+            )
         self.takeover_callback(message)
         return ActionResult(True, False)
 
@@ -257,10 +276,9 @@ class ActionHandler:
 
     def _send_keyevent(self, keycode: str) -> None:
         """Send a keyevent to the device."""
-        from phone_agent.device_factory import DeviceType, get_device_factory
         from phone_agent.hdc.connection import _run_hdc_command
 
-        device_factory = get_device_factory()
+        device_factory = self.device_factory
 
         # Handle HDC devices with HarmonyOS-specific keyEvent command
         if device_factory.device_type == DeviceType.HDC:
@@ -310,12 +328,9 @@ class ActionHandler:
                     )
         else:
             # ADB devices use standard input keyevent command
-            cmd_prefix = ["adb", "-s", self.device_id] if self.device_id else ["adb"]
-            subprocess.run(
-                cmd_prefix + ["shell", "input", "keyevent", keycode],
-                capture_output=True,
-                text=True,
-            )
+            from phone_agent.adb.shell import run_shell
+
+            run_shell(["input", "keyevent", keycode], self.device_id)
 
     @staticmethod
     def _default_confirmation(message: str) -> bool:
@@ -0,0 +1,259 @@
+"""Action handler for asyncio agents."""
+
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable
+
+from phone_agent.actions.handler import ActionResult
+from phone_agent.actions.keyboard import AsyncKeyboardSession
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.device_factory_async import AsyncDeviceFactory
+from phone_agent.text_chunks import PASTE_THRESHOLD
+
+# Callbacks may be plain functions or coroutine functions
+ConfirmationCallback = Callable[[str], bool | Awaitable[bool]]
+TakeoverCallback = Callable[[str], None | Awaitable[None]]
+
+
+class AsyncActionHandler:
+    """
+    Executes model actions through an AsyncDeviceFactory.
+
+    Args:
+        device_factory: Async device backend to act on (AsyncDeviceFactory or
+            AsyncWDAClient).
+        device_id: Optional device ID for multi-device setups.
+        confirmation_callback: Optional callback (sync or async) for sensitive
+            action confirmation. Should return True to proceed.
+        takeover_callback: Optional callback (sync or async) for takeover
+            requests (login, captcha).
+    """
+
+    def __init__(
+        self,
+        device_factory: AsyncDeviceFactory,
+        device_id: str | None = None,
+        confirmation_callback: ConfirmationCallback | None = None,
+        takeover_callback: TakeoverCallback | None = None,
+    ):
+        self.device_factory = device_factory
+        self.device_id = device_id
+        self.confirmation_callback = confirmation_callback or self._default_confirmation
+        self.takeover_callback = takeover_callback or self._default_takeover
+        self.keyboard = AsyncKeyboardSession(device_id, device_factory)
+
+    async def reset(self) -> None:
+        """Release per-task device state, restoring the original keyboard."""
+        await self.keyboard.restore()
+
+    async def execute(
+        self, action: dict[str, Any], screen_width: int, screen_height: int
+    ) -> ActionResult:
+        """
+        Execute an action from the AI model.
+
+        Args:
+            action: The action dictionary from the model.
+            screen_width: Current screen width in pixels.
+            screen_height: Current screen height in pixels.
+
+        Returns:
+            ActionResult indicating success and whether to finish.
+        """
+        action_type = action.get("_metadata")
+
+        if action_type == "finish":
+            return ActionResult(
+                success=True, should_finish=True, message=action.get("message")
+            )
+
+        if action_type != "do":
+            return ActionResult(
+                success=False,
+                should_finish=True,
+                message=f"Unknown action type: {action_type}",
+            )
+
+        action_name = action.get("action")
+        handler_method = self._get_handler(action_name)
+
+        if handler_method is None:
+            return ActionResult(
+                success=False,
+                should_finish=False,
+                message=f"Unknown action: {action_name}",
+            )
+
+        try:
+            return await handler_method(action, screen_width, screen_height)
+        except Exception as e:
+            return ActionResult(
+                success=False, should_finish=False, message=f"Action failed: {e}"
+            )
+
+    def _get_handler(self, action_name: str) -> Callable | None:
+        """Get the handler coroutine for an action."""
+        handlers = {
+            "Launch": self._handle_launch,
+            "Tap": self._handle_tap,
+            "Type": self._handle_type,
+            "Type_Name": self._handle_type,
+            "Swipe": self._handle_swipe,
+            "Back": self._handle_back,
+            "Home": self._handle_home,
+            "Double Tap": self._handle_double_tap,
+            "Long Press": self._handle_long_press,
+            "Wait": self._handle_wait,
+            "Take_over": self._handle_takeover,
+            "Note": self._handle_noop,
+            "Call_API": self._handle_noop,
+            "Interact": self._handle_interact,
+        }
+        return handlers.get(action_name)
+
+    @staticmethod
+    def _to_absolute(element: list[int], width: int, height: int) -> tuple[int, int]:
+        """Convert relative coordinates (0-1000) to absolute pixels."""
+        return int(element[0] / 1000 * width), int(element[1] / 1000 * height)
+
+    async def _handle_launch(self, action: dict, width: int, height: int) -> ActionResult:
+        app_name = action.get("app")
+        if not app_name:
+            return ActionResult(False, False, "No app name specified")
+        if await self.device_factory.launch_app(app_name, self.device_id):
+            return ActionResult(True, False)
+        return ActionResult(False, False, f"App not found: {app_name}")
+
+    async def _handle_tap(self, action: dict, width: int, height: int) -> ActionResult:
+        element = action.get("element")
+        if not element:
+            return ActionResult(False, False, "No element coordinates")
+        x, y = self._to_absolute(element, width, height)
+
+        # Check for sensitive operation
+        if "message" in action:
+            if not await _call(self.confirmation_callback, action["message"]):
+                return ActionResult(
+                    success=False,
+                    should_finish=True,
+                    message="User cancelled sensitive operation",
+                )
+
+        await self.device_factory.tap(x, y, self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_type(self, action: dict, width: int, height: int) -> ActionResult:
+        text = action.get("text", "")
+        device_factory = self.device_factory
+        min_wait = TIMING_CONFIG.stability.min_text_wait
+
+        await self.keyboard.ensure_active()
+
+        await device_factory.clear_text(self.device_id)
+        await device_factory.wait_for_screen(
+            self.device_id, TIMING_CONFIG.action.text_clear_delay, min_wait
+        )
+
+        if len(text) >= PASTE_THRESHOLD:
+            await device_factory.paste_text(text, self.device_id)
+        else:
+            await device_factory.type_text(text, self.device_id)
+        await device_factory.wait_for_screen(
+            self.device_id, TIMING_CONFIG.action.text_input_delay, min_wait
+        )
+        return ActionResult(True, False)
+
+    async def _handle_swipe(self, action: dict, width: int, height: int) -> ActionResult:
+        start = action.get("start")
+        end = action.get("end")
+        if not start or not end:
+            return ActionResult(False, False, "Missing swipe coordinates")
+
+        start_x, start_y = self._to_absolute(start, width, height)
+        end_x, end_y = self._to_absolute(end, width, height)
+        await self.device_factory.swipe(
+            start_x, start_y, end_x, end_y, device_id=self.device_id
+        )
+        return ActionResult(True, False)
+
+    async def _handle_back(self, action: dict, width: int, height: int) -> ActionResult:
+        await self.device_factory.back(self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_home(self, action: dict, width: int, height: int) -> ActionResult:
+        await self.device_factory.home(self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_double_tap(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        element = action.get("element")
+        if not element:
+            return ActionResult(False, False, "No element coordinates")
+        x, y = self._to_absolute(element, width, height)
+        await self.device_factory.double_tap(x, y, self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_long_press(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        element = action.get("element")
+        if not element:
+            return ActionResult(False, False, "No element coordinates")
+        x, y = self._to_absolute(element, width, height)
+        await self.device_factory.long_press(x, y, device_id=self.device_id)
+        return ActionResult(True, False)
+
+    async def _handle_wait(self, action: dict, width: int, height: int) -> ActionResult:
+        duration_str = action.get("duration", "1 seconds")
+        try:
+            duration = float(duration_str.replace("seconds", "").strip())
+        except ValueError:
+            duration = 1.0
+        await asyncio.sleep(duration)
+        return ActionResult(True, False)
+
+    async def _handle_takeover(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        message = action.get("message", "User intervention required")
+        if self.keyboard.is_active:
+            # Give the user their own keyboard back for logins and captchas
+            await self.keyboard.restore()
+            await self.device_factory.wait_for_screen(
+                self.device_id, TIMING_CONFIG.action.keyboard_restore_delay
+            )
+        await _call(self.takeover_callback, message)
+        return ActionResult(True, False)
+
+    async def _handle_noop(self, action: dict, width: int, height: int) -> ActionResult:
+        """Note and Call_API are placeholders, as in ActionHandler."""
+        return ActionResult(True, False)
+
+    async def _handle_interact(
+        self, action: dict, width: int, height: int
+    ) -> ActionResult:
+        return ActionResult(True, False, message="User interaction required")
+
+    @staticmethod
+    async def _default_confirmation(message: str) -> bool:
+        """Default confirmation callback using console input off the event loop."""
+        response = await asyncio.to_thread(
+            input, f"Sensitive operation: {message}\nConfirm? (Y/N): "
+        )
+        return response.upper() == "Y"
+
+    @staticmethod
+    async def _default_takeover(message: str) -> None:
+        """Default takeover callback using console input off the event loop."""
+        await asyncio.to_thread(
+            input, f"{message}\nPress Enter after completing manual operation..."
+        )
+
+
+async def _call(callback: Callable, *args) -> Any:
+    """Call a sync or async callback and return its result."""
+    result = callback(*args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
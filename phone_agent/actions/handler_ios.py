@@ -13,7 +13,8 @@ from phone_agent.xctest import (
     swipe,
     tap,
 )
-from phone_agent.xctest.input import clear_text, hide_keyboard, type_text
+from phone_agent.text_chunks import PASTE_THRESHOLD
+from phone_agent.xctest.input import clear_text, hide_keyboard, paste_text, type_text
 
 
 @dataclass
@@ -166,7 +167,11 @@ class IOSActionHandler:
         clear_text(wda_url=self.wda_url, session_id=self.session_id)
         time.sleep(0.5)
 
-        type_text(text, wda_url=self.wda_url, session_id=self.session_id)
+        pasted = len(text) >= PASTE_THRESHOLD and paste_text(
+            text, wda_url=self.wda_url, session_id=self.session_id
+        )
+        if not pasted:
+            type_text(text, wda_url=self.wda_url, session_id=self.session_id)
         time.sleep(0.5)
 
         # Hide keyboard after typing
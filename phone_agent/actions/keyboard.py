@@ -0,0 +1,125 @@
+"""Keyboard session management for text input.
+
+Switching to ADB Keyboard and back around every Type action costs several
+device round trips and fixed delays. A session switches once, on the first
+Type of a task, keeps ADB Keyboard active for the following ones, and
+restores the original IME once when the task ends.
+"""
+
+from phone_agent.adb.input import ADB_KEYBOARD_IME
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.device_factory import DeviceFactory, DeviceType, get_device_factory
+from phone_agent.device_factory_async import AsyncDeviceFactory
+
+
+class KeyboardSession:
+    """
+    Keeps ADB Keyboard active for the duration of a task.
+
+    Args:
+        device_id: Optional device ID for multi-device setups.
+        device_factory: Device backend to use. Defaults to the global factory.
+
+    Example:
+        >>> keyboard = KeyboardSession("emulator-5554")
+        >>> keyboard.ensure_active()  # Switches IME on first use only
+        >>> keyboard.restore()  # Restores the original IME at task end
+    """
+
+    def __init__(
+        self, device_id: str | None = None, device_factory: DeviceFactory | None = None
+    ):
+        self.device_id = device_id
+        self.device_factory = device_factory or get_device_factory()
+        self._original_ime: str | None = None
+
+    @property
+    def is_active(self) -> bool:
+        """Whether ADB Keyboard was switched on by this session."""
+        return self._original_ime is not None
+
+    def ensure_active(self) -> None:
+        """Switch to ADB Keyboard if this session has not done so yet."""
+        if self.is_active:
+            return
+
+        device_factory = self.device_factory
+        self._original_ime = device_factory.detect_and_set_adb_keyboard(self.device_id)
+        if ADB_KEYBOARD_IME in self._original_ime:
+            return
+
+        # Verify the switch with a single query instead of a fixed sleep
+        if ADB_KEYBOARD_IME not in device_factory.get_current_ime(self.device_id):
+            device_factory.wait_for_screen(
+                self.device_id,
+                TIMING_CONFIG.action.keyboard_switch_delay,
+                TIMING_CONFIG.stability.min_text_wait,
+            )
+
+    def restore(self) -> None:
+        """
+        Restore the original IME if this session switched it.
+
+        Safe to call multiple times and from cleanup paths; errors are
+        reported but not raised.
+        """
+        original_ime, self._original_ime = self._original_ime, None
+        if not original_ime or ADB_KEYBOARD_IME in original_ime:
+            return
+
+        try:
+            self.device_factory.restore_keyboard(original_ime, self.device_id)
+        except Exception as e:
+            print(f"Failed to restore keyboard: {e}")
+
+
+class AsyncKeyboardSession:
+    """
+    KeyboardSession for asyncio agents.
+
+    Args:
+        device_id: Optional device ID for multi-device setups.
+        device_factory: Async device backend to use (AsyncDeviceFactory or
+            AsyncWDAClient).
+    """
+
+    def __init__(self, device_id: str | None, device_factory: AsyncDeviceFactory):
+        self.device_id = device_id
+        self.device_factory = device_factory
+        self._original_ime: str | None = None
+
+    @property
+    def is_active(self) -> bool:
+        """Whether ADB Keyboard was switched on by this session."""
+        return self._original_ime is not None
+
+    async def ensure_active(self) -> None:
+        """Switch to ADB Keyboard if this session has not done so yet."""
+        if self.is_active or self.device_factory.device_type == DeviceType.IOS:
+            # iOS types through WebDriverAgent; there is no IME to switch
+            return
+
+        device_factory = self.device_factory
+        self._original_ime = await device_factory.detect_and_set_adb_keyboard(
+            self.device_id
+        )
+        if ADB_KEYBOARD_IME in self._original_ime:
+            return
+
+        if ADB_KEYBOARD_IME not in await device_factory.get_current_ime(self.device_id):
+            await device_factory.wait_for_screen(
+                self.device_id,
+                TIMING_CONFIG.action.keyboard_switch_delay,
+                TIMING_CONFIG.stability.min_text_wait,
+            )
+
+    async def restore(self) -> None:
+        """Restore the original IME if this session switched it; never raises."""
+        original_ime, self._original_ime = self._original_ime, None
+        if not original_ime or ADB_KEYBOARD_IME in original_ime:
+            return
+
+        try:
+            await self.device_factory.restore_keyboard(original_ime, self.device_id)
+        except Exception as e:
+            print(f"Failed to restore keyboard: {e}")
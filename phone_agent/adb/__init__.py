@@ -16,22 +16,76 @@ from phone_agent.adb.device import (
     long_press,
     swipe,
     tap,
+    wait_for_screen,
 )
 from phone_agent.adb.input import (
     clear_text,
     detect_and_set_adb_keyboard,
+    get_current_ime,
+    paste_text,
     restore_keyboard,
     type_text,
 )
-from phone_agent.adb.screenshot import get_screenshot
+from phone_agent.adb.scrcpy import (
+    ScrcpyFrameSource,
+    get_frame_source,
+    start_frame_source,
+    stop_frame_source,
+)
+from phone_agent.adb.launcher import (
+    LauncherActivityCache,
+    get_launcher_cache,
+    launch_package,
+    resolve_launcher_activity,
+)
+from phone_agent.adb.protocol import ADBClient, ADBProtocolError, get_adb_client
+from phone_agent.adb.shell import (
+    ADBShellSession,
+    ShellInterruptedError,
+    ShellMode,
+    close_shell_session,
+    exec_out,
+    get_shell_mode,
+    run_shell,
+    set_shell_mode,
+)
+from phone_agent.adb.screenshot import (
+    CaptureMode,
+    get_capture_mode,
+    get_screenshot,
+    set_capture_mode,
+)
 
 __all__ = [
     # Screenshot
     "get_screenshot",
+    "set_capture_mode",
+    "get_capture_mode",
+    "CaptureMode",
+    # scrcpy frame source
+    "ScrcpyFrameSource",
+    "start_frame_source",
+    "stop_frame_source",
+    "get_frame_source",
+    # Persistent shell
+    "ADBShellSession",
+    "ShellInterruptedError",
+    "ShellMode",
+    "run_shell",
+    "set_shell_mode",
+    "get_shell_mode",
+    "close_shell_session",
+    "exec_out",
+    # ADB server protocol
+    "ADBClient",
+    "ADBProtocolError",
+    "get_adb_client",
     # Input
     "type_text",
+    "paste_text",
     "clear_text",
     "detect_and_set_adb_keyboard",
+    "get_current_ime",
     "restore_keyboard",
     # Device control
     "get_current_app",
@@ -42,6 +96,12 @@ __all__ = [
     "double_tap",
     "long_press",
     "launch_app",
+    "wait_for_screen",
+    # App launching
+    "LauncherActivityCache",
+    "get_launcher_cache",
+    "launch_package",
+    "resolve_launcher_activity",
     # Connection management
     "ADBConnection",
     "DeviceInfo",
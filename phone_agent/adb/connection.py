@@ -6,6 +6,8 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
+from phone_agent.adb.protocol import ADBProtocolError, get_adb_client
+from phone_agent.adb.shell import ShellMode, get_shell_mode
 from phone_agent.config.timing import TIMING_CONFIG
 
 
@@ -125,15 +127,24 @@ class ADBConnection:
             List of DeviceInfo objects.
         """
         try:
-            result = subprocess.run(
-                [self.adb_path, "devices", "-l"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
+            lines = None
+            if get_shell_mode() == ShellMode.NATIVE:
+                try:
+                    lines = get_adb_client().host_request("host:devices-l").splitlines()
+                except (ADBProtocolError, OSError) as e:
+                    print(f"ADB server request failed, spawning instead: {e}")
+
+            if lines is None:
+                result = subprocess.run(
+                    [self.adb_path, "devices", "-l"],
+                    capture_output=True,
+                    text=True,
+                    timeout=5,
+                )
+                lines = result.stdout.strip().split("\n")[1:]  # Skip header
 
             devices = []
-            for line in result.stdout.strip().split("\n")[1:]:  # Skip header
+            for line in lines:
                 if not line.strip():
                     continue
 
@@ -5,8 +5,23 @@ import subprocess
 import time
 from typing import List, Optional, Tuple
 
+from phone_agent.adb.launcher import launch_package
+from phone_agent.adb.screenshot import get_preview_frame
+from phone_agent.adb.shell import run_shell
+from phone_agent.config.app_index import get_app_index
 from phone_agent.config.apps import APP_PACKAGES
 from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.stability import wait_for_stable_screen
+from phone_agent.telemetry import span
+
+# Commands printing the focus lines, tried in order. The first two filter on
+# the device so only those lines cross the wire (the full `dumpsys window`
+# output can be megabytes); the full dump is for devices without grep.
+CURRENT_APP_COMMANDS = (
+    ["dumpsys", "window", "displays", "|", "grep", "-E", "'mCurrentFocus|mFocusedApp'"],
+    ["dumpsys", "window", "|", "grep", "-E", "'mCurrentFocus|mFocusedApp'"],
+    ["dumpsys", "window"],
+)
 
 
 def get_current_app(device_id: str | None = None) -> str:
@@ -19,21 +34,30 @@ def get_current_app(device_id: str | None = None) -> str:
     Returns:
         The app name if recognized, otherwise "System Home".
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
-    result = subprocess.run(
-        adb_prefix + ["shell", "dumpsys", "window"], capture_output=True, text=True, encoding="utf-8"
-    )
-    output = result.stdout
+    output = ""
+    for command in CURRENT_APP_COMMANDS:
+        output = run_shell(command, device_id).stdout
+        if has_focus_lines(output):
+            break
     if not output:
         raise ValueError("No output from dumpsys window")
 
-    # Parse window focus info
+    return parse_current_app(output)
+
+
+def has_focus_lines(output: str) -> bool:
+    """Whether the output of a CURRENT_APP_COMMANDS command holds the focus lines."""
+    return "mCurrentFocus" in output or "mFocusedApp" in output
+
+
+def parse_current_app(output: str) -> str:
+    """Find the focused app in `dumpsys window` output."""
+    index = get_app_index(APP_PACKAGES)
     for line in output.split("\n"):
         if "mCurrentFocus" in line or "mFocusedApp" in line:
-            for app_name, package in APP_PACKAGES.items():
-                if package in line:
-                    return app_name
+            app_name = index.find_app_name(line)
+            if app_name is not None:
+                return app_name
 
     return "System Home"
 
@@ -48,17 +72,13 @@ def tap(
         x: X coordinate.
         y: Y coordinate.
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after tap. If None, uses configured default.
+        delay: Maximum delay in seconds after tap. If None, uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_tap_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
-    )
-    time.sleep(delay)
+    run_shell(tap_args(x, y), device_id)
+    wait_for_screen(device_id, delay, TIMING_CONFIG.stability.min_tap_wait)
 
 
 def double_tap(
@@ -71,21 +91,15 @@ def double_tap(
         x: X coordinate.
         y: Y coordinate.
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after double tap. If None, uses configured default.
+        delay: Maximum delay in seconds after double tap. If None, uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_double_tap_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
-    )
+    run_shell(tap_args(x, y), device_id)
     time.sleep(TIMING_CONFIG.device.double_tap_interval)
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
-    )
-    time.sleep(delay)
+    run_shell(tap_args(x, y), device_id)
+    wait_for_screen(device_id, delay, TIMING_CONFIG.stability.min_tap_wait)
 
 
 def long_press(
@@ -103,19 +117,13 @@ def long_press(
         y: Y coordinate.
         duration_ms: Duration of press in milliseconds.
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after long press. If None, uses configured default.
+        delay: Maximum delay in seconds after long press. If None, uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_long_press_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix
-        + ["shell", "input", "swipe", str(x), str(y), str(x), str(y), str(duration_ms)],
-        capture_output=True,
-    )
-    time.sleep(delay)
+    run_shell(long_press_args(x, y, duration_ms), device_id)
+    wait_for_screen(device_id, delay, TIMING_CONFIG.stability.min_tap_wait)
 
 
 def swipe(
@@ -137,34 +145,13 @@ def swipe(
         end_y: Ending Y coordinate.
         duration_ms: Duration of swipe in milliseconds (auto-calculated if None).
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after swipe. If None, uses configured default.
+        delay: Maximum delay in seconds after swipe. If None, uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_swipe_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    if duration_ms is None:
-        # Calculate duration based on distance
-        dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
-        duration_ms = int(dist_sq / 1000)
-        duration_ms = max(1000, min(duration_ms, 2000))  # Clamp between 1000-2000ms
-
-    subprocess.run(
-        adb_prefix
-        + [
-            "shell",
-            "input",
-            "swipe",
-            str(start_x),
-            str(start_y),
-            str(end_x),
-            str(end_y),
-            str(duration_ms),
-        ],
-        capture_output=True,
-    )
-    time.sleep(delay)
+    run_shell(swipe_args(start_x, start_y, end_x, end_y, duration_ms), device_id)
+    wait_for_screen(device_id, delay, TIMING_CONFIG.stability.min_swipe_wait)
 
 
 def back(device_id: str | None = None, delay: float | None = None) -> None:
@@ -173,17 +160,13 @@ def back(device_id: str | None = None, delay: float | None = None) -> None:
 
     Args:
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after pressing back. If None, uses configured default.
+        delay: Maximum delay in seconds after pressing back. If None, uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_back_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "keyevent", "4"], capture_output=True
-    )
-    time.sleep(delay)
+    run_shell(back_args(), device_id)
+    wait_for_screen(device_id, delay, TIMING_CONFIG.stability.min_back_wait)
 
 
 def home(device_id: str | None = None, delay: float | None = None) -> None:
@@ -192,17 +175,13 @@ def home(device_id: str | None = None, delay: float | None = None) -> None:
 
     Args:
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after pressing home. If None, uses configured default.
+        delay: Maximum delay in seconds after pressing home. If None, uses configured default.
     """
     if delay is None:
         delay = TIMING_CONFIG.device.default_home_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "keyevent", "KEYCODE_HOME"], capture_output=True
-    )
-    time.sleep(delay)
+    run_shell(home_args(), device_id)
+    wait_for_screen(device_id, delay, TIMING_CONFIG.stability.min_home_wait)
 
 
 def launch_app(
@@ -214,7 +193,7 @@ def launch_app(
     Args:
         app_name: The app name (must be in APP_PACKAGES).
         device_id: Optional ADB device ID.
-        delay: Delay in seconds after launching. If None, uses configured default.
+        delay: Maximum delay in seconds after launching. If None, uses configured default.
 
     Returns:
         True if app was launched, False if app not found.
@@ -225,28 +204,95 @@ def launch_app(
     if app_name not in APP_PACKAGES:
         return False
 
-    adb_prefix = _get_adb_prefix(device_id)
     package = APP_PACKAGES[app_name]
 
-    subprocess.run(
-        adb_prefix
-        + [
-            "shell",
-            "monkey",
-            "-p",
-            package,
-            "-c",
-            "android.intent.category.LAUNCHER",
-            "1",
-        ],
-        capture_output=True,
-    )
-    time.sleep(delay)
+    try:
+        result = launch_package(package, device_id)
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"Launcher activity launch failed, using monkey: {e}")
+        result = None
+
+    if result is not None and result.success and result.total_time_ms is not None:
+        # `am start -W` already waited until the activity was displayed
+        wait_for_screen(device_id, min(delay, TIMING_CONFIG.device.launch_settle_delay))
+        return True
+
+    if result is None or not result.success:
+        # No resolvable launcher activity (old device or unusual app)
+        run_shell(monkey_args(package), device_id)
+    wait_for_screen(device_id, delay, TIMING_CONFIG.stability.min_launch_wait)
     return True
 
 
-def _get_adb_prefix(device_id: str | None) -> list:
-    """Get ADB command prefix with optional device specifier."""
-    if device_id:
-        return ["adb", "-s", device_id]
-    return ["adb"]
+def wait_for_screen(
+    device_id: str | None = None, max_wait: float = 1.0, min_wait: float = 0.0
+) -> float:
+    """
+    Wait after an action until the screen is stable.
+
+    Args:
+        device_id: Optional ADB device ID.
+        max_wait: Maximum time to wait in seconds.
+        min_wait: Minimum time to wait in seconds.
+
+    Returns:
+        The time actually waited in seconds.
+
+    Note:
+        Falls back to a fixed ``max_wait`` sleep when adaptive waits are
+        disabled (PHONE_AGENT_ADAPTIVE_WAIT=false).
+    """
+    if max_wait <= 0:
+        return 0.0
+    with span("post_action_wait"):
+        if not TIMING_CONFIG.stability.enabled:
+            time.sleep(max_wait)
+            return max_wait
+        return wait_for_stable_screen(
+            lambda: get_preview_frame(device_id), max_wait, min_wait
+        )
+
+
+def tap_args(x: int, y: int) -> list[str]:
+    """Shell command tapping at the coordinates."""
+    return ["input", "tap", str(x), str(y)]
+
+
+def long_press_args(x: int, y: int, duration_ms: int) -> list[str]:
+    """Shell command pressing the coordinates for ``duration_ms``."""
+    return ["input", "swipe", str(x), str(y), str(x), str(y), str(duration_ms)]
+
+
+def swipe_args(
+    start_x: int, start_y: int, end_x: int, end_y: int, duration_ms: int | None = None
+) -> list[str]:
+    """Shell command swiping from start to end (duration from the distance if None)."""
+    if duration_ms is None:
+        # Calculate duration based on distance
+        dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
+        duration_ms = int(dist_sq / 1000)
+        duration_ms = max(1000, min(duration_ms, 2000))  # Clamp between 1000-2000ms
+    return [
+        "input",
+        "swipe",
+        str(start_x),
+        str(start_y),
+        str(end_x),
+        str(end_y),
+        str(duration_ms),
+    ]
+
+
+def back_args() -> list[str]:
+    """Shell command pressing the back button."""
+    return ["input", "keyevent", "4"]
+
+
+def home_args() -> list[str]:
+    """Shell command pressing the home button."""
+    return ["input", "keyevent", "KEYCODE_HOME"]
+
+
+def monkey_args(package: str) -> list[str]:
+    """Shell command launching a package through its launcher intent."""
+    return ["monkey", "-p", package, "-c", "android.intent.category.LAUNCHER", "1"]
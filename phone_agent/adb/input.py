@@ -1,9 +1,17 @@
 """Input utilities for Android device text input."""
 
 import base64
-import subprocess
 from typing import Optional
 
+from phone_agent.adb.shell import run_shell
+from phone_agent.text_chunks import split_utf8
+
+ADB_KEYBOARD_IME = "com.android.adbkeyboard/.AdbIME"
+
+# Text bytes per ADB Keyboard broadcast; the base64 argument stays well under
+# the 4 KB command line limit of older adb shells
+_MAX_CHUNK_BYTES = 2048
+
 
 def type_text(text: str, device_id: str | None = None) -> None:
     """
@@ -16,25 +24,46 @@ def type_text(text: str, device_id: str | None = None) -> None:
     Note:
         Requires ADB Keyboard to be installed on the device.
         See: https://github.com/nicnocquee/AdbKeyboard
+        Long text is sent as several broadcasts, each appending a chunk.
+    """
+    for command in type_text_commands(text):
+        run_shell(command, device_id)
+
+
+def type_text_commands(text: str) -> list[list[str]]:
     """
-    adb_prefix = _get_adb_prefix(device_id)
-    encoded_text = base64.b64encode(text.encode("utf-8")).decode("utf-8")
-
-    subprocess.run(
-        adb_prefix
-        + [
-            "shell",
-            "am",
-            "broadcast",
-            "-a",
-            "ADB_INPUT_B64",
-            "--es",
-            "msg",
-            encoded_text,
-        ],
-        capture_output=True,
-        text=True,
-    )
+    ADB Keyboard broadcasts entering a text.
+
+    Args:
+        text: The text to type.
+
+    Returns:
+        One shell command per chunk of at most _MAX_CHUNK_BYTES text bytes
+        (one empty broadcast for an empty text).
+    """
+    commands = []
+    for chunk in split_utf8(text, _MAX_CHUNK_BYTES):
+        encoded_text = base64.b64encode(chunk.encode("utf-8")).decode("utf-8")
+        commands.append(
+            ["am", "broadcast", "-a", "ADB_INPUT_B64", "--es", "msg", encoded_text]
+        )
+    return commands
+
+
+def paste_text(text: str, device_id: str | None = None) -> None:
+    """
+    Enter a long text in bulk.
+
+    Args:
+        text: The text to enter.
+        device_id: Optional ADB device ID for multi-device setups.
+
+    Note:
+        ADB Keyboard commits each broadcast into the field in one go, which
+        is already a bulk paste, so this uses the chunked ``type_text`` path
+        rather than the Android clipboard (not writable from the shell).
+    """
+    type_text(text, device_id)
 
 
 def clear_text(device_id: str | None = None) -> None:
@@ -44,13 +73,12 @@ def clear_text(device_id: str | None = None) -> None:
     Args:
         device_id: Optional ADB device ID for multi-device setups.
     """
-    adb_prefix = _get_adb_prefix(device_id)
+    run_shell(clear_text_args(), device_id)
 
-    subprocess.run(
-        adb_prefix + ["shell", "am", "broadcast", "-a", "ADB_CLEAR_TEXT"],
-        capture_output=True,
-        text=True,
-    )
+
+def clear_text_args() -> list[str]:
+    """Shell command clearing the focused field through ADB Keyboard."""
+    return ["am", "broadcast", "-a", "ADB_CLEAR_TEXT"]
 
 
 def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
@@ -63,23 +91,11 @@ def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
     Returns:
         The original keyboard IME identifier for later restoration.
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
-    # Get current IME
-    result = subprocess.run(
-        adb_prefix + ["shell", "settings", "get", "secure", "default_input_method"],
-        capture_output=True,
-        text=True,
-    )
-    current_ime = (result.stdout + result.stderr).strip()
+    current_ime = get_current_ime(device_id)
 
     # Switch to ADB Keyboard if not already set
-    if "com.android.adbkeyboard/.AdbIME" not in current_ime:
-        subprocess.run(
-            adb_prefix + ["shell", "ime", "set", "com.android.adbkeyboard/.AdbIME"],
-            capture_output=True,
-            text=True,
-        )
+    if ADB_KEYBOARD_IME not in current_ime:
+        run_shell(["ime", "set", ADB_KEYBOARD_IME], device_id)
 
     # Warm up the keyboard
     type_text("", device_id)
@@ -87,23 +103,26 @@ def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
     return current_ime
 
 
-def restore_keyboard(ime: str, device_id: str | None = None) -> None:
+def get_current_ime(device_id: str | None = None) -> str:
     """
-    Restore the original keyboard IME.
+    Get the current default input method.
 
     Args:
-        ime: The IME identifier to restore.
         device_id: Optional ADB device ID for multi-device setups.
+
+    Returns:
+        The IME identifier, e.g. "com.android.adbkeyboard/.AdbIME".
     """
-    adb_prefix = _get_adb_prefix(device_id)
+    result = run_shell(["settings", "get", "secure", "default_input_method"], device_id)
+    return (result.stdout + result.stderr).strip()
 
-    subprocess.run(
-        adb_prefix + ["shell", "ime", "set", ime], capture_output=True, text=True
-    )
 
+def restore_keyboard(ime: str, device_id: str | None = None) -> None:
+    """
+    Restore the original keyboard IME.
 
-def _get_adb_prefix(device_id: str | None) -> list:
-    """Get ADB command prefix with optional device specifier."""
-    if device_id:
-        return ["adb", "-s", device_id]
-    return ["adb"]
+    Args:
+        ime: The IME identifier to restore.
+        device_id: Optional ADB device ID for multi-device setups.
+    """
+    run_shell(["ime", "set", ime], device_id)
@@ -0,0 +1,189 @@
+"""Fast app launching via cached launcher activities.
+
+``monkey`` starts its own Java runtime before it launches anything. Instead,
+each package's launcher activity is resolved once with ``cmd package
+resolve-activity``, cached per device on disk, and launched directly with
+``am start -W -n``. ``-W`` blocks until the activity is displayed, so callers
+can skip most of the fixed post-launch delay.
+"""
+
+import json
+import os
+import subprocess
+import threading
+from dataclasses import dataclass
+
+from phone_agent.adb.shell import run_shell
+from phone_agent.config.paths import get_cache_dir, safe_filename
+
+# `am start -W` waits for the first frame; cold starts can take a while
+_LAUNCH_TIMEOUT = 20
+
+
+@dataclass
+class LaunchResult:
+    """Result of `am start -W`."""
+
+    success: bool
+    component: str
+    total_time_ms: int | None = None  # Reported TotalTime, if any
+    message: str = ""
+
+
+class LauncherActivityCache:
+    """
+    Per-device cache of package -> launcher component, persisted as JSON.
+
+    Args:
+        device_id: Optional ADB device ID.
+        cache_dir: Directory for the JSON file (defaults to the cache dir).
+    """
+
+    def __init__(self, device_id: str | None = None, cache_dir: str | None = None):
+        self.device_id = device_id
+        cache_dir = cache_dir or get_cache_dir("launcher")
+        self.path = os.path.join(cache_dir, f"{safe_filename(device_id or '')}.json")
+        self._components: dict[str, str] | None = None
+        self._lock = threading.Lock()
+
+    def get(self, package: str) -> str | None:
+        """Get the component for a package, resolving it on a cache miss."""
+        with self._lock:
+            components = self._load()
+            component = components.get(package)
+            if component:
+                return component
+
+            component = resolve_launcher_activity(package, self.device_id)
+            if component:
+                components[package] = component
+                self._save()
+            return component
+
+    def invalidate(self, package: str) -> None:
+        """Forget a package's component (e.g. after an app update)."""
+        with self._lock:
+            if self._load().pop(package, None) is not None:
+                self._save()
+
+    def _load(self) -> dict[str, str]:
+        """Load the cache file once; the caller holds the lock."""
+        if self._components is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._components = dict(json.load(f))
+            except (OSError, ValueError, TypeError):
+                self._components = {}
+        return self._components
+
+    def _save(self) -> None:
+        """Write the cache file; the caller holds the lock."""
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._components, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Failed to save launcher cache: {e}")
+
+
+def resolve_launcher_activity(package: str, device_id: str | None = None) -> str | None:
+    """
+    Resolve a package's launcher activity on the device.
+
+    Args:
+        package: Package name.
+        device_id: Optional ADB device ID.
+
+    Returns:
+        Component name such as "com.tencent.mm/.ui.LauncherUI", or None if
+        the package is not installed or the device lacks `cmd package`.
+    """
+    result = run_shell(
+        [
+            "cmd",
+            "package",
+            "resolve-activity",
+            "--brief",
+            "-c",
+            "android.intent.category.LAUNCHER",
+            package,
+        ],
+        device_id,
+    )
+    # --brief prints a summary line followed by the component
+    for line in reversed(result.stdout.strip().splitlines()):
+        line = line.strip()
+        if "/" in line and " " not in line and line.startswith(package):
+            return line
+    return None
+
+
+def start_activity(component: str, device_id: str | None = None) -> LaunchResult:
+    """
+    Start an activity with `am start -W -n` and wait until it is displayed.
+
+    Args:
+        component: Component name ("package/activity").
+        device_id: Optional ADB device ID.
+
+    Returns:
+        LaunchResult parsed from the `am start -W` report.
+    """
+    try:
+        result = run_shell(
+            ["am", "start", "-W", "-n", component], device_id, timeout=_LAUNCH_TIMEOUT
+        )
+    except subprocess.TimeoutExpired:
+        # The activity was started but never reported as displayed
+        return LaunchResult(True, component, message="am start -W timed out")
+
+    output = result.stdout
+    total_time = None
+    status = None
+    for line in output.splitlines():
+        key, _, value = line.strip().partition(":")
+        value = value.strip()
+        if key == "Status":
+            status = value
+        elif key == "TotalTime" and value.isdigit():
+            total_time = int(value)
+
+    success = "Error" not in output and status in (None, "ok")
+    return LaunchResult(success, component, total_time, output.strip())
+
+
+_caches: dict[str, LauncherActivityCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_launcher_cache(device_id: str | None = None) -> LauncherActivityCache:
+    """Get the launcher activity cache for a device."""
+    key = device_id or ""
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = LauncherActivityCache(device_id)
+        return _caches[key]
+
+
+def launch_package(package: str, device_id: str | None = None) -> LaunchResult | None:
+    """
+    Launch a package through its cached launcher activity.
+
+    A failed launch drops the cached component and retries once with a fresh
+    resolution, since app updates can rename the launcher activity.
+
+    Returns:
+        LaunchResult, or None if no launcher activity could be resolved
+        (callers should fall back to monkey).
+    """
+    cache = get_launcher_cache(device_id)
+    for _ in range(2):
+        component = cache.get(package)
+        if component is None:
+            return None
+        result = start_activity(component, device_id)
+        if result.success:
+            return result
+        cache.invalidate(package)
+    return result
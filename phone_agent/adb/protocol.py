@@ -0,0 +1,391 @@
+"""Pure-Python client for the ADB server (host) protocol.
+
+Talks directly to the local ADB server on port 5037 instead of spawning the
+``adb`` binary for every command. Each request is a 4-digit hex length
+followed by the payload; the server answers ``OKAY`` or ``FAIL`` plus a
+length-prefixed message. Device services (``shell:``, ``exec:``, ``sync:``)
+are opened on a socket after switching it to the device transport with
+``host:transport:<serial>``.
+
+The ADB server itself is still started by the ``adb`` binary (``adb
+start-server``); only the per-command process launches are avoided.
+"""
+
+import os
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Iterator
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.getenv("ANDROID_ADB_SERVER_PORT", "5037"))
+
+# Shell protocol v2 packet IDs
+_SHELL_STDOUT = 1
+_SHELL_STDERR = 2
+_SHELL_EXIT = 3
+
+# Maximum payload of a single sync DATA packet
+_SYNC_DATA_MAX = 64 * 1024
+
+# Printed after a command run through the legacy shell service, which has no
+# exit status of its own
+_EXIT_MARKER = b"__PHONE_AGENT_EXIT__"
+
+
+class ADBProtocolError(Exception):
+    """Raised when the ADB server rejects a request or the stream is malformed."""
+
+
+@dataclass
+class ShellResult:
+    """Result of a shell command run through the ADB server."""
+
+    returncode: int
+    stdout: bytes
+    stderr: bytes = b""
+
+
+@dataclass
+class DeviceEntry:
+    """A device as reported by ``host:devices-l``."""
+
+    serial: str
+    state: str
+    properties: dict[str, str] = field(default_factory=dict)
+
+
+class ADBClient:
+    """
+    Client for the ADB server wire protocol.
+
+    Args:
+        host: ADB server host.
+        port: ADB server port (ANDROID_ADB_SERVER_PORT or 5037).
+        timeout: Default socket timeout in seconds.
+
+    Example:
+        >>> client = ADBClient()
+        >>> client.list_devices()
+        [DeviceEntry(serial='emulator-5554', state='device', ...)]
+        >>> client.shell("emulator-5554", "input tap 500 1000").returncode
+        0
+    """
+
+    def __init__(
+        self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 10
+    ):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    # Host services
+
+    def is_available(self) -> bool:
+        """Check whether an ADB server is listening."""
+        try:
+            self.server_version()
+            return True
+        except (OSError, ADBProtocolError):
+            return False
+
+    def server_version(self) -> int:
+        """Get the ADB server's internal protocol version."""
+        return int(self.host_request("host:version"), 16)
+
+    def host_request(self, request: str) -> str:
+        """
+        Send a host request that returns a length-prefixed reply.
+
+        Args:
+            request: Request such as "host:devices-l".
+
+        Returns:
+            The decoded reply.
+        """
+        with self._connect() as sock:
+            self._send_request(sock, request)
+            return self._read_length_prefixed(sock).decode("utf-8", errors="replace")
+
+    def list_devices(self) -> list[DeviceEntry]:
+        """List devices known to the ADB server."""
+        return _parse_devices(self.host_request("host:devices-l"))
+
+    def track_devices(self) -> Iterator[list[DeviceEntry]]:
+        """
+        Yield the device list every time it changes.
+
+        The first item is the current list. The generator runs until the
+        server closes the connection or the caller stops iterating.
+        """
+        with self._connect() as sock:
+            self._send_request(sock, "host:track-devices-l")
+            sock.settimeout(None)  # Updates arrive only when devices change
+            while True:
+                try:
+                    payload = self._read_length_prefixed(sock)
+                except EOFError:
+                    return
+                yield _parse_devices(payload.decode("utf-8", errors="replace"))
+
+    def forward(self, serial: str | None, local: str, remote: str) -> None:
+        """
+        Create a port forward, e.g. forward(serial, "tcp:27183", "localabstract:x").
+        """
+        prefix = f"host-serial:{serial}" if serial else "host"
+        with self._connect() as sock:
+            # Forward requests answer OKAY twice (accepted, then done)
+            self._send_request(sock, f"{prefix}:forward:{local};{remote}")
+            self._read_status(sock)
+
+    def remove_forward(self, serial: str | None, local: str) -> None:
+        """Remove a port forward."""
+        prefix = f"host-serial:{serial}" if serial else "host"
+        with self._connect() as sock:
+            self._send_request(sock, f"{prefix}:killforward:{local}")
+
+    # Device services
+
+    def open_service(
+        self, serial: str | None, service: str, timeout: float | None = None
+    ) -> socket.socket:
+        """
+        Open a device service on a new connection.
+
+        Args:
+            serial: Device serial, or None for the only connected device.
+            service: Service such as "shell:ls" or "sync:".
+            timeout: Socket timeout; defaults to the client timeout.
+
+        Returns:
+            Connected socket positioned at the start of the service stream.
+        """
+        sock = self._connect(timeout)
+        try:
+            transport = f"host:transport:{serial}" if serial else "host:transport-any"
+            self._send_request(sock, transport)
+            self._send_request(sock, service)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def shell(
+        self, serial: str | None, command: str, timeout: float | None = None
+    ) -> ShellResult:
+        """
+        Run a shell command and return its exit status and output.
+
+        Uses the shell v2 protocol (separate stderr and exit code) and falls
+        back to the legacy ``shell:`` service on old devices. The legacy
+        service merges stderr into stdout; the exit code is read from a
+        marker printed after the command.
+        """
+        try:
+            sock = self.open_service(serial, f"shell,v2,raw:{command}", timeout)
+        except ADBProtocolError:
+            output = self.exec_out(
+                serial, _legacy_shell_command(command), timeout, service="shell"
+            )
+            return _parse_legacy_shell(output)
+
+        stdout, stderr = bytearray(), bytearray()
+        returncode = -1
+        with sock:
+            while True:
+                try:
+                    header = _recv_exact(sock, 5)
+                except EOFError:
+                    break
+                packet_id, length = struct.unpack("<BI", header)
+                data = _recv_exact(sock, length)
+                if packet_id == _SHELL_STDOUT:
+                    stdout += data
+                elif packet_id == _SHELL_STDERR:
+                    stderr += data
+                elif packet_id == _SHELL_EXIT:
+                    returncode = data[0] if data else 0
+                    break
+        return ShellResult(returncode, bytes(stdout), bytes(stderr))
+
+    def exec_out(
+        self,
+        serial: str | None,
+        command: str,
+        timeout: float | None = None,
+        service: str = "exec",
+    ) -> bytes:
+        """
+        Run a command and return its raw binary stdout (like ``adb exec-out``).
+        """
+        with self.open_service(serial, f"{service}:{command}", timeout) as sock:
+            return _recv_all(sock)
+
+    def push(
+        self,
+        serial: str | None,
+        data: bytes,
+        remote_path: str,
+        mode: int = 0o644,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Write bytes to a file on the device via the sync service.
+
+        Args:
+            serial: Device serial.
+            data: File contents.
+            remote_path: Destination path on the device.
+            mode: Unix file permissions.
+            timeout: Socket timeout.
+        """
+        with self.open_service(serial, "sync:", timeout) as sock:
+            path_mode = f"{remote_path},{mode}".encode("utf-8")
+            sock.sendall(b"SEND" + struct.pack("<I", len(path_mode)) + path_mode)
+            for offset in range(0, len(data), _SYNC_DATA_MAX):
+                chunk = data[offset:offset + _SYNC_DATA_MAX]
+                sock.sendall(b"DATA" + struct.pack("<I", len(chunk)) + chunk)
+            sock.sendall(b"DONE" + struct.pack("<I", int(time.time())))
+
+            status, length = struct.unpack("<4sI", _recv_exact(sock, 8))
+            if status != b"OKAY":
+                message = _recv_exact(sock, length).decode("utf-8", errors="replace")
+                raise ADBProtocolError(f"push {remote_path} failed: {message}")
+            sock.sendall(b"QUIT" + struct.pack("<I", 0))
+
+    def pull(
+        self, serial: str | None, remote_path: str, timeout: float | None = None
+    ) -> bytes:
+        """
+        Read a file from the device via the sync service.
+
+        Returns:
+            The file contents.
+        """
+        with self.open_service(serial, "sync:", timeout) as sock:
+            path = remote_path.encode("utf-8")
+            sock.sendall(b"RECV" + struct.pack("<I", len(path)) + path)
+
+            data = bytearray()
+            while True:
+                packet_id, length = struct.unpack("<4sI", _recv_exact(sock, 8))
+                if packet_id == b"DATA":
+                    data += _recv_exact(sock, length)
+                elif packet_id == b"DONE":
+                    break
+                elif packet_id == b"FAIL":
+                    message = _recv_exact(sock, length).decode("utf-8", errors="replace")
+                    raise ADBProtocolError(f"pull {remote_path} failed: {message}")
+                else:
+                    raise ADBProtocolError(f"Unexpected sync packet: {packet_id!r}")
+            sock.sendall(b"QUIT" + struct.pack("<I", 0))
+            return bytes(data)
+
+    # Wire format
+
+    def _connect(self, timeout: float | None = None) -> socket.socket:
+        """Open a connection to the ADB server (timeout defaults to the client's)."""
+        if timeout is None:
+            timeout = self.timeout
+        return socket.create_connection((self.host, self.port), timeout=timeout)
+
+    def _send_request(self, sock: socket.socket, request: str) -> None:
+        """Send a length-prefixed request and check the status reply."""
+        payload = request.encode("utf-8")
+        sock.sendall(f"{len(payload):04x}".encode("ascii") + payload)
+        self._read_status(sock)
+
+    def _read_status(self, sock: socket.socket) -> None:
+        """Read OKAY/FAIL; raise ADBProtocolError with the server's message on FAIL."""
+        status = _recv_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            message = self._read_length_prefixed(sock).decode("utf-8", errors="replace")
+            raise ADBProtocolError(message)
+        raise ADBProtocolError(f"Unexpected response: {status!r}")
+
+    @staticmethod
+    def _read_length_prefixed(sock: socket.socket) -> bytes:
+        """Read a 4-digit hex length followed by that many bytes."""
+        length = int(_recv_exact(sock, 4), 16)
+        return _recv_exact(sock, length)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """Read exactly ``size`` bytes or raise EOFError."""
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise EOFError("ADB connection closed")
+        data += chunk
+    return bytes(data)
+
+
+def _recv_all(sock: socket.socket) -> bytes:
+    """Read until the peer closes the connection."""
+    chunks = []
+    while True:
+        chunk = sock.recv(256 * 1024)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def _legacy_shell_command(command: str) -> str:
+    """Append an exit status marker to a command for the legacy shell service."""
+    # The subshell keeps "exit" in the command from skipping the marker
+    return f"({command}\n); printf '\\n{_EXIT_MARKER.decode()}%d\\n' $?"
+
+
+def _parse_legacy_shell(output: bytes) -> ShellResult:
+    """
+    Split legacy shell output into the command output and its exit status.
+
+    Output without a marker (e.g. the shell was killed) gets returncode -1.
+    """
+    index = output.rfind(_EXIT_MARKER)
+    if index < 0:
+        return ShellResult(-1, output)
+    status = output[index + len(_EXIT_MARKER):].strip()
+    stdout = output[:index]
+    # Drop the newline printed before the marker (a PTY may turn it into CRLF)
+    for ending in (b"\r\n", b"\n"):
+        if stdout.endswith(ending):
+            stdout = stdout[: -len(ending)]
+            break
+    try:
+        returncode = int(status)
+    except ValueError:
+        returncode = -1
+    return ShellResult(returncode, stdout)
+
+
+def _parse_devices(text: str) -> list[DeviceEntry]:
+    """Parse ``host:devices-l`` output ("serial state key:value ...")."""
+    devices = []
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) < 2:
+            continue
+        properties = {}
+        for part in parts[2:]:
+            key, sep, value = part.partition(":")
+            if sep:
+                properties[key] = value
+        devices.append(DeviceEntry(serial=parts[0], state=parts[1], properties=properties))
+    return devices
+
+
+# Shared client for the default server address
+_default_client: ADBClient | None = None
+
+
+def get_adb_client() -> ADBClient:
+    """Get the shared client for the local ADB server."""
+    global _default_client
+    if _default_client is None:
+        _default_client = ADBClient()
+    return _default_client
@@ -0,0 +1,159 @@
+"""asyncio client for the ADB server (host) protocol.
+
+The same wire protocol as protocol.py, over ``asyncio`` streams, so one event
+loop can run commands on many devices without a thread or an ``adb`` process
+per command. Cancelling a coroutine closes its connection, which ends the
+service on the device side.
+"""
+
+import asyncio
+import struct
+
+from phone_agent.adb.protocol import (
+    _SHELL_EXIT,
+    _SHELL_STDERR,
+    _SHELL_STDOUT,
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    ADBProtocolError,
+    ShellResult,
+    _legacy_shell_command,
+    _parse_legacy_shell,
+)
+
+
+class AsyncADBClient:
+    """
+    Async client for the ADB server wire protocol.
+
+    Args:
+        host: ADB server host.
+        port: ADB server port (ANDROID_ADB_SERVER_PORT or 5037).
+        timeout: Default timeout for a whole request in seconds.
+
+    Example:
+        >>> client = AsyncADBClient()
+        >>> result = await client.shell("emulator-5554", "input tap 500 1000")
+        >>> result.returncode
+        0
+    """
+
+    def __init__(
+        self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 10
+    ):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    async def shell(
+        self, serial: str | None, command: str, timeout: float | None = None
+    ) -> ShellResult:
+        """
+        Run a shell command and return its exit status and output.
+
+        Uses the shell v2 protocol and falls back to the legacy ``shell:``
+        service on old devices.
+
+        Raises:
+            asyncio.TimeoutError: If the command does not finish in time.
+        """
+        return await asyncio.wait_for(
+            self._shell(serial, command), timeout or self.timeout
+        )
+
+    async def exec_out(
+        self, serial: str | None, command: str, timeout: float | None = None
+    ) -> bytes:
+        """
+        Run a command and return its raw binary stdout (like ``adb exec-out``).
+
+        Raises:
+            asyncio.TimeoutError: If the command does not finish in time.
+        """
+        return await asyncio.wait_for(
+            self._read_service(serial, f"exec:{command}"), timeout or self.timeout
+        )
+
+    async def _shell(self, serial: str | None, command: str) -> ShellResult:
+        try:
+            reader, writer = await self._open_service(serial, f"shell,v2,raw:{command}")
+        except ADBProtocolError:
+            output = await self._read_service(
+                serial, f"shell:{_legacy_shell_command(command)}"
+            )
+            return _parse_legacy_shell(output)
+
+        stdout, stderr = bytearray(), bytearray()
+        returncode = -1
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(5)
+                except asyncio.IncompleteReadError:
+                    break
+                packet_id, length = struct.unpack("<BI", header)
+                data = await reader.readexactly(length)
+                if packet_id == _SHELL_STDOUT:
+                    stdout += data
+                elif packet_id == _SHELL_STDERR:
+                    stderr += data
+                elif packet_id == _SHELL_EXIT:
+                    returncode = data[0] if data else 0
+                    break
+        finally:
+            writer.close()
+        return ShellResult(returncode, bytes(stdout), bytes(stderr))
+
+    async def _read_service(self, serial: str | None, service: str) -> bytes:
+        """Open a service and read until the device closes it."""
+        reader, writer = await self._open_service(serial, service)
+        try:
+            return await reader.read()
+        finally:
+            writer.close()
+
+    async def _open_service(
+        self, serial: str | None, service: str
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Connect, switch to the device transport and open a service."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            transport = f"host:transport:{serial}" if serial else "host:transport-any"
+            await self._send_request(reader, writer, transport)
+            await self._send_request(reader, writer, service)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    @staticmethod
+    async def _send_request(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request: str
+    ) -> None:
+        """Send a length-prefixed request and check the status reply."""
+        payload = request.encode("utf-8")
+        writer.write(f"{len(payload):04x}".encode("ascii") + payload)
+        await writer.drain()
+        try:
+            status = await reader.readexactly(4)
+            if status == b"OKAY":
+                return
+            if status == b"FAIL":
+                length = int(await reader.readexactly(4), 16)
+                message = await reader.readexactly(length)
+                raise ADBProtocolError(message.decode("utf-8", errors="replace"))
+        except asyncio.IncompleteReadError:
+            raise EOFError("ADB connection closed") from None
+        raise ADBProtocolError(f"Unexpected response: {status!r}")
+
+
+# Shared client for the default server address
+_default_client: AsyncADBClient | None = None
+
+
+def get_async_adb_client() -> AsyncADBClient:
+    """Get the shared async client for the local ADB server."""
+    global _default_client
+    if _default_client is None:
+        _default_client = AsyncADBClient()
+    return _default_client
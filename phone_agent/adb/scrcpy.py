@@ -0,0 +1,470 @@
+"""Persistent scrcpy-server frame source for low-latency screen capture.
+
+The frame source pushes the bundled ``scrcpy-server`` to the device, starts it
+in video-only mode and decodes the H.264 stream in a background thread, so the
+latest frame is always available in memory. It is independent of the scrcpy
+client used by the GUI remote desktop window.
+
+Requires PyAV for H.264 decoding: pip install av
+"""
+
+import atexit
+import os
+import random
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from typing import BinaryIO
+
+from PIL import Image
+
+# Must match the version of the bundled scrcpy-server binary
+SCRCPY_SERVER_VERSION = "3.3.4"
+REMOTE_SERVER_PATH = "/data/local/tmp/phone-agent-scrcpy-server.jar"
+
+# Frame header flags (see scrcpy's demuxer)
+_PACKET_FLAG_CONFIG = 1 << 63
+_PACKET_FLAG_KEY_FRAME = 1 << 62
+_PACKET_PTS_MASK = _PACKET_FLAG_KEY_FRAME - 1
+
+_DEVICE_NAME_LENGTH = 64
+
+
+def find_server_binary() -> str | None:
+    """
+    Locate the bundled scrcpy-server binary.
+
+    Looks at PHONE_AGENT_SCRCPY_SERVER, then next to the executable (packaged
+    builds), the current directory and the repository root.
+
+    Returns:
+        Path to scrcpy-server, or None if not found.
+    """
+    env_path = os.getenv("PHONE_AGENT_SCRCPY_SERVER")
+    candidates = [env_path] if env_path else []
+    if getattr(sys, "frozen", False):
+        candidates.append(os.path.join(os.path.dirname(sys.executable), "scrcpy-server"))
+    candidates.append(os.path.join(os.getcwd(), "scrcpy-server"))
+    candidates.append(
+        os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+            "scrcpy-server",
+        )
+    )
+
+    for path in candidates:
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+class ScrcpyFrameSource:
+    """
+    Keeps the latest decoded screen frame of an Android device in memory.
+
+    Args:
+        device_id: Optional ADB device ID.
+        max_size: Maximum video dimension (0 keeps the native resolution).
+        max_fps: Maximum frame rate sent by the device.
+        bit_rate: Video bit rate in bits per second.
+
+    Example:
+        >>> source = ScrcpyFrameSource("emulator-5554")
+        >>> source.start()
+        >>> image = source.get_frame()
+        >>> source.stop()
+    """
+
+    def __init__(
+        self,
+        device_id: str | None = None,
+        max_size: int = 0,
+        max_fps: int = 15,
+        bit_rate: int = 8_000_000,
+    ):
+        self.device_id = device_id
+        self.max_size = max_size
+        self.max_fps = max_fps
+        self.bit_rate = bit_rate
+
+        self._scid = f"{random.getrandbits(31):08x}"
+        self._port: int | None = None
+        self._process: subprocess.Popen | None = None
+        self._socket: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+        self._lock = threading.Condition()
+        self._frame = None  # Latest av.VideoFrame
+        self._frame_index = 0
+        self._frame_time = 0.0
+        self._image_cache: tuple[int, Image.Image] | None = None
+
+        self.device_size: tuple[int, int] | None = None  # Native (width, height)
+        self.error: str | None = None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the decoding thread is alive."""
+        return self._running and self._thread is not None and self._thread.is_alive()
+
+    @property
+    def frame_age(self) -> float | None:
+        """Seconds since the latest frame was decoded, or None if no frame yet."""
+        with self._lock:
+            if self._frame is None:
+                return None
+            return time.time() - self._frame_time
+
+    def start(self, timeout: float = 10.0) -> bool:
+        """
+        Push and start scrcpy-server, then start decoding in the background.
+
+        Args:
+            timeout: Seconds to wait for the video stream to become available.
+
+        Returns:
+            True if the stream is running, False otherwise (see ``error``).
+        """
+        if self.is_running:
+            return True
+
+        server_path = find_server_binary()
+        if server_path is None:
+            self.error = "scrcpy-server binary not found"
+            return False
+
+        try:
+            import av  # noqa: F401
+        except ImportError:
+            self.error = "PyAV is required for scrcpy frames. Install: pip install av"
+            return False
+
+        adb_prefix = self._get_adb_prefix()
+        try:
+            subprocess.run(
+                adb_prefix + ["push", server_path, REMOTE_SERVER_PATH],
+                capture_output=True,
+                timeout=30,
+            )
+            self.device_size = self._query_device_size()
+
+            self._port = self._find_free_port()
+            subprocess.run(
+                adb_prefix
+                + ["forward", f"tcp:{self._port}", f"localabstract:scrcpy_{self._scid}"],
+                capture_output=True,
+                timeout=5,
+            )
+
+            self._process = subprocess.Popen(
+                adb_prefix + ["shell"] + self._server_command(),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+
+            self._socket = self._connect(timeout)
+        except Exception as e:
+            self.error = f"Failed to start scrcpy-server: {e}"
+            self.stop()
+            return False
+
+        stream = self._socket.makefile("rb")
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run_stream,
+            args=(stream, False),
+            name=f"scrcpy-{self.device_id or 'default'}",
+            daemon=True,
+        )
+        self._thread.start()
+        return True
+
+    def start_from_stream(self, stream: BinaryIO, device_meta: bool = False) -> None:
+        """
+        Decode a recorded scrcpy video stream instead of a device socket.
+
+        Args:
+            stream: Binary stream in scrcpy wire format (codec header followed
+                by framed packets), e.g. a file captured from the socket.
+            device_meta: Whether the stream starts with the 64-byte device name.
+        """
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run_stream, args=(stream, device_meta), daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop decoding and shut down the server and port forward."""
+        self._running = False
+
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+            self._socket = None
+
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+
+        if self._port is not None:
+            subprocess.run(
+                self._get_adb_prefix() + ["forward", "--remove", f"tcp:{self._port}"],
+                capture_output=True,
+                timeout=5,
+            )
+            self._port = None
+
+        with self._lock:
+            self._lock.notify_all()
+
+    def wait_for_frame(self, timeout: float = 5.0) -> bool:
+        """
+        Block until at least one frame has been decoded.
+
+        Args:
+            timeout: Maximum seconds to wait.
+
+        Returns:
+            True if a frame is available.
+        """
+        deadline = time.time() + timeout
+        with self._lock:
+            while self._frame is None and self._running:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._lock.wait(remaining)
+            return self._frame is not None
+
+    def get_frame(self) -> Image.Image | None:
+        """
+        Get the latest frame as an RGB image.
+
+        Returns:
+            The latest frame, or None if nothing has been decoded yet.
+        """
+        with self._lock:
+            frame, index = self._frame, self._frame_index
+            if frame is None:
+                return None
+            if self._image_cache is not None and self._image_cache[0] == index:
+                return self._image_cache[1]
+
+        image = frame.to_image()
+        with self._lock:
+            self._image_cache = (index, image)
+        return image
+
+    def get_frame_with_index(self) -> tuple[int, Image.Image | None]:
+        """Get the latest frame together with its sequence number."""
+        with self._lock:
+            index = self._frame_index
+        return index, self.get_frame()
+
+    def _run_stream(self, stream: BinaryIO, device_meta: bool) -> None:
+        """Read and decode the video stream until it ends or stop() is called."""
+        import av
+
+        try:
+            if device_meta:
+                _read_exact(stream, _DEVICE_NAME_LENGTH)
+
+            # Codec meta: codec id, initial width, initial height
+            _read_exact(stream, 12)
+
+            codec = av.CodecContext.create("h264", "r")
+            config_data = b""
+
+            while self._running:
+                header = _read_exact(stream, 12)
+                pts_flags, size = struct.unpack(">QI", header)
+                data = _read_exact(stream, size)
+
+                if pts_flags & _PACKET_FLAG_CONFIG:
+                    # SPS/PPS are sent separately and must prefix the next packet
+                    config_data = data
+                    continue
+                if config_data:
+                    data = config_data + data
+                    config_data = b""
+
+                packet = av.Packet(data)
+                packet.pts = pts_flags & _PACKET_PTS_MASK
+                for frame in codec.decode(packet):
+                    with self._lock:
+                        self._frame = frame
+                        self._frame_index += 1
+                        self._frame_time = time.time()
+                        self._lock.notify_all()
+        except EOFError:
+            pass
+        except Exception as e:
+            if self._running:
+                self.error = f"scrcpy stream error: {e}"
+        finally:
+            self._running = False
+            with self._lock:
+                self._lock.notify_all()
+
+    def _server_command(self) -> list[str]:
+        """Build the app_process command line for scrcpy-server."""
+        return [
+            f"CLASSPATH={REMOTE_SERVER_PATH}",
+            "app_process",
+            "/",
+            "com.genymobile.scrcpy.Server",
+            SCRCPY_SERVER_VERSION,
+            f"scid={self._scid}",
+            "log_level=warn",
+            "tunnel_forward=true",
+            "audio=false",
+            "control=false",
+            "video_codec=h264",
+            f"max_size={self.max_size}",
+            f"max_fps={self.max_fps}",
+            f"video_bit_rate={self.bit_rate}",
+            "send_device_meta=false",
+            "cleanup=true",
+        ]
+
+    def _connect(self, timeout: float) -> socket.socket:
+        """Connect to the forwarded port once the server is listening."""
+        deadline = time.time() + timeout
+        last_error: Exception | None = None
+
+        while time.time() < deadline:
+            if self._process is not None and self._process.poll() is not None:
+                raise RuntimeError("scrcpy-server exited during startup")
+            try:
+                sock = socket.create_connection(("127.0.0.1", self._port), timeout=timeout)
+            except OSError as e:
+                last_error = e
+                time.sleep(0.1)
+                continue
+            try:
+                # adb accepts the connection before the server listens; the
+                # server confirms with a dummy byte once it is ready
+                if sock.recv(1):
+                    sock.settimeout(None)
+                    return sock
+            except OSError as e:
+                last_error = e
+            sock.close()
+            time.sleep(0.1)
+
+        raise TimeoutError(f"scrcpy-server did not start: {last_error}")
+
+    def _query_device_size(self) -> tuple[int, int] | None:
+        """Read the native display size from `wm size`."""
+        result = subprocess.run(
+            self._get_adb_prefix() + ["shell", "wm", "size"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+        size = None
+        for line in result.stdout.splitlines():
+            # "Physical size: 1080x2400", optionally followed by "Override size"
+            if "size:" in line:
+                width, _, height = line.split(":", 1)[1].strip().partition("x")
+                if width.isdigit() and height.isdigit():
+                    size = (int(width), int(height))
+        return size
+
+    def _get_adb_prefix(self) -> list:
+        """Get ADB command prefix with optional device specifier."""
+        if self.device_id:
+            return ["adb", "-s", self.device_id]
+        return ["adb"]
+
+    @staticmethod
+    def _find_free_port() -> int:
+        """Pick a free local TCP port for the forward."""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(("127.0.0.1", 0))
+            return s.getsockname()[1]
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    """Read exactly ``size`` bytes or raise EOFError."""
+    data = stream.read(size)
+    if data is None or len(data) < size:
+        raise EOFError("scrcpy stream ended")
+    return data
+
+
+# Running frame sources by device ID ("" for the default device)
+_frame_sources: dict[str, ScrcpyFrameSource] = {}
+_frame_sources_lock = threading.Lock()
+
+
+def start_frame_source(device_id: str | None = None, **options) -> ScrcpyFrameSource | None:
+    """
+    Start (or reuse) the frame source for a device.
+
+    Args:
+        device_id: Optional ADB device ID.
+        **options: Options passed to ScrcpyFrameSource.
+
+    Returns:
+        The running frame source, or None if it could not be started.
+    """
+    key = device_id or ""
+    with _frame_sources_lock:
+        source = _frame_sources.get(key)
+        if source is not None and source.is_running:
+            return source
+
+        source = ScrcpyFrameSource(device_id, **options)
+        if not source.start():
+            print(f"scrcpy frame source unavailable: {source.error}")
+            return None
+        _frame_sources[key] = source
+
+    source.wait_for_frame()
+    return source
+
+
+def get_frame_source(device_id: str | None = None) -> ScrcpyFrameSource | None:
+    """Get the running frame source for a device, if any."""
+    source = _frame_sources.get(device_id or "")
+    if source is not None and source.is_running:
+        return source
+    return None
+
+
+def stop_frame_source(device_id: str | None = None) -> None:
+    """Stop the frame source for a device."""
+    with _frame_sources_lock:
+        source = _frame_sources.pop(device_id or "", None)
+    if source is not None:
+        source.stop()
+
+
+def stop_all_frame_sources() -> None:
+    """Stop all running frame sources."""
+    with _frame_sources_lock:
+        sources = list(_frame_sources.values())
+        _frame_sources.clear()
+    for source in sources:
+        source.stop()
+
+
+atexit.register(stop_all_frame_sources)
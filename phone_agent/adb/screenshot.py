@@ -6,11 +6,27 @@ import subprocess
 import tempfile
 import uuid
 from dataclasses import dataclass
+from enum import Enum
 from io import BytesIO
 from typing import Tuple
 
 from PIL import Image
 
+from phone_agent.adb.protocol import get_adb_client
+from phone_agent.adb.scrcpy import ScrcpyFrameSource, get_frame_source
+from phone_agent.adb.shell import ShellMode, exec_out, get_shell_mode, run_shell
+from phone_agent.imaging import encode_image, encode_image_bytes
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class CaptureMode(Enum):
+    """Method used to capture the Android screen."""
+
+    EXEC_OUT = "exec-out"  # Stream PNG bytes from `adb exec-out screencap -p`
+    PULL = "pull"  # Write PNG to /sdcard, then `adb pull` it
+    RAW = "raw"  # Stream the raw framebuffer and compress it on the host
+
 
 @dataclass
 class Screenshot:
@@ -20,6 +36,61 @@ class Screenshot:
     width: int
     height: int
     is_sensitive: bool = False
+    mime_type: str = "image/png"
+
+
+# Default capture mode, can be overridden via environment variable
+_CAPTURE_MODE = CaptureMode(os.getenv("PHONE_AGENT_ADB_CAPTURE_MODE", "exec-out"))
+
+# Per-device capture mode overrides
+_DEVICE_CAPTURE_MODES: dict[str, CaptureMode] = {}
+
+# Last screenshot encoded from each scrcpy frame source: id -> (frame index, screenshot)
+_SCRCPY_SCREENSHOTS: dict[int, tuple[int, Screenshot]] = {}
+
+# Rows sampled on the device for preview frames (see get_preview_frame)
+PREVIEW_ROWS = 64
+
+# Per device: (row size in bytes, height) of raw frames, or None if sampling
+# on the device does not work
+_PREVIEW_GEOMETRY: dict[str, tuple[int, int] | None] = {}
+
+# Raw screencap pixel formats: format id -> (bytes per pixel, PIL raw mode)
+# See android.graphics.PixelFormat / HAL_PIXEL_FORMAT_*
+_RAW_PIXEL_FORMATS = {
+    1: (4, "RGBX"),  # RGBA_8888 (alpha is always opaque on screen)
+    2: (4, "RGBX"),  # RGBX_8888
+    3: (3, "RGB"),  # RGB_888
+    4: (2, None),  # RGB_565, converted with NumPy
+    5: (4, "BGRX"),  # BGRA_8888
+}
+
+# Header sizes: width, height, format (12 bytes) plus a dataspace
+# field on Android 8.0+ (16 bytes)
+_RAW_HEADER_SIZES = (16, 12)
+
+
+def set_capture_mode(mode: CaptureMode | str, device_id: str | None = None) -> None:
+    """
+    Set the screenshot capture mode.
+
+    Args:
+        mode: CaptureMode or its string value ("exec-out", "pull" or "raw").
+        device_id: Optional ADB device ID. If given, only this device uses
+            the mode; otherwise the default for all devices is changed.
+    """
+    global _CAPTURE_MODE
+    if device_id:
+        _DEVICE_CAPTURE_MODES[device_id] = CaptureMode(mode)
+    else:
+        _CAPTURE_MODE = CaptureMode(mode)
+
+
+def get_capture_mode(device_id: str | None = None) -> CaptureMode:
+    """Get the capture mode used for a device."""
+    if device_id and device_id in _DEVICE_CAPTURE_MODES:
+        return _DEVICE_CAPTURE_MODES[device_id]
+    return _CAPTURE_MODE
 
 
 def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
@@ -36,48 +107,416 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
     Note:
         If the screenshot fails (e.g., on sensitive screens like payment pages),
         a black fallback image is returned with is_sensitive=True.
+        In exec-out and raw modes, any unexpected output falls back to the
+        pull method.
+    """
+    # Prefer the in-memory frame of a running scrcpy frame source
+    source = get_frame_source(device_id)
+    if source is not None:
+        screenshot = get_scrcpy_screenshot(source)
+        if screenshot is not None:
+            return screenshot
+
+    mode = get_capture_mode(device_id)
+
+    screenshot = None
+    if mode == CaptureMode.EXEC_OUT:
+        screenshot = _get_screenshot_exec_out(device_id, timeout)
+    elif mode == CaptureMode.RAW:
+        screenshot = _get_screenshot_raw(device_id, timeout)
+
+    if screenshot is not None:
+        return screenshot
+
+    return _get_screenshot_pull(device_id, timeout)
+
+
+def _get_screenshot_exec_out(device_id: str | None, timeout: int) -> Screenshot | None:
+    """
+    Capture a screenshot by reading PNG bytes straight from screencap stdout.
+
+    Returns:
+        Screenshot object, or None if the caller should fall back to pull mode.
+    """
+    try:
+        result = exec_out(["screencap", "-p"], device_id, timeout=timeout)
+    except Exception as e:
+        print(f"Screenshot exec-out error: {e}")
+        return None
+
+    return parse_png_screenshot(result.stdout, result.stderr)
+
+
+def parse_png_screenshot(data: bytes, stderr: bytes = b"") -> Screenshot | None:
     """
+    Build a screenshot from `screencap -p` output.
+
+    Returns:
+        Screenshot object, a sensitive fallback for protected screens, or
+        None if the caller should fall back to pull mode.
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        # screencap reports failures as text (e.g. on secure windows)
+        output = (data + stderr).decode("utf-8", errors="ignore")
+        if "Status: -1" in output or "Failed" in output:
+            return _create_fallback_screenshot(is_sensitive=True)
+        return None
+
+    try:
+        width, height = _get_png_size(data)
+    except ValueError:
+        return None
+
+    base64_data, mime_type = encode_image_bytes(data, width, height)
+    return Screenshot(
+        base64_data=base64_data,
+        width=width,
+        height=height,
+        is_sensitive=False,
+        mime_type=mime_type,
+    )
+
+
+def get_scrcpy_screenshot(source: ScrcpyFrameSource) -> Screenshot | None:
+    """
+    Build a screenshot from the latest frame of a scrcpy frame source.
+
+    The reported size is the native device size (in the frame's orientation),
+    so coordinate conversion stays correct when the video is downscaled.
+    """
+    index, img = source.get_frame_with_index()
+    if img is None:
+        return None
+
+    cached = _SCRCPY_SCREENSHOTS.get(id(source))
+    if cached is not None and cached[0] == index:
+        return cached[1]
+
+    width, height = img.size
+    if source.device_size is not None:
+        short_side, long_side = sorted(source.device_size)
+        if width > height:
+            width, height = long_side, short_side
+        else:
+            width, height = short_side, long_side
+
+    base64_data, mime_type = encode_image(img)
+    screenshot = Screenshot(
+        base64_data=base64_data,
+        width=width,
+        height=height,
+        is_sensitive=False,
+        mime_type=mime_type,
+    )
+    _SCRCPY_SCREENSHOTS[id(source)] = (index, screenshot)
+    return screenshot
+
+
+def _get_screenshot_raw(device_id: str | None, timeout: int) -> Screenshot | None:
+    """
+    Capture the raw framebuffer and encode it on the host.
+
+    Skipping on-device PNG compression is much faster on mid-range phones.
+
+    Returns:
+        Screenshot object, or None if the caller should fall back to pull mode.
+    """
+    data = get_raw_frame_bytes(device_id, timeout)
+    if data is None:
+        return None
+    if not data:
+        return _create_fallback_screenshot(is_sensitive=True)
+
+    try:
+        img = raw_frame_to_image(data)
+    except ImportError:
+        print("Note: numpy library not installed. Install: pip install numpy")
+        return None
+    except ValueError as e:
+        print(f"Screenshot raw error: {e}")
+        return None
+
+    base64_data, mime_type = encode_image(img)
+    return Screenshot(
+        base64_data=base64_data,
+        width=img.width,
+        height=img.height,
+        is_sensitive=False,
+        mime_type=mime_type,
+    )
+
+
+def get_raw_frame_bytes(device_id: str | None = None, timeout: int = 10) -> bytes | None:
+    """
+    Read an uncompressed frame from `adb exec-out screencap`.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        timeout: Timeout in seconds.
+
+    Returns:
+        Raw screencap output (header plus pixels), empty bytes if the screen
+        is protected, or None if the command failed.
+    """
+    try:
+        result = exec_out(["screencap"], device_id, timeout=timeout)
+    except Exception as e:
+        print(f"Screenshot raw error: {e}")
+        return None
+
+    return check_raw_frame(result.stdout, result.stderr)
+
+
+def check_raw_frame(data: bytes, stderr: bytes = b"") -> bytes | None:
+    """Validate raw `screencap` output; see get_raw_frame_bytes() for results."""
+    if len(data) < _RAW_HEADER_SIZES[-1]:
+        output = (data + stderr).decode("utf-8", errors="ignore")
+        if "Status: -1" in output or "Failed" in output:
+            return b""
+        return None
+    return data
+
+
+def get_preview_frame(device_id: str | None = None, step: int = 8):
+    """
+    Capture a cheap low-resolution frame for change detection.
+
+    Uses the in-memory frame of the scrcpy frame source if one is running.
+    Otherwise the frame is sampled on the device: screencap streams into
+    ``dd``, which returns only ``PREVIEW_ROWS`` evenly spaced rows, about 3%
+    of the frame. Nothing is written to device storage. The first call per
+    device reads one full raw frame to learn the row size; devices where
+    sampling fails keep using full raw frames, strided on the host.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        step: Keep every ``step``-th byte of each sampled row.
+
+    Returns:
+        A small uint8 NumPy array.
+
+    Raises:
+        RuntimeError: If no frame could be captured.
+    """
+    frame = scrcpy_preview_frame(device_id, step)
+    if frame is not None:
+        return frame
+
+    command = preview_command(device_id)
+    if command is not None:
+        try:
+            result = exec_out([command], device_id)
+        except Exception as e:
+            print(f"Screen sampling error: {e}")
+        else:
+            frame = preview_from_samples(device_id, result.stdout, step)
+            if frame is not None:
+                return frame
+
+    data = get_raw_frame_bytes(device_id)
+    if not data:
+        raise RuntimeError("Raw screen capture unavailable")
+    return preview_from_raw(device_id, data, step)
+
+
+def scrcpy_preview_frame(device_id: str | None, step: int = 8):
+    """
+    Preview frame from the in-memory frame of a running scrcpy frame source.
+
+    Returns:
+        A small grayscale uint8 NumPy array, or None without a frame source.
+    """
+    import numpy as np
+
+    source = get_frame_source(device_id)
+    if source is None:
+        return None
+    img = source.get_frame()
+    if img is None:
+        return None
+    return np.asarray(img.reduce(step).convert("L"))
+
+
+def _preview_rows(height: int) -> list[int]:
+    """Indices of the rows sampled for preview frames."""
+    rows = min(PREVIEW_ROWS, height)
+    return [i * height // rows for i in range(rows)]
+
+
+def preview_command(device_id: str | None) -> str | None:
+    """
+    Device command printing the sampled rows of a fresh raw frame.
+
+    The raw frame is piped through a loop of ``dd`` reads; each skips to the
+    next sampled row and copies it. ``iflag=fullblock`` keeps short pipe
+    reads from shifting the rows; a ``dd`` without it fails, and the
+    malformed output disables sampling for the device.
+
+    Returns:
+        The command, or None until the frame geometry is known or if
+        sampling does not work on the device.
+    """
+    geometry = _PREVIEW_GEOMETRY.get(device_id or "")
+    if geometry is None:
+        return None
+    row_bytes, height = geometry
+    rows = _preview_rows(height)
+    # Blocks are counted from the stream start, so each one holds a row
+    # shifted by the header size; that is the same in every frame, which is
+    # all a change comparison needs
+    skips = " ".join(str(row - prev - 1) for prev, row in zip([-1] + rows, rows))
+    return (
+        f"screencap | for s in {skips}; do "
+        f"dd bs={row_bytes} skip=$s count=1 iflag=fullblock 2>/dev/null; done"
+    )
+
+
+def preview_from_samples(device_id: str | None, data: bytes, step: int):
+    """
+    Build a preview frame from the output of preview_command().
+
+    Returns:
+        The frame, or None if the output is malformed; sampling is then
+        disabled for the device.
+    """
+    import numpy as np
+
+    key = device_id or ""
+    row_bytes, height = _PREVIEW_GEOMETRY[key]
+    rows = len(_preview_rows(height))
+    if len(data) != rows * row_bytes:
+        print("Screen sampling on the device failed, reading full frames")
+        _PREVIEW_GEOMETRY[key] = None
+        return None
+    return np.frombuffer(data, dtype=np.uint8).reshape(rows, row_bytes)[:, ::step].copy()
+
+
+def preview_from_raw(device_id: str | None, data: bytes, step: int):
+    """Build a preview frame from full raw screencap output, as the device would."""
+    import numpy as np
+
+    key = device_id or ""
+    pixels, _ = parse_raw_frame(data)
+    height, width, bytes_per_pixel = pixels.shape
+    row_bytes = width * bytes_per_pixel
+    if key not in _PREVIEW_GEOMETRY:
+        _PREVIEW_GEOMETRY[key] = (row_bytes, height)
+
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    rows = [buffer[r * row_bytes:(r + 1) * row_bytes] for r in _preview_rows(height)]
+    return np.stack(rows)[:, ::step].copy()
+
+
+def parse_raw_frame(data: bytes):
+    """
+    Parse raw screencap output into a NumPy pixel array without copying.
+
+    Args:
+        data: Raw screencap output.
+
+    Returns:
+        Tuple of (pixels, raw_mode) where pixels is a (height, width, bpp)
+        uint8 array viewing ``data`` and raw_mode is the PIL raw mode (None
+        for RGB_565).
+
+    Raises:
+        ValueError: If the header or pixel format is not recognized.
+    """
+    import numpy as np
+
+    width, height, pixel_format = np.frombuffer(data, dtype="<u4", count=3)
+    width, height, pixel_format = int(width), int(height), int(pixel_format)
+    if pixel_format not in _RAW_PIXEL_FORMATS:
+        raise ValueError(f"Unsupported pixel format: {pixel_format}")
+
+    bpp, raw_mode = _RAW_PIXEL_FORMATS[pixel_format]
+    payload = width * height * bpp
+    header_size = len(data) - payload
+    if header_size not in _RAW_HEADER_SIZES:
+        # Some builds append padding; prefer the larger header when it fits
+        fitting = [size for size in _RAW_HEADER_SIZES if size <= header_size]
+        if not fitting:
+            raise ValueError(f"Truncated frame: {len(data)} bytes for {width}x{height}")
+        header_size = fitting[0]
+
+    pixels = np.frombuffer(data, dtype=np.uint8, count=payload, offset=header_size)
+    return pixels.reshape(height, width, bpp), raw_mode
+
+
+def raw_frame_to_image(data: bytes) -> Image.Image:
+    """
+    Convert raw screencap output to an RGB PIL image.
+
+    Args:
+        data: Raw screencap output.
+
+    Returns:
+        RGB image.
+    """
+    import numpy as np
+
+    pixels, raw_mode = parse_raw_frame(data)
+    height, width = pixels.shape[:2]
+
+    if raw_mode is not None:
+        # RGBX frames are mapped directly onto the buffer without copying
+        img = Image.frombuffer("RGB", (width, height), pixels, "raw", raw_mode, 0, 1)
+        return img if img.mode == "RGB" else img.convert("RGB")
+
+    # RGB_565: expand 5/6/5-bit channels to 8 bits
+    value = pixels.view("<u2")[:, :, 0]
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    rgb[:, :, 0] = (value >> 11) << 3
+    rgb[:, :, 1] = ((value >> 5) & 0x3F) << 2
+    rgb[:, :, 2] = (value & 0x1F) << 3
+    return Image.fromarray(rgb, "RGB")
+
+
+def _get_screenshot_pull(device_id: str | None, timeout: int) -> Screenshot:
+    """Capture a screenshot via screencap to /sdcard followed by adb pull."""
     temp_path = os.path.join(tempfile.gettempdir(), f"screenshot_{uuid.uuid4()}.png")
     adb_prefix = _get_adb_prefix(device_id)
 
     try:
         # Execute screenshot command
-        result = subprocess.run(
-            adb_prefix + ["shell", "screencap", "-p", "/sdcard/tmp.png"],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
+        result = run_shell(["screencap", "-p", "/sdcard/tmp.png"], device_id, timeout)
 
         # Check for screenshot failure (sensitive screen)
         output = result.stdout + result.stderr
         if "Status: -1" in output or "Failed" in output:
             return _create_fallback_screenshot(is_sensitive=True)
 
-        # Pull screenshot to local temp path
-        subprocess.run(
-            adb_prefix + ["pull", "/sdcard/tmp.png", temp_path],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
+        if get_shell_mode() == ShellMode.NATIVE:
+            # Read the file over the sync service without a temp file
+            data = get_adb_client().pull(device_id, "/sdcard/tmp.png", timeout=5)
+        else:
+            # Pull screenshot to local temp path
+            subprocess.run(
+                adb_prefix + ["pull", "/sdcard/tmp.png", temp_path],
+                capture_output=True,
+                text=True,
+                timeout=5,
+            )
 
-        if not os.path.exists(temp_path):
-            return _create_fallback_screenshot(is_sensitive=False)
+            if not os.path.exists(temp_path):
+                return _create_fallback_screenshot(is_sensitive=False)
 
-        # Read and encode image
-        img = Image.open(temp_path)
-        width, height = img.size
+            with open(temp_path, "rb") as f:
+                data = f.read()
 
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+            # Cleanup
+            os.remove(temp_path)
 
-        # Cleanup
-        os.remove(temp_path)
+        # The file is already a PNG, so only the header is needed for the size
+        width, height = _get_png_size(data)
+        base64_data, mime_type = encode_image_bytes(data, width, height)
 
         return Screenshot(
-            base64_data=base64_data, width=width, height=height, is_sensitive=False
+            base64_data=base64_data,
+            width=width,
+            height=height,
+            is_sensitive=False,
+            mime_type=mime_type,
         )
 
     except Exception as e:
@@ -85,6 +524,15 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
         return _create_fallback_screenshot(is_sensitive=False)
 
 
+def _get_png_size(data: bytes) -> Tuple[int, int]:
+    """Read image dimensions from the PNG IHDR chunk without decoding pixels."""
+    if len(data) < 24 or not data.startswith(PNG_SIGNATURE) or data[12:16] != b"IHDR":
+        raise ValueError("Invalid PNG data")
+    width = int.from_bytes(data[16:20], "big")
+    height = int.from_bytes(data[20:24], "big")
+    return width, height
+
+
 def _get_adb_prefix(device_id: str | None) -> list:
     """Get ADB command prefix with optional device specifier."""
     if device_id:
@@ -0,0 +1,349 @@
+"""Persistent ADB shell sessions for low-latency device commands.
+
+Spawning ``adb shell <cmd>`` for every tap or keyevent pays process spawn,
+adb server handshake and shell startup costs each time. A session keeps one
+``adb shell`` process per device and frames each command's output with a
+unique sentinel line, so consecutive commands reuse the same shell.
+
+The mode is selected with PHONE_AGENT_ADB_SHELL_MODE:
+    - persistent: Reuse a long-lived shell per device (default)
+    - native: Talk to the ADB server socket directly (see protocol.py)
+    - spawn: Start a new ``adb shell`` process for every command
+"""
+
+import atexit
+import os
+import queue
+import socket
+import subprocess
+import threading
+import time
+import uuid
+from enum import Enum
+
+from phone_agent.adb.protocol import ADBProtocolError, get_adb_client
+
+
+class ShellMode(str, Enum):
+    """How shell commands are sent to the device."""
+
+    PERSISTENT = "persistent"
+    NATIVE = "native"
+    SPAWN = "spawn"
+
+
+_SHELL_MODE = ShellMode(os.getenv("PHONE_AGENT_ADB_SHELL_MODE", "persistent"))
+
+
+def set_shell_mode(mode: ShellMode | str) -> None:
+    """
+    Set how shell commands are sent to devices.
+
+    Args:
+        mode: "persistent", "native" or "spawn".
+    """
+    global _SHELL_MODE
+    _SHELL_MODE = ShellMode(mode)
+    if _SHELL_MODE != ShellMode.PERSISTENT:
+        close_all_shell_sessions()
+
+
+def get_shell_mode() -> ShellMode:
+    """Get the current shell mode."""
+    return _SHELL_MODE
+
+
+class ShellInterruptedError(Exception):
+    """Raised when the shell exits after a command was sent to it."""
+
+
+class ADBShellSession:
+    """
+    A long-lived ``adb shell`` process with sentinel-delimited commands.
+
+    Each command is written to the shell's stdin followed by an ``echo`` of a
+    unique sentinel and the exit status. Output is read until the sentinel
+    line appears. A shell that died between commands is restarted
+    automatically; one that dies while a command runs raises
+    ShellInterruptedError instead, since running the command again could
+    repeat an action such as a tap.
+
+    Args:
+        device_id: Optional ADB device ID.
+
+    Example:
+        >>> session = ADBShellSession("emulator-5554")
+        >>> session.run("input tap 500 1000").returncode
+        0
+        >>> session.close()
+    """
+
+    def __init__(self, device_id: str | None = None):
+        self.device_id = device_id
+        self._process: subprocess.Popen | None = None
+        self._lines: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the shell process is running."""
+        return self._process is not None and self._process.poll() is None
+
+    def run(self, command: str, timeout: float | None = 10) -> subprocess.CompletedProcess:
+        """
+        Run a command in the shell.
+
+        Args:
+            command: Shell command line.
+            timeout: Timeout in seconds (None waits forever).
+
+        Returns:
+            CompletedProcess with the exit status and combined stdout/stderr.
+
+        Raises:
+            subprocess.TimeoutExpired: If the command does not finish in time.
+                The shell is closed and restarted on the next command.
+            RuntimeError: If the shell cannot be started.
+            ShellInterruptedError: If the shell exits after the command was
+                sent. The command may or may not have run, so it is not
+                retried.
+        """
+        with self._lock:
+            try:
+                sentinel = self._send_locked(command)
+            except OSError:
+                # The shell died between commands and nothing was sent:
+                # reconnect and retry once
+                self._close_locked()
+                sentinel = self._send_locked(command)
+            return self._read_locked(command, sentinel, timeout)
+
+    def close(self) -> None:
+        """Terminate the shell process."""
+        with self._lock:
+            self._close_locked()
+
+    def _send_locked(self, command: str) -> str:
+        """Write a command to the shell; the caller holds the lock.
+
+        Returns:
+            The sentinel that ends the command's output.
+        """
+        if not self.is_alive:
+            self._start()
+
+        sentinel = f"__PHONE_AGENT_{uuid.uuid4().hex}__"
+        # stdin is redirected so commands cannot consume the session's input
+        script = f"{command} </dev/null 2>&1; __rc=$?; echo; echo {sentinel} $__rc\n"
+        self._process.stdin.write(script.encode("utf-8"))
+        self._process.stdin.flush()
+        return sentinel
+
+    def _read_locked(
+        self, command: str, sentinel: str, timeout: float | None
+    ) -> subprocess.CompletedProcess:
+        """Read a sent command's output up to its sentinel; the caller holds the lock."""
+        deadline = None if timeout is None else time.time() + timeout
+        output = []
+        while True:
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                self._close_locked()
+                raise subprocess.TimeoutExpired(command, timeout)
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                self._close_locked()
+                raise ShellInterruptedError(
+                    f"adb shell exited while running {command!r}"
+                )
+
+            text = line.decode("utf-8", errors="replace").rstrip("\r\n")
+            if text.startswith(sentinel):
+                status = text[len(sentinel):].strip()
+                returncode = int(status) if status.lstrip("-").isdigit() else -1
+                break
+            output.append(text)
+
+        # Drop the blank line emitted before the sentinel
+        if output and output[-1] == "":
+            output.pop()
+        stdout = "\n".join(output) + ("\n" if output else "")
+        return subprocess.CompletedProcess(command, returncode, stdout, "")
+
+    def _start(self) -> None:
+        """Start the shell process and its output reader thread."""
+        self._close_locked()
+        try:
+            self._process = subprocess.Popen(
+                _get_adb_prefix(self.device_id) + ["shell", "sh"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+            )
+        except OSError as e:
+            raise RuntimeError(f"Failed to start adb shell: {e}") from e
+
+        self._lines = queue.Queue()
+        threading.Thread(
+            target=self._read_output,
+            args=(self._process.stdout, self._lines),
+            name=f"adb-shell-{self.device_id or 'default'}",
+            daemon=True,
+        ).start()
+
+    @staticmethod
+    def _read_output(stdout, lines: queue.Queue) -> None:
+        """Forward shell output lines to the queue; None marks EOF."""
+        try:
+            for line in iter(stdout.readline, b""):
+                lines.put(line)
+        except (OSError, ValueError):
+            pass
+        lines.put(None)
+
+    def _close_locked(self) -> None:
+        """Terminate the shell process; the caller holds the lock."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+# Shell sessions by device ID ("" for the default device)
+_sessions: dict[str, ADBShellSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_shell_session(device_id: str | None = None) -> ADBShellSession:
+    """Get (or create) the persistent shell session for a device."""
+    key = device_id or ""
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = ADBShellSession(device_id)
+            _sessions[key] = session
+        return session
+
+
+def close_shell_session(device_id: str | None = None) -> None:
+    """Close the persistent shell session for a device."""
+    with _sessions_lock:
+        session = _sessions.pop(device_id or "", None)
+    if session is not None:
+        session.close()
+
+
+def close_all_shell_sessions() -> None:
+    """Close all persistent shell sessions."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+atexit.register(close_all_shell_sessions)
+
+
+def run_shell(
+    args: list[str], device_id: str | None = None, timeout: float | None = 10
+) -> subprocess.CompletedProcess:
+    """
+    Run a shell command on the device.
+
+    Arguments are joined with spaces, as ``adb shell`` itself does.
+
+    Args:
+        args: Command and arguments, e.g. ["input", "tap", "500", "1000"].
+        device_id: Optional ADB device ID.
+        timeout: Timeout in seconds.
+
+    Returns:
+        CompletedProcess with the exit status and text output.
+
+    Raises:
+        ShellInterruptedError: If the persistent shell exits mid-command.
+    """
+    command = " ".join(args)
+    if _SHELL_MODE == ShellMode.PERSISTENT:
+        try:
+            return get_shell_session(device_id).run(command, timeout=timeout)
+        except (RuntimeError, OSError) as e:
+            # The command was not sent; ShellInterruptedError propagates
+            # because spawning would run it a second time
+            print(f"Persistent adb shell failed, spawning instead: {e}")
+    elif _SHELL_MODE == ShellMode.NATIVE:
+        try:
+            result = get_adb_client().shell(device_id, command, timeout=timeout)
+            return subprocess.CompletedProcess(
+                command,
+                result.returncode,
+                (result.stdout + result.stderr).decode("utf-8", errors="replace"),
+                "",
+            )
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(command, timeout)
+        except (ADBProtocolError, EOFError, OSError) as e:
+            print(f"ADB server request failed, spawning instead: {e}")
+
+    return subprocess.run(
+        _get_adb_prefix(device_id) + ["shell"] + args,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        timeout=timeout,
+    )
+
+
+def exec_out(
+    args: list[str], device_id: str | None = None, timeout: float | None = 10
+) -> subprocess.CompletedProcess:
+    """
+    Run a command and capture its binary stdout, like ``adb exec-out``.
+
+    Uses the ADB server socket in native mode and the adb binary otherwise.
+
+    Args:
+        args: Command and arguments, e.g. ["screencap", "-p"].
+        device_id: Optional ADB device ID.
+        timeout: Timeout in seconds.
+
+    Returns:
+        CompletedProcess with bytes stdout and stderr.
+    """
+    if _SHELL_MODE == ShellMode.NATIVE:
+        command = " ".join(args)
+        try:
+            data = get_adb_client().exec_out(device_id, command, timeout=timeout)
+            return subprocess.CompletedProcess(command, 0, data, b"")
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(command, timeout)
+        except (ADBProtocolError, EOFError, OSError) as e:
+            print(f"ADB server request failed, spawning instead: {e}")
+
+    return subprocess.run(
+        _get_adb_prefix(device_id) + ["exec-out"] + args,
+        capture_output=True,
+        timeout=timeout,
+    )
+
+
+def _get_adb_prefix(device_id: str | None) -> list:
+    """Get ADB command prefix with optional device specifier."""
+    if device_id:
+        return ["adb", "-s", device_id]
+    return ["adb"]
@@ -1,16 +1,40 @@
 """Main PhoneAgent class for orchestrating phone automation."""
 
 import json
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Callable
 
 from phone_agent.actions import ActionHandler
-from phone_agent.actions.handler import do, finish, parse_action
+from phone_agent.actions.handler import finish, parse_action
+from phone_agent.agent_common import (
+    StepResult,
+    append_screen_message,
+    is_finished,
+    make_cache_key,
+    model_error_result,
+    parse_reply,
+    print_thinking_header,
+    step_result,
+    timed,
+)
 from phone_agent.config import get_messages, get_system_prompt
-from phone_agent.device_factory import get_device_factory
+from phone_agent.device_factory import DeviceFactory, get_device_factory
+from phone_agent.imaging import dhash_base64
 from phone_agent.model import ModelClient, ModelConfig
-from phone_agent.model.client import MessageBuilder
+from phone_agent.model.cache import CacheKey
+from phone_agent.model.context import PREFIX_CACHE_BLOCK, ContextConfig, ContextManager
+from phone_agent.telemetry import (
+    OBSERVE_TRACK,
+    STEP_SPAN,
+    STEP_TRACK,
+    TaskTrace,
+    reset_current_trace,
+    set_current_trace,
+)
+from phone_agent.trajectory import Trajectory, TrajectoryStep, TrajectoryStore
 
 
 @dataclass
@@ -22,21 +46,19 @@ class AgentConfig:
     lang: str = "cn"
     system_prompt: str | None = None
     verbose: bool = True
+    # Static system prompt first, date and task in the first user turn, and
+    # block-wise history compaction, so serving engines can reuse the prefix
+    prefix_cache: bool = False
+    use_scrcpy: bool = False  # Read screenshots from a persistent scrcpy stream
+    record_trajectory: bool = False  # Save successful runs for model-free replay
+    replay: bool = False  # Replay a recorded trajectory before asking the model
+    replay_max_distance: int = 10  # Screen hash tolerance in bits (of 256)
 
     def __post_init__(self):
         if self.system_prompt is None:
-            self.system_prompt = get_system_prompt(self.lang)
-
-
-@dataclass
-class StepResult:
-    """Result of a single agent step."""
-
-    success: bool
-    finished: bool
-    action: dict[str, Any] | None
-    thinking: str
-    message: str | None = None
+            self.system_prompt = get_system_prompt(
+                self.lang, include_date=not self.prefix_cache
+            )
 
 
 class PhoneAgent:
@@ -51,6 +73,9 @@ class PhoneAgent:
         agent_config: Configuration for the agent behavior.
         confirmation_callback: Optional callback for sensitive action confirmation.
         takeover_callback: Optional callback for takeover requests.
+        device_factory: Device backend (ADB or HDC) for this agent. Defaults to
+            the global factory; pass one per agent to drive several devices of
+            different types from one process.
 
     Example:
         >>> from phone_agent import PhoneAgent
@@ -67,19 +92,35 @@ class PhoneAgent:
         agent_config: AgentConfig | None = None,
         confirmation_callback: Callable[[str], bool] | None = None,
         takeover_callback: Callable[[str], None] | None = None,
+        device_factory: DeviceFactory | None = None,
     ):
         self.model_config = model_config or ModelConfig()
         self.agent_config = agent_config or AgentConfig()
+        self.device_factory = device_factory or get_device_factory()
 
         self.model_client = ModelClient(self.model_config)
         self.action_handler = ActionHandler(
             device_id=self.agent_config.device_id,
             confirmation_callback=confirmation_callback,
             takeover_callback=takeover_callback,
+            device_factory=self.device_factory,
         )
 
-        self._context: list[dict[str, Any]] = []
+        self._context = ContextManager(
+            ContextConfig(compact_block=PREFIX_CACHE_BLOCK)
+            if self.agent_config.prefix_cache
+            else None
+        )
         self._step_count = 0
+        self._task: str | None = None
+        self._actions: list[str] = []  # Action texts of this task, for the cache
+        self._model_time = 0.0  # Seconds spent waiting for the model this task
+        self._last_result: StepResult | None = None
+        self._trace: TaskTrace | None = None  # Stage spans of the current task
+        self._recording: Trajectory | None = None
+        self._trajectory_store: TrajectoryStore | None = None
+        self._frame_source_started: bool | None = None  # None until attempted
+        self._observe_executor: ThreadPoolExecutor | None = None
 
     def run(self, task: str) -> str:
         """
@@ -91,23 +132,48 @@ class PhoneAgent:
         Returns:
             Final message from the agent.
         """
-        self._context = []
+        self._context.clear()
         self._step_count = 0
+        self._actions = []
+        self._model_time = 0.0
+        self._last_result = None
+        self._recording = (
+            Trajectory(task=task) if self.agent_config.record_trajectory else None
+        )
+        self._start_trace(task)
+        trace_token = set_current_trace(self._trace)
 
-        # First step with user prompt
-        result = self._execute_step(task, is_first=True)
-
-        if result.finished:
-            return result.message or "Task completed"
-
-        # Continue until finished or max steps reached
-        while self._step_count < self.agent_config.max_steps:
-            result = self._execute_step(is_first=False)
-
-            if result.finished:
-                return result.message or "Task completed"
-
-        return "Max steps reached"
+        try:
+            if self.agent_config.replay:
+                # Replayed steps need no model; the model resumes on divergence
+                result = self._replay(task)
+                self._last_result = result
+                if result is not None and result.finished:
+                    return result.message or "Task completed"
+                if len(self._context) > 0:
+                    # Open the model connection while the next screen is taken
+                    self.model_client.prewarm()
+
+            if len(self._context) == 0:
+                # First step with user prompt
+                result = self._execute_step(task, is_first=True)
+                self._last_result = result
+
+                if result.finished:
+                    return result.message or "Task completed"
+
+            # Continue until finished or max steps reached
+            while self._step_count < self.agent_config.max_steps:
+                result = self._execute_step(is_first=False)
+                self._last_result = result
+
+                if result.finished:
+                    return result.message or "Task completed"
+
+            return "Max steps reached"
+        finally:
+            self._release_device()
+            reset_current_trace(trace_token)
 
     def step(self, task: str | None = None) -> StepResult:
         """
@@ -126,128 +192,344 @@ class PhoneAgent:
         if is_first and not task:
             raise ValueError("Task is required for the first step")
 
-        return self._execute_step(task, is_first)
+        if is_first or self._trace is None:
+            self._start_trace(task)
+        trace_token = set_current_trace(self._trace)
+        try:
+            return self._execute_step(task, is_first)
+        finally:
+            reset_current_trace(trace_token)
 
     def reset(self) -> None:
         """Reset the agent state for a new task."""
-        self._context = []
+        self._context.clear()
         self._step_count = 0
+        self._actions = []
+        self._model_time = 0.0
+        self._last_result = None
+        self._trace = None
+        self._recording = None
+        self._release_device()
+
+    def _start_trace(self, task: str | None) -> None:
+        """Start collecting stage spans for a new task."""
+        self._trace = TaskTrace(task=task, device_id=self.agent_config.device_id)
+
+    def _release_device(self) -> None:
+        """Restore the keyboard, stop the frame source and the observe thread after a task."""
+        self.action_handler.reset()
+        if self._frame_source_started:
+            self.device_factory.stop_frame_source(self.agent_config.device_id)
+        self._frame_source_started = None
+        if self._observe_executor is not None:
+            self._observe_executor.shutdown(wait=False)
+            self._observe_executor = None
 
     def _execute_step(
         self, user_prompt: str | None = None, is_first: bool = False
     ) -> StepResult:
-        """Execute a single step of the agent loop."""
+        """Execute a single step of the agent loop, timing its stages."""
         self._step_count += 1
+        self._trace.step = self._step_count
+        with self._trace.span(STEP_SPAN, STEP_TRACK):
+            return self._run_step(user_prompt, is_first)
+
+    def _run_step(self, user_prompt: str | None, is_first: bool) -> StepResult:
+        """Observe, ask the model and act; the body of _execute_step()."""
+        trace = self._trace
+        step_start = time.time()
+
+        if is_first:
+            # Open the model connection while the first screenshot is taken
+            self.model_client.prewarm()
 
         # Capture current screen state
-        device_factory = get_device_factory()
-        screenshot = device_factory.get_screenshot(self.agent_config.device_id)
-        current_app = device_factory.get_current_app(self.agent_config.device_id)
+        screenshot, current_app, timings = self._observe(self._prepare_capture())
 
         # Build messages
-        if is_first:
-            self._context.append(
-                MessageBuilder.create_system_message(self.agent_config.system_prompt)
-            )
+        with trace.span("context_build"):
+            self._append_screen_message(user_prompt, current_app, screenshot, is_first)
+            messages = self._context.build()
+            cache_key = self._cache_key(screenshot)
 
-            screen_info = MessageBuilder.build_screen_info(current_app)
-            text_content = f"{user_prompt}\n\n{screen_info}"
+        # Get model response
+        request_start = time.time()
+        try:
+            print_thinking_header(self.agent_config.lang)
+            response = self.model_client.request(messages, cache_key=cache_key)
+            self._model_time += (response.total_time or 0.0) + response.queue_wait_time
+            trace.add_model_response(response, request_start)
+        except Exception as e:
+            trace.add("model_error", request_start, time.time() - request_start)
+            return model_error_result(e, timings, self.agent_config.verbose)
 
-            self._context.append(
-                MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
-                )
-            )
-        else:
-            screen_info = MessageBuilder.build_screen_info(current_app)
-            text_content = f"** Screen Info **\n\n{screen_info}"
+        # Parse action from response
+        with trace.span("action_parse"):
+            action, parsed = parse_reply(response, self.agent_config)
+        if not parsed:
+            # A reply that did not parse cannot be replayed
+            self._recording = None
+
+        # Remove image from context to save space
+        self._context.remove_images()
 
-            self._context.append(
-                MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
+        # Execute action (post-action waits are recorded inside this span)
+        with trace.span("action_execute", action=action.get("action")):
+            try:
+                result = self.action_handler.execute(
+                    action, screenshot.width, screenshot.height
+                )
+            except Exception as e:
+                if self.agent_config.verbose:
+                    traceback.print_exc()
+                result = self.action_handler.execute(
+                    finish(message=str(e)), screenshot.width, screenshot.height
                 )
+
+        # Add assistant response to context
+        self._context.add_response(response.thinking, response.action)
+        self._actions.append(response.action)
+        if self._recording is not None:
+            self._record_step(
+                self._screen_hash(screenshot),
+                current_app,
+                response.thinking,
+                response.action,
+                step_start,
             )
 
-        # Get model response
-        try:
-            msgs = get_messages(self.agent_config.lang)
-            print("\n" + "=" * 50)
-            print(f"💭 {msgs['thinking']}:")
-            print("-" * 50)
-            response = self.model_client.request(self._context)
-        except Exception as e:
-            if self.agent_config.verbose:
-                traceback.print_exc()
-            return StepResult(
-                success=False,
-                finished=True,
-                action=None,
-                thinking="",
-                message=f"Model error: {e}",
+        if is_finished(action, result):
+            self._save_recording(action, result.success)
+        return step_result(action, result, response, timings, self.agent_config)
+
+    def _prepare_capture(self):
+        """Get the device factory, starting the frame source on first use."""
+        device_factory = self.device_factory
+        if self.agent_config.use_scrcpy and self._frame_source_started is None:
+            self._frame_source_started = device_factory.start_frame_source(
+                self.agent_config.device_id
             )
+        return device_factory
 
-        # Parse action from response
-        try:
-            action = parse_action(response.action)
-        except ValueError:
-            if self.agent_config.verbose:
-                traceback.print_exc()
-            action = finish(message=response.action)
+    def _append_screen_message(
+        self, user_prompt: str | None, current_app: str, screenshot, is_first: bool
+    ) -> None:
+        """Append the user turn describing the current screen to the context."""
+        if is_first:
+            self._task = user_prompt
+        append_screen_message(
+            self._context, self.agent_config, user_prompt, current_app, screenshot, is_first
+        )
 
-        if self.agent_config.verbose:
-            # Print thinking process
-            print("-" * 50)
-            print(f"🎯 {msgs['action']}:")
-            print(json.dumps(action, ensure_ascii=False, indent=2))
-            print("=" * 50 + "\n")
+    def _replay(self, task: str) -> StepResult | None:
+        """
+        Replay the recorded trajectory for a task without calling the model.
 
-        # Remove image from context to save space
-        self._context[-1] = MessageBuilder.remove_images_from_message(self._context[-1])
+        Before each action the live screen is compared with the recorded one.
+        Replayed steps are added to the context like model steps, so the
+        model can take over from the first step that does not match.
 
-        # Execute action
-        try:
-            result = self.action_handler.execute(
-                action, screenshot.width, screenshot.height
+        Args:
+            task: Task text the trajectory was recorded for.
+
+        Returns:
+            The result of the step that finished the task, or None if the
+            model has to continue.
+        """
+        trajectory = self._get_trajectory_store().load(task)
+        if trajectory is None:
+            return None
+
+        for index, recorded in enumerate(trajectory.steps, start=1):
+            if self._step_count >= self.agent_config.max_steps:
+                return None
+
+            step_start = time.time()
+            self._trace.step = self._step_count + 1
+            screenshot, current_app, timings = self._observe(self._prepare_capture())
+            screen_hash = self._screen_hash(screenshot)
+            if screen_hash is None or not recorded.matches(
+                screen_hash, self.agent_config.replay_max_distance
+            ):
+                if self.agent_config.verbose:
+                    print(
+                        f"\n↩️  Screen differs from the recording at step {index}, "
+                        "handing over to the model"
+                    )
+                return None
+
+            try:
+                action = parse_action(recorded.action)
+            except ValueError:
+                # Recorded by an older version or edited by hand
+                if self.agent_config.verbose:
+                    print(
+                        f"\n↩️  Recorded action at step {index} does not parse, "
+                        "handing over to the model"
+                    )
+                return None
+
+            self._step_count += 1
+            is_first = len(self._context) == 0
+            self._append_screen_message(
+                task if is_first else None, current_app, screenshot, is_first
             )
-        except Exception as e:
+            self._context.remove_images()
+
             if self.agent_config.verbose:
-                traceback.print_exc()
-            result = self.action_handler.execute(
-                finish(message=str(e)), screenshot.width, screenshot.height
+                print(f"\n⏩ Replaying step {index}/{len(trajectory.steps)}:")
+                print(json.dumps(action, ensure_ascii=False, indent=2))
+
+            try:
+                with self._trace.span("action_execute", action=action.get("action")):
+                    result = self.action_handler.execute(
+                        action, screenshot.width, screenshot.height
+                    )
+            except Exception:
+                if self.agent_config.verbose:
+                    traceback.print_exc()
+                result = None
+            self._trace.add(
+                STEP_SPAN, step_start, time.time() - step_start, STEP_TRACK, replayed=True
             )
 
-        # Add assistant response to context
-        self._context.append(
-            MessageBuilder.create_assistant_message(
-                f"<think>{response.thinking}</think><answer>{response.action}</answer>"
+            self._context.add_response(recorded.thinking, recorded.action)
+            self._actions.append(recorded.action)
+            self._record_step(
+                screen_hash, current_app, recorded.thinking, recorded.action, step_start
+            )
+            if result is None or not result.success:
+                return None
+
+            if is_finished(action, result):
+                if self.agent_config.verbose:
+                    msgs = get_messages(self.agent_config.lang)
+                    print(
+                        f"\n✅ {msgs['task_completed']}: "
+                        f"{result.message or action.get('message', msgs['done'])}"
+                    )
+                self._save_recording(action, result.success)
+                return StepResult(
+                    success=result.success,
+                    finished=True,
+                    action=action,
+                    thinking=recorded.thinking,
+                    message=result.message or action.get("message"),
+                    timings=timings,
+                )
+        return None
+
+    def _screen_hash(self, screenshot) -> int | None:
+        """Perceptual hash of a screenshot; None for sensitive screens."""
+        if screenshot.is_sensitive:
+            return None
+        return dhash_base64(screenshot.base64_data)
+
+    def _get_trajectory_store(self) -> TrajectoryStore:
+        if self._trajectory_store is None:
+            self._trajectory_store = TrajectoryStore()
+        return self._trajectory_store
+
+    def _record_step(
+        self,
+        screen_hash: int | None,
+        current_app: str,
+        thinking: str,
+        action: str,
+        step_start: float,
+    ) -> None:
+        """Add a step to the trajectory being recorded."""
+        if self._recording is None:
+            return
+        if screen_hash is None:
+            # Never store actions taken on sensitive screens (e.g. passwords)
+            self._recording = None
+            return
+        self._recording.steps.append(
+            TrajectoryStep(
+                action=action,
+                screen_hash=f"{screen_hash:x}",
+                current_app=current_app,
+                thinking=thinking,
+                duration=time.time() - step_start,
             )
         )
 
-        # Check if finished
-        finished = action.get("_metadata") == "finish" or result.should_finish
+    def _save_recording(self, action: dict[str, Any], success: bool) -> None:
+        """Save the recorded trajectory if the task finished successfully."""
+        recording, self._recording = self._recording, None
+        if recording is None or not success or action.get("_metadata") != "finish":
+            return
+        recording.duration = time.time() - recording.created
+        self._get_trajectory_store().save(recording)
+        if self.agent_config.verbose:
+            print(f"💾 Trajectory saved ({len(recording.steps)} steps)")
 
-        if finished and self.agent_config.verbose:
-            msgs = get_messages(self.agent_config.lang)
-            print("\n" + "🎉 " + "=" * 48)
-            print(
-                f"✅ {msgs['task_completed']}: {result.message or action.get('message', msgs['done'])}"
+    def _observe(self, device_factory) -> tuple[Any, str, dict[str, float]]:
+        """
+        Capture the screenshot and current app concurrently.
+
+        Both are independent device round trips, so the step only pays for
+        the slower one.
+
+        Returns:
+            Tuple of (screenshot, current_app, timings).
+        """
+        if self._observe_executor is None:
+            self._observe_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="observe"
             )
-            print("=" * 50 + "\n")
-
-        return StepResult(
-            success=result.success,
-            finished=finished,
-            action=action,
-            thinking=response.thinking,
-            message=result.message or action.get("message"),
+
+        device_id = self.agent_config.device_id
+        start = time.time()
+        app_future = self._observe_executor.submit(
+            timed, device_factory.get_current_app, device_id
+        )
+        screenshot, screenshot_time = timed(device_factory.get_screenshot, device_id)
+        current_app, current_app_time = app_future.result()
+
+        timings = {
+            "screenshot": screenshot_time,
+            "current_app": current_app_time,
+            "observe": time.time() - start,
+        }
+        if self._trace is not None:
+            self._trace.add("screenshot", start, screenshot_time)
+            self._trace.add("current_app", start, current_app_time, OBSERVE_TRACK)
+        return screenshot, current_app, timings
+
+    def _cache_key(self, screenshot) -> CacheKey | None:
+        """Response cache key for this step; None if caching is off or unsafe."""
+        return make_cache_key(
+            self.model_client,
+            self.model_config.model_name,
+            self.agent_config.lang,
+            self._task,
+            self._actions,
+            screenshot,
         )
 
     @property
     def context(self) -> list[dict[str, Any]]:
-        """Get the current conversation context."""
-        return self._context.copy()
+        """Get the full conversation context (before compaction)."""
+        return self._context.messages
 
     @property
     def step_count(self) -> int:
         """Get the current step count."""
         return self._step_count
+
+    @property
+    def model_time(self) -> float:
+        """Get the time spent on model requests in the current task (seconds)."""
+        return self._model_time
+
+    @property
+    def last_result(self) -> StepResult | None:
+        """Get the result of the last step run by run()."""
+        return self._last_result
+
+    @property
+    def trace(self) -> TaskTrace | None:
+        """Get the stage spans of the current or last task."""
+        return self._trace
@@ -0,0 +1,318 @@
+"""AsyncPhoneAgent: the PhoneAgent loop on asyncio.
+
+Every device command, post-action wait and model request is a coroutine, so
+one event loop can drive many devices at once without a thread per device:
+
+    >>> agents = [
+    ...     AsyncPhoneAgent(model_config, AgentConfig(device_id=d), device_factory=factory)
+    ...     for d in device_ids
+    ... ]
+    >>> results = await asyncio.gather(*(a.run(t) for a, t in zip(agents, tasks)))
+
+Cancelling ``run()`` cancels the device command or model stream in flight
+and still restores the device keyboard.
+
+iOS devices are driven through ``AsyncWDAClient`` (WebDriverAgent over
+aiohttp), passed as ``device_factory``.
+
+Trajectory recording and replay are only available in PhoneAgent;
+``AgentConfig.record_trajectory`` and ``AgentConfig.replay`` are ignored here.
+"""
+
+import asyncio
+import time
+import traceback
+from typing import Any
+
+from phone_agent.actions.handler import finish
+from phone_agent.actions.handler_async import (
+    AsyncActionHandler,
+    ConfirmationCallback,
+    TakeoverCallback,
+)
+from phone_agent.agent import AgentConfig
+from phone_agent.agent_common import (
+    StepResult,
+    append_screen_message,
+    make_cache_key,
+    model_error_result,
+    parse_reply,
+    print_thinking_header,
+    step_result,
+    timed_async,
+)
+from phone_agent.device_factory import DeviceType, get_device_factory
+from phone_agent.device_factory_async import AsyncDeviceFactory
+from phone_agent.model import ModelConfig
+from phone_agent.model.cache import CacheKey
+from phone_agent.model.client_async import AsyncModelClient
+from phone_agent.model.context import PREFIX_CACHE_BLOCK, ContextConfig, ContextManager
+from phone_agent.telemetry import (
+    OBSERVE_TRACK,
+    STEP_SPAN,
+    STEP_TRACK,
+    TaskTrace,
+    reset_current_trace,
+    set_current_trace,
+)
+
+
+class AsyncPhoneAgent:
+    """
+    AI-powered phone agent driven by an asyncio event loop.
+
+    Args:
+        model_config: Configuration for the AI model.
+        agent_config: Configuration for the agent behavior.
+        confirmation_callback: Optional callback (sync or async) for sensitive
+            action confirmation.
+        takeover_callback: Optional callback (sync or async) for takeover
+            requests.
+        device_factory: Async device backend: an AsyncDeviceFactory (ADB or
+            HDC) or an AsyncWDAClient (iOS). Defaults to the type of the
+            global device factory.
+    """
+
+    def __init__(
+        self,
+        model_config: ModelConfig | None = None,
+        agent_config: AgentConfig | None = None,
+        confirmation_callback: ConfirmationCallback | None = None,
+        takeover_callback: TakeoverCallback | None = None,
+        device_factory: AsyncDeviceFactory | None = None,
+    ):
+        self.model_config = model_config or ModelConfig()
+        self.agent_config = agent_config or AgentConfig()
+        self.device_factory = device_factory or _default_device_factory()
+
+        self.model_client = AsyncModelClient(self.model_config)
+        self.action_handler = AsyncActionHandler(
+            self.device_factory,
+            device_id=self.agent_config.device_id,
+            confirmation_callback=confirmation_callback,
+            takeover_callback=takeover_callback,
+        )
+
+        self._context = ContextManager(
+            ContextConfig(compact_block=PREFIX_CACHE_BLOCK)
+            if self.agent_config.prefix_cache
+            else None
+        )
+        self._step_count = 0
+        self._task: str | None = None
+        self._actions: list[str] = []  # Action texts of this task, for the cache
+        self._model_time = 0.0  # Seconds spent waiting for the model this task
+        self._last_result: StepResult | None = None
+        self._trace: TaskTrace | None = None  # Stage spans of the current task
+        self._frame_source_started: bool | None = None  # None until attempted
+
+    async def run(self, task: str) -> str:
+        """
+        Run the agent to complete a task.
+
+        Args:
+            task: Natural language description of the task.
+
+        Returns:
+            Final message from the agent.
+        """
+        self._context.clear()
+        self._step_count = 0
+        self._actions = []
+        self._model_time = 0.0
+        self._last_result = None
+        self._start_trace(task)
+        trace_token = set_current_trace(self._trace)
+
+        try:
+            result = await self._execute_step(task, is_first=True)
+            self._last_result = result
+            if result.finished:
+                return result.message or "Task completed"
+
+            while self._step_count < self.agent_config.max_steps:
+                result = await self._execute_step(is_first=False)
+                self._last_result = result
+                if result.finished:
+                    return result.message or "Task completed"
+
+            return "Max steps reached"
+        finally:
+            await self._release_device()
+            reset_current_trace(trace_token)
+
+    async def step(self, task: str | None = None) -> StepResult:
+        """
+        Execute a single step of the agent.
+
+        Args:
+            task: Task description (only needed for first step).
+
+        Returns:
+            StepResult with step details.
+        """
+        is_first = len(self._context) == 0
+        if is_first and not task:
+            raise ValueError("Task is required for the first step")
+        if is_first or self._trace is None:
+            self._start_trace(task)
+        trace_token = set_current_trace(self._trace)
+        try:
+            return await self._execute_step(task, is_first)
+        finally:
+            reset_current_trace(trace_token)
+
+    async def reset(self) -> None:
+        """Reset the agent state for a new task."""
+        self._context.clear()
+        self._step_count = 0
+        self._actions = []
+        self._model_time = 0.0
+        self._last_result = None
+        self._trace = None
+        await self._release_device()
+
+    def _start_trace(self, task: str | None) -> None:
+        """Start collecting stage spans for a new task."""
+        self._trace = TaskTrace(task=task, device_id=self.agent_config.device_id)
+
+    async def _release_device(self) -> None:
+        """Restore the keyboard and stop the frame source after a task."""
+        await self.action_handler.reset()
+        if self._frame_source_started:
+            await self.device_factory.stop_frame_source(self.agent_config.device_id)
+        self._frame_source_started = None
+
+    async def _execute_step(
+        self, user_prompt: str | None = None, is_first: bool = False
+    ) -> StepResult:
+        """Execute a single step of the agent loop, timing its stages."""
+        self._step_count += 1
+        self._trace.step = self._step_count
+        with self._trace.span(STEP_SPAN, STEP_TRACK):
+            return await self._run_step(user_prompt, is_first)
+
+    async def _run_step(self, user_prompt: str | None, is_first: bool) -> StepResult:
+        """Observe, ask the model and act; the body of _execute_step()."""
+        trace = self._trace
+        if self.agent_config.use_scrcpy and self._frame_source_started is None:
+            self._frame_source_started = await self.device_factory.start_frame_source(
+                self.agent_config.device_id
+            )
+
+        screenshot, current_app, timings = await self._observe()
+        with trace.span("context_build"):
+            self._append_screen_message(user_prompt, current_app, screenshot, is_first)
+            messages = self._context.build()
+            cache_key = self._cache_key(screenshot)
+
+        request_start = time.time()
+        try:
+            print_thinking_header(self.agent_config.lang)
+            response = await self.model_client.request(messages, cache_key=cache_key)
+            self._model_time += (response.total_time or 0.0) + response.queue_wait_time
+            trace.add_model_response(response, request_start)
+        except Exception as e:
+            trace.add("model_error", request_start, time.time() - request_start)
+            return model_error_result(e, timings, self.agent_config.verbose)
+
+        with trace.span("action_parse"):
+            action, _ = parse_reply(response, self.agent_config)
+
+        self._context.remove_images()
+
+        with trace.span("action_execute", action=action.get("action")):
+            try:
+                result = await self.action_handler.execute(
+                    action, screenshot.width, screenshot.height
+                )
+            except Exception as e:
+                if self.agent_config.verbose:
+                    traceback.print_exc()
+                result = await self.action_handler.execute(
+                    finish(message=str(e)), screenshot.width, screenshot.height
+                )
+
+        self._context.add_response(response.thinking, response.action)
+        self._actions.append(response.action)
+        return step_result(action, result, response, timings, self.agent_config)
+
+    def _append_screen_message(
+        self, user_prompt: str | None, current_app: str, screenshot, is_first: bool
+    ) -> None:
+        """Append the user turn describing the current screen to the context."""
+        if is_first:
+            self._task = user_prompt
+        append_screen_message(
+            self._context, self.agent_config, user_prompt, current_app, screenshot, is_first
+        )
+
+    async def _observe(self) -> tuple[Any, str, dict[str, float]]:
+        """
+        Capture the screenshot and current app concurrently.
+
+        Returns:
+            Tuple of (screenshot, current_app, timings).
+        """
+        device_id = self.agent_config.device_id
+        start = time.time()
+        (screenshot, screenshot_time), (current_app, current_app_time) = (
+            await asyncio.gather(
+                timed_async(self.device_factory.get_screenshot(device_id)),
+                timed_async(self.device_factory.get_current_app(device_id)),
+            )
+        )
+        timings = {
+            "screenshot": screenshot_time,
+            "current_app": current_app_time,
+            "observe": time.time() - start,
+        }
+        self._trace.add("screenshot", start, screenshot_time)
+        self._trace.add("current_app", start, current_app_time, OBSERVE_TRACK)
+        return screenshot, current_app, timings
+
+    def _cache_key(self, screenshot) -> CacheKey | None:
+        """Response cache key for this step; None if caching is off or unsafe."""
+        return make_cache_key(
+            self.model_client,
+            self.model_config.model_name,
+            self.agent_config.lang,
+            self._task,
+            self._actions,
+            screenshot,
+        )
+
+    @property
+    def context(self) -> list[dict[str, Any]]:
+        """Get the full conversation context (before compaction)."""
+        return self._context.messages
+
+    @property
+    def step_count(self) -> int:
+        """Get the current step count."""
+        return self._step_count
+
+    @property
+    def model_time(self) -> float:
+        """Get the time spent on model requests in the current task (seconds)."""
+        return self._model_time
+
+    @property
+    def last_result(self) -> StepResult | None:
+        """Get the result of the last step run by run()."""
+        return self._last_result
+
+    @property
+    def trace(self) -> TaskTrace | None:
+        """Get the stage spans of the current or last task."""
+        return self._trace
+
+
+def _default_device_factory():
+    """Async backend matching the global device factory."""
+    device_type = get_device_factory().device_type
+    if device_type == DeviceType.IOS:
+        from phone_agent.xctest.client_async import AsyncWDAClient
+
+        return AsyncWDAClient()
+    return AsyncDeviceFactory(device_type)
@@ -0,0 +1,185 @@
+"""Step logic shared by PhoneAgent, AsyncPhoneAgent and IOSPhoneAgent.
+
+The agents differ in how they reach the device and the model (threads,
+asyncio, WebDriverAgent). Building the screen message and the cache key,
+parsing the reply and assembling the step result are the same for all of
+them and live here.
+"""
+
+import json
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from phone_agent.actions.handler import ActionResult, finish, parse_action
+from phone_agent.config import get_date_line, get_messages
+from phone_agent.model.cache import CacheKey
+from phone_agent.model.client import MessageBuilder, ModelResponse
+from phone_agent.model.context import ContextManager
+
+
+@dataclass
+class StepResult:
+    """Result of a single agent step."""
+
+    success: bool
+    finished: bool
+    action: dict[str, Any] | None
+    thinking: str
+    message: str | None = None
+    timings: dict[str, float] = field(default_factory=dict)  # Stage durations (s)
+
+
+def timed(func: Callable, *args, **kwargs) -> tuple[Any, float]:
+    """Call a function and return its result with the elapsed time in seconds."""
+    start = time.time()
+    result = func(*args, **kwargs)
+    return result, time.time() - start
+
+
+async def timed_async(awaitable: Awaitable) -> tuple[Any, float]:
+    """Await a coroutine and return its result with the elapsed time in seconds."""
+    start = time.time()
+    result = await awaitable
+    return result, time.time() - start
+
+
+def append_screen_message(
+    context: ContextManager,
+    agent_config,
+    user_prompt: str | None,
+    current_app: str,
+    screenshot,
+    is_first: bool,
+) -> None:
+    """
+    Append the user turn describing the current screen to the context.
+
+    Args:
+        context: Conversation context of the agent.
+        agent_config: AgentConfig or IOSAgentConfig.
+        user_prompt: The task; only used for the first step.
+        current_app: Name of the foreground app.
+        screenshot: Screenshot of the current screen.
+        is_first: Whether this is the first step of the task.
+    """
+    screen_info = MessageBuilder.build_screen_info(current_app)
+    if is_first:
+        context.append(MessageBuilder.create_system_message(agent_config.system_prompt))
+        text_content = f"{user_prompt}\n\n{screen_info}"
+        if agent_config.prefix_cache:
+            # The date changes daily, so it follows the static system prompt
+            date_line = get_date_line(agent_config.lang)
+            text_content = f"{date_line}\n\n{text_content}"
+    else:
+        text_content = f"** Screen Info **\n\n{screen_info}"
+
+    context.append(
+        MessageBuilder.create_user_message(
+            text=text_content,
+            image_base64=screenshot.base64_data,
+            mime_type=screenshot.mime_type,
+        )
+    )
+
+
+def make_cache_key(
+    model_client,
+    model_name: str,
+    lang: str,
+    task: str | None,
+    actions: list[str],
+    screenshot,
+) -> CacheKey | None:
+    """
+    Response cache key for a step.
+
+    Returns:
+        The key, or None if caching is off or unsafe (sensitive screens).
+    """
+    cache = model_client.cache
+    if cache is None or screenshot.is_sensitive or task is None:
+        return None
+    return cache.make_key(task, actions, screenshot.base64_data, model_name, lang)
+
+
+def print_thinking_header(lang: str) -> None:
+    """Print the banner that precedes the streamed model reasoning."""
+    msgs = get_messages(lang)
+    print("\n" + "=" * 50)
+    print(f"💭 {msgs['thinking']}:")
+    print("-" * 50)
+
+
+def model_error_result(
+    error: Exception, timings: dict[str, float], verbose: bool
+) -> StepResult:
+    """Step result for a model request that failed; the task ends."""
+    if verbose:
+        traceback.print_exc()
+    return StepResult(
+        success=False,
+        finished=True,
+        action=None,
+        thinking="",
+        message=f"Model error: {error}",
+        timings=timings,
+    )
+
+
+def parse_reply(response: ModelResponse, agent_config) -> tuple[dict[str, Any], bool]:
+    """
+    Parse the action of a model reply and print it in verbose mode.
+
+    A reply that does not parse finishes the task with the reply as message.
+
+    Returns:
+        Tuple of (action, whether the reply parsed).
+    """
+    try:
+        action, parsed = parse_action(response.action), True
+    except ValueError:
+        if agent_config.verbose:
+            traceback.print_exc()
+        action, parsed = finish(message=response.action), False
+
+    if agent_config.verbose:
+        msgs = get_messages(agent_config.lang)
+        print("-" * 50)
+        print(f"🎯 {msgs['action']}:")
+        print(json.dumps(action, ensure_ascii=False, indent=2))
+        print("=" * 50 + "\n")
+    return action, parsed
+
+
+def is_finished(action: dict[str, Any], result: ActionResult) -> bool:
+    """Whether a step ends the task."""
+    return action.get("_metadata") == "finish" or result.should_finish
+
+
+def step_result(
+    action: dict[str, Any],
+    result: ActionResult,
+    response: ModelResponse,
+    timings: dict[str, float],
+    agent_config,
+) -> StepResult:
+    """Build the result of an executed step, announcing completion in verbose mode."""
+    finished = is_finished(action, result)
+    if finished and agent_config.verbose:
+        msgs = get_messages(agent_config.lang)
+        print("\n" + "🎉 " + "=" * 48)
+        print(
+            f"✅ {msgs['task_completed']}: {result.message or action.get('message', msgs['done'])}"
+        )
+        print("=" * 50 + "\n")
+
+    return StepResult(
+        success=result.success,
+        finished=finished,
+        action=action,
+        thinking=response.thinking,
+        message=result.message or action.get("message"),
+        timings=timings,
+    )
@@ -1,15 +1,27 @@
 """iOS PhoneAgent class for orchestrating iOS phone automation."""
 
-import json
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Callable
 
-from phone_agent.actions.handler import do, finish, parse_action
+from phone_agent.actions.handler import finish
 from phone_agent.actions.handler_ios import IOSActionHandler
-from phone_agent.config import get_messages, get_system_prompt
+from phone_agent.agent_common import (
+    StepResult,
+    append_screen_message,
+    make_cache_key,
+    model_error_result,
+    parse_reply,
+    print_thinking_header,
+    step_result,
+    timed,
+)
+from phone_agent.config import get_system_prompt
 from phone_agent.model import ModelClient, ModelConfig
-from phone_agent.model.client import MessageBuilder
+from phone_agent.model.cache import CacheKey
+from phone_agent.model.context import PREFIX_CACHE_BLOCK, ContextConfig, ContextManager
 from phone_agent.xctest import XCTestConnection, get_current_app, get_screenshot
 
 
@@ -24,21 +36,15 @@ class IOSAgentConfig:
     lang: str = "cn"
     system_prompt: str | None = None
     verbose: bool = True
+    # Static system prompt first, date and task in the first user turn, and
+    # block-wise history compaction, so serving engines can reuse the prefix
+    prefix_cache: bool = False
 
     def __post_init__(self):
         if self.system_prompt is None:
-            self.system_prompt = get_system_prompt(self.lang)
-
-
-@dataclass
-class StepResult:
-    """Result of a single agent step."""
-
-    success: bool
-    finished: bool
-    action: dict[str, Any] | None
-    thinking: str
-    message: str | None = None
+            self.system_prompt = get_system_prompt(
+                self.lang, include_date=not self.prefix_cache
+            )
 
 
 class IOSPhoneAgent:
@@ -96,8 +102,15 @@ class IOSPhoneAgent:
             takeover_callback=takeover_callback,
         )
 
-        self._context: list[dict[str, Any]] = []
+        self._context = ContextManager(
+            ContextConfig(compact_block=PREFIX_CACHE_BLOCK)
+            if self.agent_config.prefix_cache
+            else None
+        )
         self._step_count = 0
+        self._task: str | None = None
+        self._actions: list[str] = []  # Action texts of this task, for the cache
+        self._observe_executor: ThreadPoolExecutor | None = None
 
     def run(self, task: str) -> str:
         """
@@ -109,23 +122,27 @@ class IOSPhoneAgent:
         Returns:
             Final message from the agent.
         """
-        self._context = []
+        self._context.clear()
         self._step_count = 0
+        self._actions = []
 
-        # First step with user prompt
-        result = self._execute_step(task, is_first=True)
-
-        if result.finished:
-            return result.message or "Task completed"
-
-        # Continue until finished or max steps reached
-        while self._step_count < self.agent_config.max_steps:
-            result = self._execute_step(is_first=False)
+        try:
+            # First step with user prompt
+            result = self._execute_step(task, is_first=True)
 
             if result.finished:
                 return result.message or "Task completed"
 
-        return "Max steps reached"
+            # Continue until finished or max steps reached
+            while self._step_count < self.agent_config.max_steps:
+                result = self._execute_step(is_first=False)
+
+                if result.finished:
+                    return result.message or "Task completed"
+
+            return "Max steps reached"
+        finally:
+            self._release_device()
 
     def step(self, task: str | None = None) -> StepResult:
         """
@@ -148,8 +165,16 @@ class IOSPhoneAgent:
 
     def reset(self) -> None:
         """Reset the agent state for a new task."""
-        self._context = []
+        self._context.clear()
         self._step_count = 0
+        self._actions = []
+        self._release_device()
+
+    def _release_device(self) -> None:
+        """Stop the observe thread after a task."""
+        if self._observe_executor is not None:
+            self._observe_executor.shutdown(wait=False)
+            self._observe_executor = None
 
     def _execute_step(
         self, user_prompt: str | None = None, is_first: bool = False
@@ -157,76 +182,34 @@ class IOSPhoneAgent:
         """Execute a single step of the agent loop."""
         self._step_count += 1
 
+        if is_first:
+            # Open the model connection while the first screenshot is taken
+            self.model_client.prewarm()
+
         # Capture current screen state
-        screenshot = get_screenshot(
-            wda_url=self.agent_config.wda_url,
-            session_id=self.agent_config.session_id,
-            device_id=self.agent_config.device_id,
-        )
-        current_app = get_current_app(
-            wda_url=self.agent_config.wda_url, session_id=self.agent_config.session_id
-        )
+        screenshot, current_app, timings = self._observe()
 
         # Build messages
         if is_first:
-            self._context.append(
-                MessageBuilder.create_system_message(self.agent_config.system_prompt)
-            )
-
-            screen_info = MessageBuilder.build_screen_info(current_app)
-            text_content = f"{user_prompt}\n\n{screen_info}"
-
-            self._context.append(
-                MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
-                )
-            )
-        else:
-            screen_info = MessageBuilder.build_screen_info(current_app)
-            text_content = f"** Screen Info **\n\n{screen_info}"
-
-            self._context.append(
-                MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
-                )
-            )
+            self._task = user_prompt
+        append_screen_message(
+            self._context, self.agent_config, user_prompt, current_app, screenshot, is_first
+        )
 
         # Get model response
         try:
-            response = self.model_client.request(self._context)
-        except Exception as e:
-            if self.agent_config.verbose:
-                traceback.print_exc()
-            return StepResult(
-                success=False,
-                finished=True,
-                action=None,
-                thinking="",
-                message=f"Model error: {e}",
+            print_thinking_header(self.agent_config.lang)
+            response = self.model_client.request(
+                self._context.build(), cache_key=self._cache_key(screenshot)
             )
+        except Exception as e:
+            return model_error_result(e, timings, self.agent_config.verbose)
 
         # Parse action from response
-        try:
-            action = parse_action(response.action)
-        except ValueError:
-            if self.agent_config.verbose:
-                traceback.print_exc()
-            action = finish(message=response.action)
-
-        if self.agent_config.verbose:
-            # Print thinking process
-            msgs = get_messages(self.agent_config.lang)
-            print("\n" + "=" * 50)
-            print(f"💭 {msgs['thinking']}:")
-            print("-" * 50)
-            print(response.thinking)
-            print("-" * 50)
-            print(f"🎯 {msgs['action']}:")
-            print(json.dumps(action, ensure_ascii=False, indent=2))
-            print("=" * 50 + "\n")
+        action, _ = parse_reply(response, self.agent_config)
 
         # Remove image from context to save space
-        self._context[-1] = MessageBuilder.remove_images_from_message(self._context[-1])
+        self._context.remove_images()
 
         # Execute action
         try:
@@ -241,35 +224,62 @@ class IOSPhoneAgent:
             )
 
         # Add assistant response to context
-        self._context.append(
-            MessageBuilder.create_assistant_message(
-                f"<think>{response.thinking}</think><answer>{response.action}</answer>"
-            )
-        )
+        self._context.add_response(response.thinking, response.action)
+        self._actions.append(response.action)
+        return step_result(action, result, response, timings, self.agent_config)
 
-        # Check if finished
-        finished = action.get("_metadata") == "finish" or result.should_finish
+    def _observe(self) -> tuple[Any, str, dict[str, float]]:
+        """
+        Capture the screenshot and current app concurrently.
 
-        if finished and self.agent_config.verbose:
-            msgs = get_messages(self.agent_config.lang)
-            print("\n" + "🎉 " + "=" * 48)
-            print(
-                f"✅ {msgs['task_completed']}: {result.message or action.get('message', msgs['done'])}"
+        Both are independent WDA round trips, so the step only pays for the
+        slower one.
+
+        Returns:
+            Tuple of (screenshot, current_app, timings).
+        """
+        if self._observe_executor is None:
+            self._observe_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="observe"
             )
-            print("=" * 50 + "\n")
-
-        return StepResult(
-            success=result.success,
-            finished=finished,
-            action=action,
-            thinking=response.thinking,
-            message=result.message or action.get("message"),
+
+        start = time.time()
+        app_future = self._observe_executor.submit(
+            timed,
+            get_current_app,
+            wda_url=self.agent_config.wda_url,
+            session_id=self.agent_config.session_id,
+        )
+        screenshot, screenshot_time = timed(
+            get_screenshot,
+            wda_url=self.agent_config.wda_url,
+            session_id=self.agent_config.session_id,
+            device_id=self.agent_config.device_id,
+        )
+        current_app, current_app_time = app_future.result()
+
+        timings = {
+            "screenshot": screenshot_time,
+            "current_app": current_app_time,
+            "observe": time.time() - start,
+        }
+        return screenshot, current_app, timings
+
+    def _cache_key(self, screenshot) -> CacheKey | None:
+        """Response cache key for this step; None if caching is off or unsafe."""
+        return make_cache_key(
+            self.model_client,
+            self.model_config.model_name,
+            self.agent_config.lang,
+            self._task,
+            self._actions,
+            screenshot,
         )
 
     @property
     def context(self) -> list[dict[str, Any]]:
-        """Get the current conversation context."""
-        return self._context.copy()
+        """Get the full conversation context (before compaction)."""
+        return self._context.messages
 
     @property
     def step_count(self) -> int:
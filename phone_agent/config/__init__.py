@@ -3,32 +3,59 @@
 from phone_agent.config.apps import APP_PACKAGES
 from phone_agent.config.apps_ios import APP_PACKAGES_IOS
 from phone_agent.config.i18n import get_message, get_messages
+from phone_agent.config import prompts_en, prompts_zh
 from phone_agent.config.prompts_en import SYSTEM_PROMPT as SYSTEM_PROMPT_EN
 from phone_agent.config.prompts_zh import SYSTEM_PROMPT as SYSTEM_PROMPT_ZH
+from phone_agent.config.screenshot import (
+    SCREENSHOT_CONFIG,
+    ScreenshotConfig,
+    get_screenshot_config,
+    update_screenshot_config,
+)
 from phone_agent.config.timing import (
     TIMING_CONFIG,
     ActionTimingConfig,
     ConnectionTimingConfig,
     DeviceTimingConfig,
+    StabilityTimingConfig,
     TimingConfig,
     get_timing_config,
     update_timing_config,
 )
 
 
-def get_system_prompt(lang: str = "cn") -> str:
+def get_system_prompt(lang: str = "cn", include_date: bool = True) -> str:
     """
     Get system prompt by language.
 
     Args:
         lang: Language code, 'cn' for Chinese, 'en' for English.
+        include_date: Whether to start the prompt with today's date. Without
+            it the prompt is byte-identical across days, which lets serving
+            engines reuse its cached prefix; pass the date in the first user
+            turn instead (see get_date_line).
 
     Returns:
         System prompt string.
     """
-    if lang == "en":
-        return SYSTEM_PROMPT_EN
-    return SYSTEM_PROMPT_ZH
+    prompts = prompts_en if lang == "en" else prompts_zh
+    if include_date:
+        return prompts.SYSTEM_PROMPT
+    return prompts.SYSTEM_PROMPT_BODY
+
+
+def get_date_line(lang: str = "cn") -> str:
+    """
+    Get today's date line by language.
+
+    Args:
+        lang: Language code, 'cn' for Chinese, 'en' for English.
+
+    Returns:
+        Date line, e.g. "The current date: 2025-01-01, Wednesday".
+    """
+    prompts = prompts_en if lang == "en" else prompts_zh
+    return prompts.get_date_line()
 
 
 # Default to Chinese for backward compatibility
@@ -41,6 +68,7 @@ __all__ = [
     "SYSTEM_PROMPT_ZH",
     "SYSTEM_PROMPT_EN",
     "get_system_prompt",
+    "get_date_line",
     "get_messages",
     "get_message",
     "TIMING_CONFIG",
@@ -48,6 +76,11 @@ __all__ = [
     "ActionTimingConfig",
     "DeviceTimingConfig",
     "ConnectionTimingConfig",
+    "StabilityTimingConfig",
     "get_timing_config",
     "update_timing_config",
+    "SCREENSHOT_CONFIG",
+    "ScreenshotConfig",
+    "get_screenshot_config",
+    "update_screenshot_config",
 ]
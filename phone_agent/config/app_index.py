@@ -0,0 +1,67 @@
+"""Reverse lookup from package / bundle ID to app name.
+
+The app tables map display names to package names, with several names per
+package in some cases. The index inverts a table once (the first name listed
+for a package wins, as with the old linear scans) so that current-app
+detection is a dictionary lookup instead of a scan of every entry.
+"""
+
+import re
+
+# Dotted identifiers such as "com.tencent.mm" or "com.huawei.hmos.settings"
+_PACKAGE_PATTERN = re.compile(r"[A-Za-z_][\w]*(?:\.[A-Za-z_][\w]*)+")
+
+
+class AppIndex:
+    """
+    Package name -> app name index for one app table.
+
+    Args:
+        packages: App name to package name mapping.
+    """
+
+    def __init__(self, packages: dict[str, str]):
+        self._size = len(packages)
+        self._names: dict[str, str] = {}
+        for app_name, package in packages.items():
+            self._names.setdefault(package, app_name)
+
+    def get_app_name(self, package: str) -> str | None:
+        """Get the app name for an exact package or bundle ID."""
+        return self._names.get(package)
+
+    def find_app_name(self, text: str) -> str | None:
+        """
+        Find the first known package mentioned in a line of text.
+
+        Args:
+            text: Text such as a `dumpsys window` focus line.
+
+        Returns:
+            The app name, or None if no known package appears.
+        """
+        for match in _PACKAGE_PATTERN.finditer(text):
+            app_name = self._names.get(match.group())
+            if app_name is not None:
+                return app_name
+        return None
+
+
+_indexes: dict[int, AppIndex] = {}
+
+
+def get_app_index(packages: dict[str, str]) -> AppIndex:
+    """
+    Get the shared index for an app table, building it on first use.
+
+    Args:
+        packages: App name to package name mapping (e.g. APP_PACKAGES).
+
+    Returns:
+        The cached AppIndex for that table.
+    """
+    index = _indexes.get(id(packages))
+    if index is None or index._size != len(packages):
+        index = AppIndex(packages)
+        _indexes[id(packages)] = index
+    return index
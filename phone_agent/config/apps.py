@@ -1,5 +1,7 @@
 """App name to package name mapping for supported applications."""
 
+from phone_agent.config.app_index import get_app_index
+
 APP_PACKAGES: dict[str, str] = {
     # Social & Messaging
     "微信": "com.tencent.mm",
@@ -211,10 +213,7 @@ def get_app_name(package_name: str) -> str | None:
     Returns:
         The display name of the app, or None if not found.
     """
-    for name, package in APP_PACKAGES.items():
-        if package == package_name:
-            return name
-    return None
+    return get_app_index(APP_PACKAGES).get_app_name(package_name)
 
 
 def list_supported_apps() -> list[str]:
@@ -4,6 +4,8 @@ Maps user-friendly app names to HarmonyOS bundle names.
 These bundle names are used with the 'hdc shell aa start -b <bundle>' command.
 """
 
+from phone_agent.config.app_index import get_app_index
+
 # Custom ability names for apps that don't use the default "EntryAbility"
 # Maps bundle_name -> ability_name
 # Generated by: python test/find_abilities.py
@@ -250,10 +252,7 @@ def get_app_name(package_name: str) -> str | None:
     Returns:
         The display name of the app, or None if not found.
     """
-    for name, package in APP_PACKAGES.items():
-        if package == package_name:
-            return name
-    return None
+    return get_app_index(APP_PACKAGES).get_app_name(package_name)
 
 
 def list_supported_apps() -> list[str]:
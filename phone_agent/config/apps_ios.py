@@ -4,6 +4,8 @@ Based on iOS app bundle ID conventions and common iOS applications.
 Bundle IDs are in the format: com.company.appName
 """
 
+from phone_agent.config.app_index import get_app_index
+
 APP_PACKAGES_IOS: dict[str, str] = {
     # Tencent Apps (腾讯系)
     "微信": "com.tencent.xin",
@@ -224,10 +226,7 @@ def get_app_name(bundle_id: str) -> str | None:
     Returns:
         The display name of the app, or None if not found.
     """
-    for name, bid in APP_PACKAGES_IOS.items():
-        if bid == bundle_id:
-            return name
-    return None
+    return get_app_index(APP_PACKAGES_IOS).get_app_name(bundle_id)
 
 
 def list_supported_apps() -> list[str]:
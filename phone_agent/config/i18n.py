@@ -23,6 +23,9 @@ MESSAGES_ZH = {
     "time_to_first_token": "首 Token 延迟 (TTFT)",
     "time_to_thinking_end": "思考完成延迟",
     "total_inference_time": "总推理时间",
+    "cacheable_prefix": "可复用前缀 (估算)",
+    "response_cache_hit": "命中响应缓存",
+    "queue_wait_time": "排队等待时间",
 }
 
 # English messages
@@ -48,6 +51,9 @@ MESSAGES_EN = {
     "time_to_first_token": "Time to First Token (TTFT)",
     "time_to_thinking_end": "Time to Thinking End",
     "total_inference_time": "Total Inference Time",
+    "cacheable_prefix": "Cacheable Prefix (est.)",
+    "response_cache_hit": "Response Cache Hit",
+    "queue_wait_time": "Queue Wait Time",
 }
 
 
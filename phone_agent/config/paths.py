@@ -0,0 +1,30 @@
+"""Filesystem locations used by Phone Agent.
+
+The cache directory defaults to ``~/.phone_agent/cache`` and can be moved
+with the PHONE_AGENT_CACHE_DIR environment variable.
+"""
+
+import os
+
+
+def get_cache_dir(*subdirs: str) -> str:
+    """
+    Get (and create) a cache directory.
+
+    Args:
+        *subdirs: Optional subdirectory names below the cache root.
+
+    Returns:
+        Absolute path of the directory.
+    """
+    root = os.getenv("PHONE_AGENT_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".phone_agent", "cache"
+    )
+    path = os.path.abspath(os.path.join(root, *subdirs))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def safe_filename(name: str) -> str:
+    """Turn a device ID such as "192.168.1.5:5555" into a safe file name."""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name) or "default"
@@ -0,0 +1,84 @@
+"""Screenshot encoding configuration for Phone Agent.
+
+Screenshots are encoded once before they are sent to the model. Since tap and
+swipe coordinates are relative (0-999), the model does not need the native
+resolution, and a smaller JPEG or WebP image uploads and preprocesses faster.
+Values can be changed at runtime or through environment variables.
+"""
+
+import os
+from dataclasses import dataclass
+
+SUPPORTED_FORMATS = ("png", "jpeg", "webp")
+
+
+@dataclass
+class ScreenshotConfig:
+    """Configuration for screenshot encoding before upload to the model."""
+
+    format: str = "png"  # Output codec: png, jpeg or webp
+    quality: int = 85  # Quality for lossy codecs (1-100)
+    max_long_edge: int = 0  # Downscale so the long edge fits (0 = native size)
+
+    def __post_init__(self):
+        """Load values from environment variables if present."""
+        self.format = os.getenv("PHONE_AGENT_SCREENSHOT_FORMAT", self.format).lower()
+        if self.format == "jpg":
+            self.format = "jpeg"
+        if self.format not in SUPPORTED_FORMATS:
+            raise ValueError(
+                f"Unsupported screenshot format: {self.format} "
+                f"(expected one of {', '.join(SUPPORTED_FORMATS)})"
+            )
+        self.quality = int(os.getenv("PHONE_AGENT_SCREENSHOT_QUALITY", self.quality))
+        self.max_long_edge = int(
+            os.getenv("PHONE_AGENT_SCREENSHOT_MAX_EDGE", self.max_long_edge)
+        )
+
+    @property
+    def mime_type(self) -> str:
+        """MIME type of the encoded screenshots."""
+        return f"image/{self.format}"
+
+
+# Global screenshot configuration instance
+SCREENSHOT_CONFIG = ScreenshotConfig()
+
+
+def get_screenshot_config() -> ScreenshotConfig:
+    """
+    Get the global screenshot configuration.
+
+    Returns:
+        The global ScreenshotConfig instance.
+    """
+    return SCREENSHOT_CONFIG
+
+
+def update_screenshot_config(config: ScreenshotConfig) -> None:
+    """
+    Update the global screenshot configuration.
+
+    Args:
+        config: New screenshot configuration.
+
+    Example:
+        >>> from phone_agent.config.screenshot import (
+        ...     ScreenshotConfig,
+        ...     update_screenshot_config,
+        ... )
+        >>> update_screenshot_config(
+        ...     ScreenshotConfig(format="jpeg", quality=80, max_long_edge=1280)
+        ... )
+    """
+    SCREENSHOT_CONFIG.format = config.format
+    SCREENSHOT_CONFIG.quality = config.quality
+    SCREENSHOT_CONFIG.max_long_edge = config.max_long_edge
+
+
+__all__ = [
+    "ScreenshotConfig",
+    "SCREENSHOT_CONFIG",
+    "get_screenshot_config",
+    "update_screenshot_config",
+]
@@ -13,10 +13,10 @@ class ActionTimingConfig:
     """Configuration for action handler timing delays."""
 
     # Text input related delays (in seconds)
-    keyboard_switch_delay: float = 1.0  # Delay after switching to ADB keyboard
+    keyboard_switch_delay: float = 1.0  # Delay if the ADB keyboard switch is not yet visible
     text_clear_delay: float = 1.0  # Delay after clearing text
     text_input_delay: float = 1.0  # Delay after typing text
-    keyboard_restore_delay: float = 1.0  # Delay after restoring original keyboard
+    keyboard_restore_delay: float = 1.0  # Delay after restoring the keyboard for a takeover
 
     def __post_init__(self):
         """Load values from environment variables if present."""
@@ -47,6 +47,7 @@ class DeviceTimingConfig:
     default_back_delay: float = 1.0  # Default delay after back button
     default_home_delay: float = 1.0  # Default delay after home button
     default_launch_delay: float = 1.0  # Default delay after launching app
+    launch_settle_delay: float = 0.3  # Delay after `am start -W` reports the app displayed
 
     def __post_init__(self):
         """Load values from environment variables if present."""
@@ -74,6 +75,64 @@ class DeviceTimingConfig:
         self.default_launch_delay = float(
             os.getenv("PHONE_AGENT_LAUNCH_DELAY", self.default_launch_delay)
         )
+        self.launch_settle_delay = float(
+            os.getenv("PHONE_AGENT_LAUNCH_SETTLE_DELAY", self.launch_settle_delay)
+        )
+
+
+@dataclass
+class StabilityTimingConfig:
+    """Configuration for adaptive post-action waits.
+
+    When enabled, the post-action delays above become upper bounds: the wait
+    ends as soon as the screen has stopped changing for ``stable_duration``,
+    but never before the per-action minimum.
+    """
+
+    enabled: bool = True  # Use adaptive waits instead of fixed sleeps
+    stable_duration: float = 0.3  # Screen must be unchanged for this long
+    poll_interval: float = 0.05  # Minimum interval between frame polls
+    diff_threshold: float = 0.005  # Max fraction of changed pixels for "stable"
+    pixel_tolerance: int = 8  # Per-pixel difference ignored as noise (0-255)
+
+    # Minimum waits per action (in seconds)
+    min_tap_wait: float = 0.1
+    min_swipe_wait: float = 0.3
+    min_back_wait: float = 0.2
+    min_home_wait: float = 0.3
+    min_launch_wait: float = 0.5
+    min_text_wait: float = 0.1
+
+    def __post_init__(self):
+        """Load values from environment variables if present."""
+        self.enabled = os.getenv(
+            "PHONE_AGENT_ADAPTIVE_WAIT", str(self.enabled)
+        ).lower() in ("true", "1", "yes")
+        self.stable_duration = float(
+            os.getenv("PHONE_AGENT_STABLE_DURATION", self.stable_duration)
+        )
+        self.poll_interval = float(
+            os.getenv("PHONE_AGENT_STABLE_POLL_INTERVAL", self.poll_interval)
+        )
+        self.diff_threshold = float(
+            os.getenv("PHONE_AGENT_STABLE_DIFF_THRESHOLD", self.diff_threshold)
+        )
+        self.min_tap_wait = float(os.getenv("PHONE_AGENT_MIN_TAP_WAIT", self.min_tap_wait))
+        self.min_swipe_wait = float(
+            os.getenv("PHONE_AGENT_MIN_SWIPE_WAIT", self.min_swipe_wait)
+        )
+        self.min_back_wait = float(
+            os.getenv("PHONE_AGENT_MIN_BACK_WAIT", self.min_back_wait)
+        )
+        self.min_home_wait = float(
+            os.getenv("PHONE_AGENT_MIN_HOME_WAIT", self.min_home_wait)
+        )
+        self.min_launch_wait = float(
+            os.getenv("PHONE_AGENT_MIN_LAUNCH_WAIT", self.min_launch_wait)
+        )
+        self.min_text_wait = float(
+            os.getenv("PHONE_AGENT_MIN_TEXT_WAIT", self.min_text_wait)
+        )
 
 
 @dataclass
@@ -103,12 +162,14 @@ class TimingConfig:
     action: ActionTimingConfig
     device: DeviceTimingConfig
     connection: ConnectionTimingConfig
+    stability: StabilityTimingConfig
 
     def __init__(self):
         """Initialize all timing configurations."""
         self.action = ActionTimingConfig()
         self.device = DeviceTimingConfig()
         self.connection = ConnectionTimingConfig()
+        self.stability = StabilityTimingConfig()
 
 
 # Global timing configuration instance
@@ -130,6 +191,7 @@ def update_timing_config(
     action: ActionTimingConfig | None = None,
     device: DeviceTimingConfig | None = None,
     connection: ConnectionTimingConfig | None = None,
+    stability: StabilityTimingConfig | None = None,
 ) -> None:
     """
     Update the global timing configuration.
@@ -138,6 +200,7 @@ def update_timing_config(
         action: New action timing configuration.
         device: New device timing configuration.
         connection: New connection timing configuration.
+        stability: New adaptive wait configuration.
 
     Example:
         >>> from phone_agent.config.timing import update_timing_config, ActionTimingConfig
@@ -154,12 +217,15 @@ def update_timing_config(
         TIMING_CONFIG.device = device
     if connection is not None:
         TIMING_CONFIG.connection = connection
+    if stability is not None:
+        TIMING_CONFIG.stability = stability
 
 
 __all__ = [
     "ActionTimingConfig",
     "DeviceTimingConfig",
     "ConnectionTimingConfig",
+    "StabilityTimingConfig",
     "TimingConfig",
     "TIMING_CONFIG",
     "get_timing_config",
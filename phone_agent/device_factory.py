@@ -105,10 +105,20 @@ class DeviceFactory:
         """Launch an app."""
         return self.module.launch_app(app_name, device_id, delay)
 
+    def wait_for_screen(
+        self, device_id: str | None = None, max_wait: float = 1.0, min_wait: float = 0.0
+    ) -> float:
+        """Wait until the screen is stable (at most max_wait seconds)."""
+        return self.module.wait_for_screen(device_id, max_wait, min_wait)
+
     def type_text(self, text: str, device_id: str | None = None):
         """Type text."""
         return self.module.type_text(text, device_id)
 
+    def paste_text(self, text: str, device_id: str | None = None):
+        """Enter long text in bulk."""
+        return self.module.paste_text(text, device_id)
+
     def clear_text(self, device_id: str | None = None):
         """Clear text."""
         return self.module.clear_text(device_id)
@@ -117,10 +127,36 @@ class DeviceFactory:
         """Detect and set keyboard."""
         return self.module.detect_and_set_adb_keyboard(device_id)
 
+    def get_current_ime(self, device_id: str | None = None) -> str:
+        """Get the current input method."""
+        return self.module.get_current_ime(device_id)
+
     def restore_keyboard(self, ime: str, device_id: str | None = None):
         """Restore keyboard."""
         return self.module.restore_keyboard(ime, device_id)
 
+    def start_frame_source(self, device_id: str | None = None) -> bool:
+        """
+        Start a persistent scrcpy frame source for fast screenshots.
+
+        Only supported for ADB devices; other device types return False.
+        """
+        if self.device_type != DeviceType.ADB:
+            return False
+
+        from phone_agent.adb.scrcpy import start_frame_source
+
+        return start_frame_source(device_id) is not None
+
+    def stop_frame_source(self, device_id: str | None = None):
+        """Stop the persistent frame source started by start_frame_source."""
+        if self.device_type != DeviceType.ADB:
+            return
+
+        from phone_agent.adb.scrcpy import stop_frame_source
+
+        stop_frame_source(device_id)
+
     def list_devices(self):
         """List connected devices."""
         return self.module.list_devices()
@@ -139,7 +175,7 @@ class DeviceFactory:
             raise ValueError(f"Unknown device type: {self.device_type}")
 
 
-# Global device factory instance
+# Global device factory, used when no factory is passed to an agent
 _device_factory: DeviceFactory | None = None
 
 
@@ -158,6 +194,10 @@ def get_device_factory() -> DeviceFactory:
     """
     Get the global device factory instance.
 
+    This is the default for agents and action handlers created without a
+    device_factory argument. To drive several devices of different types
+    from one process, pass each agent its own DeviceFactory instead.
+
     Returns:
         The device factory instance.
     """
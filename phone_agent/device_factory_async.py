@@ -0,0 +1,479 @@
+"""Async device factory for driving many devices from one event loop.
+
+``AsyncDeviceFactory`` mirrors ``DeviceFactory`` with coroutines. ADB commands
+go over the ADB server socket (falling back to an ``adb`` subprocess), and
+HDC commands run as asyncio subprocesses, so waiting on a device never holds
+a thread. Post-action waits poll the screen with ``asyncio.sleep``.
+
+Commands and output parsing come from the synchronous backend modules
+(``adb.device.tap_args``, ``hdc.device.parse_current_app``, ...), so both
+paths send the same commands. Rarely used operations without an async
+implementation (launcher activity resolution, HarmonyOS text input, keyboard
+setup, device listing, scrcpy start/stop) run the synchronous backend in the
+default executor.
+
+Cancelling a coroutine kills its subprocess or closes its socket, so
+cancellation reaches the device command that is running.
+"""
+
+import asyncio
+import os
+import subprocess
+import tempfile
+import uuid
+
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.device_factory import DeviceFactory, DeviceType
+from phone_agent.hdc.connection import is_hdc_verbose
+from phone_agent.telemetry import span
+
+
+async def run_command(
+    cmd: list[str], timeout: float | None = 10
+) -> subprocess.CompletedProcess:
+    """
+    Run a command as an asyncio subprocess.
+
+    Args:
+        cmd: Command and arguments.
+        timeout: Timeout in seconds (None waits forever).
+
+    Returns:
+        CompletedProcess with bytes stdout and stderr.
+
+    Raises:
+        subprocess.TimeoutExpired: If the command does not finish in time.
+            The process is killed, as it is when the caller is cancelled.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except BaseException as e:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        if isinstance(e, asyncio.TimeoutError):
+            raise subprocess.TimeoutExpired(cmd, timeout) from None
+        raise
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+
+class AsyncDeviceFactory:
+    """
+    Coroutine versions of the DeviceFactory operations for ADB and HDC.
+
+    Args:
+        device_type: The type of device to use (ADB or HDC).
+
+    Example:
+        >>> factory = AsyncDeviceFactory(DeviceType.ADB)
+        >>> screenshot = await factory.get_screenshot("emulator-5554")
+        >>> await factory.tap(500, 1000, "emulator-5554")
+    """
+
+    def __init__(self, device_type: DeviceType = DeviceType.ADB):
+        if device_type not in (DeviceType.ADB, DeviceType.HDC):
+            raise ValueError(f"Unknown device type: {device_type}")
+        self.device_type = device_type
+        # Synchronous backend for operations without an async implementation
+        self.sync = DeviceFactory(device_type)
+
+    # Commands
+
+    async def shell(
+        self, args: list[str], device_id: str | None = None, timeout: float = 10
+    ) -> subprocess.CompletedProcess:
+        """
+        Run a shell command on the device.
+
+        Args:
+            args: Command and arguments, joined with spaces as by the shell.
+            device_id: Optional device ID.
+            timeout: Timeout in seconds.
+
+        Returns:
+            CompletedProcess with text stdout (stderr merged for ADB).
+        """
+        if self.device_type == DeviceType.ADB:
+            from phone_agent.adb.protocol import ADBProtocolError
+            from phone_agent.adb.protocol_async import get_async_adb_client
+
+            command = " ".join(args)
+            try:
+                result = await get_async_adb_client().shell(device_id, command, timeout)
+                output = (result.stdout + result.stderr).decode("utf-8", errors="replace")
+                return subprocess.CompletedProcess(command, result.returncode, output, "")
+            except asyncio.TimeoutError:
+                raise subprocess.TimeoutExpired(command, timeout) from None
+            except (ADBProtocolError, EOFError, OSError) as e:
+                print(f"ADB server request failed, spawning instead: {e}")
+        elif is_hdc_verbose():
+            print(f"[HDC] Running command: {' '.join(self._prefix(device_id) + ['shell'] + args)}")
+
+        result = await run_command(self._prefix(device_id) + ["shell"] + args, timeout)
+        return subprocess.CompletedProcess(
+            result.args,
+            result.returncode,
+            result.stdout.decode("utf-8", errors="replace"),
+            result.stderr.decode("utf-8", errors="replace"),
+        )
+
+    async def exec_out(
+        self, args: list[str], device_id: str | None = None, timeout: float = 10
+    ) -> subprocess.CompletedProcess:
+        """
+        Run a command and capture its binary stdout, like ``adb exec-out``.
+
+        Args:
+            args: Command and arguments.
+            device_id: Optional ADB device ID.
+            timeout: Timeout in seconds.
+
+        Returns:
+            CompletedProcess with bytes stdout and stderr.
+        """
+        from phone_agent.adb.protocol import ADBProtocolError
+        from phone_agent.adb.protocol_async import get_async_adb_client
+
+        command = " ".join(args)
+        try:
+            data = await get_async_adb_client().exec_out(device_id, command, timeout)
+            return subprocess.CompletedProcess(command, 0, data, b"")
+        except asyncio.TimeoutError:
+            raise subprocess.TimeoutExpired(command, timeout) from None
+        except (ADBProtocolError, EOFError, OSError) as e:
+            print(f"ADB server request failed, spawning instead: {e}")
+        return await run_command(self._prefix(device_id) + ["exec-out"] + args, timeout)
+
+    def _prefix(self, device_id: str | None) -> list[str]:
+        """Command prefix with optional device specifier."""
+        if self.device_type == DeviceType.ADB:
+            return ["adb", "-s", device_id] if device_id else ["adb"]
+        return ["hdc", "-t", device_id] if device_id else ["hdc"]
+
+    # Observation
+
+    async def get_screenshot(self, device_id: str | None = None, timeout: int = 10):
+        """Get screenshot from device."""
+        if self.device_type == DeviceType.HDC:
+            return await self._get_screenshot_hdc(device_id, timeout)
+
+        from phone_agent.adb.scrcpy import get_frame_source
+        from phone_agent.adb.screenshot import (
+            CaptureMode,
+            get_capture_mode,
+            get_scrcpy_screenshot,
+            parse_png_screenshot,
+        )
+
+        source = get_frame_source(device_id)
+        if source is not None:
+            screenshot = get_scrcpy_screenshot(source)
+            if screenshot is not None:
+                return screenshot
+
+        if get_capture_mode(device_id) == CaptureMode.EXEC_OUT:
+            try:
+                result = await self.exec_out(["screencap", "-p"], device_id, timeout)
+                screenshot = parse_png_screenshot(result.stdout, result.stderr)
+                if screenshot is not None:
+                    return screenshot
+            except (OSError, subprocess.SubprocessError) as e:
+                print(f"Screenshot exec-out error: {e}")
+
+        # Raw and pull modes, and the fallback for unexpected output
+        return await asyncio.to_thread(self.sync.get_screenshot, device_id, timeout)
+
+    async def _get_screenshot_hdc(self, device_id: str | None, timeout: int):
+        """Capture a HarmonyOS screenshot with the same steps as hdc.screenshot."""
+        from phone_agent.hdc.screenshot import (
+            CAPTURE_COMMANDS,
+            capture_failed,
+            create_fallback_screenshot,
+            load_screenshot,
+            recv_args,
+        )
+
+        temp_path = os.path.join(tempfile.gettempdir(), f"screenshot_{uuid.uuid4()}.png")
+        try:
+            for command, failure_words in CAPTURE_COMMANDS:
+                result = await self.shell(command, device_id, timeout)
+                if not capture_failed(result.stdout + result.stderr, failure_words):
+                    break
+            else:
+                return create_fallback_screenshot(is_sensitive=True)
+
+            await run_command(self._prefix(device_id) + recv_args(temp_path), timeout=5)
+            screenshot = load_screenshot(temp_path)
+            return screenshot or create_fallback_screenshot(is_sensitive=False)
+        except (OSError, ValueError, subprocess.SubprocessError) as e:
+            print(f"Screenshot error: {e}")
+            return create_fallback_screenshot(is_sensitive=False)
+
+    async def get_current_app(self, device_id: str | None = None) -> str:
+        """Get current app name."""
+        if self.device_type == DeviceType.HDC:
+            from phone_agent.hdc.device import CURRENT_APP_COMMANDS, parse_current_app
+
+            output = ""
+            for command in CURRENT_APP_COMMANDS:
+                output = (await self.shell(command, device_id)).stdout
+                if output:
+                    break
+            if not output:
+                raise ValueError("No output from hidumper")
+            return parse_current_app(output)
+
+        from phone_agent.adb.device import (
+            CURRENT_APP_COMMANDS,
+            has_focus_lines,
+            parse_current_app,
+        )
+
+        output = ""
+        for command in CURRENT_APP_COMMANDS:
+            output = (await self.shell(command, device_id)).stdout
+            if has_focus_lines(output):
+                break
+        if not output:
+            raise ValueError("No output from dumpsys window")
+        return parse_current_app(output)
+
+    async def wait_for_screen(
+        self, device_id: str | None = None, max_wait: float = 1.0, min_wait: float = 0.0
+    ) -> float:
+        """Wait until the screen is stable (at most max_wait seconds)."""
+        if max_wait <= 0:
+            return 0.0
+        from phone_agent.stability import wait_for_stable_screen_async
+
+        with span("post_action_wait"):
+            if self.device_type == DeviceType.HDC or not TIMING_CONFIG.stability.enabled:
+                # HDC capture is too slow to poll, as in hdc.wait_for_screen
+                await asyncio.sleep(max_wait)
+                return max_wait
+            return await wait_for_stable_screen_async(
+                lambda: self._get_preview_frame(device_id), max_wait, min_wait
+            )
+
+    async def _get_preview_frame(self, device_id: str | None, step: int = 8):
+        """Low-resolution frame for change detection, as adb.get_preview_frame."""
+        from phone_agent.adb.screenshot import (
+            check_raw_frame,
+            preview_command,
+            preview_from_raw,
+            preview_from_samples,
+            scrcpy_preview_frame,
+        )
+
+        # Reads the in-memory frame, no device round trip
+        frame = scrcpy_preview_frame(device_id, step)
+        if frame is not None:
+            return frame
+
+        command = preview_command(device_id)
+        if command is not None:
+            result = await self.exec_out([command], device_id)
+            frame = preview_from_samples(device_id, result.stdout, step)
+            if frame is not None:
+                return frame
+
+        result = await self.exec_out(["screencap"], device_id)
+        data = check_raw_frame(result.stdout, result.stderr)
+        if not data:
+            raise RuntimeError("Raw screen capture unavailable")
+        return preview_from_raw(device_id, data, step)
+
+    # Input
+
+    @property
+    def _commands(self):
+        """Backend module building the device commands."""
+        if self.device_type == DeviceType.HDC:
+            from phone_agent.hdc import device
+        else:
+            from phone_agent.adb import device
+        return device
+
+    async def tap(
+        self, x: int, y: int, device_id: str | None = None, delay: float | None = None
+    ):
+        """Tap at coordinates."""
+        if delay is None:
+            delay = TIMING_CONFIG.device.default_tap_delay
+        await self.shell(self._commands.tap_args(x, y), device_id)
+        await self.wait_for_screen(device_id, delay, TIMING_CONFIG.stability.min_tap_wait)
+
+    async def double_tap(
+        self, x: int, y: int, device_id: str | None = None, delay: float | None = None
+    ):
+        """Double tap at coordinates."""
+        if delay is None:
+            delay = TIMING_CONFIG.device.default_double_tap_delay
+        if self.device_type == DeviceType.HDC:
+            await self.shell(self._commands.double_tap_args(x, y), device_id)
+        else:
+            await self.shell(self._commands.tap_args(x, y), device_id)
+            await asyncio.sleep(TIMING_CONFIG.device.double_tap_interval)
+            await self.shell(self._commands.tap_args(x, y), device_id)
+        await self.wait_for_screen(device_id, delay, TIMING_CONFIG.stability.min_tap_wait)
+
+    async def long_press(
+        self,
+        x: int,
+        y: int,
+        duration_ms: int = 3000,
+        device_id: str | None = None,
+        delay: float | None = None,
+    ):
+        """Long press at coordinates."""
+        if delay is None:
+            delay = TIMING_CONFIG.device.default_long_press_delay
+        if self.device_type == DeviceType.HDC:
+            await self.shell(self._commands.long_press_args(x, y), device_id)
+        else:
+            await self.shell(self._commands.long_press_args(x, y, duration_ms), device_id)
+        await self.wait_for_screen(device_id, delay, TIMING_CONFIG.stability.min_tap_wait)
+
+    async def swipe(
+        self,
+        start_x: int,
+        start_y: int,
+        end_x: int,
+        end_y: int,
+        duration_ms: int | None = None,
+        device_id: str | None = None,
+        delay: float | None = None,
+    ):
+        """Swipe from start to end."""
+        if delay is None:
+            delay = TIMING_CONFIG.device.default_swipe_delay
+        await self.shell(
+            self._commands.swipe_args(start_x, start_y, end_x, end_y, duration_ms),
+            device_id,
+        )
+        await self.wait_for_screen(
+            device_id, delay, TIMING_CONFIG.stability.min_swipe_wait
+        )
+
+    async def back(self, device_id: str | None = None, delay: float | None = None):
+        """Press back button."""
+        if delay is None:
+            delay = TIMING_CONFIG.device.default_back_delay
+        await self.shell(self._commands.back_args(), device_id)
+        await self.wait_for_screen(device_id, delay, TIMING_CONFIG.stability.min_back_wait)
+
+    async def home(self, device_id: str | None = None, delay: float | None = None):
+        """Press home button."""
+        if delay is None:
+            delay = TIMING_CONFIG.device.default_home_delay
+        await self.shell(self._commands.home_args(), device_id)
+        await self.wait_for_screen(device_id, delay, TIMING_CONFIG.stability.min_home_wait)
+
+    async def launch_app(
+        self, app_name: str, device_id: str | None = None, delay: float | None = None
+    ) -> bool:
+        """Launch an app."""
+        if delay is None:
+            delay = TIMING_CONFIG.device.default_launch_delay
+
+        if self.device_type == DeviceType.HDC:
+            from phone_agent.config.apps_harmonyos import APP_PACKAGES
+            from phone_agent.hdc.device import launch_args
+
+            if app_name not in APP_PACKAGES:
+                print(f"[HDC] App '{app_name}' not found in HarmonyOS app list")
+                return False
+            await self.shell(launch_args(APP_PACKAGES[app_name]), device_id)
+            await self.wait_for_screen(device_id, delay)
+            return True
+
+        from phone_agent.adb.device import monkey_args
+        from phone_agent.adb.launcher import launch_package
+        from phone_agent.config.apps import APP_PACKAGES
+
+        if app_name not in APP_PACKAGES:
+            return False
+        package = APP_PACKAGES[app_name]
+
+        # Launcher activity resolution is cached and rare; `am start -W` is
+        # one round trip, so the synchronous path runs in the executor
+        try:
+            result = await asyncio.to_thread(launch_package, package, device_id)
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"Launcher activity launch failed, using monkey: {e}")
+            result = None
+
+        if result is not None and result.success and result.total_time_ms is not None:
+            await self.wait_for_screen(
+                device_id, min(delay, TIMING_CONFIG.device.launch_settle_delay)
+            )
+            return True
+
+        if result is None or not result.success:
+            await self.shell(monkey_args(package), device_id)
+        await self.wait_for_screen(
+            device_id, delay, TIMING_CONFIG.stability.min_launch_wait
+        )
+        return True
+
+    # Text input
+
+    async def type_text(self, text: str, device_id: str | None = None):
+        """Type text."""
+        if self.device_type == DeviceType.HDC:
+            return await asyncio.to_thread(self.sync.type_text, text, device_id)
+
+        from phone_agent.adb.input import type_text_commands
+
+        for command in type_text_commands(text):
+            await self.shell(command, device_id)
+
+    async def paste_text(self, text: str, device_id: str | None = None):
+        """Enter long text in bulk."""
+        if self.device_type == DeviceType.HDC:
+            return await asyncio.to_thread(self.sync.paste_text, text, device_id)
+        # ADB Keyboard commits each broadcast in one go, as in adb.paste_text
+        await self.type_text(text, device_id)
+
+    async def clear_text(self, device_id: str | None = None):
+        """Clear text."""
+        if self.device_type == DeviceType.HDC:
+            return await asyncio.to_thread(self.sync.clear_text, device_id)
+
+        from phone_agent.adb.input import clear_text_args
+
+        await self.shell(clear_text_args(), device_id)
+
+    async def detect_and_set_adb_keyboard(self, device_id: str | None = None) -> str:
+        """Detect and set keyboard (once per task, in the executor)."""
+        return await asyncio.to_thread(self.sync.detect_and_set_adb_keyboard, device_id)
+
+    async def get_current_ime(self, device_id: str | None = None) -> str:
+        """Get the current input method."""
+        return await asyncio.to_thread(self.sync.get_current_ime, device_id)
+
+    async def restore_keyboard(self, ime: str, device_id: str | None = None):
+        """Restore keyboard (once per task, in the executor)."""
+        await asyncio.to_thread(self.sync.restore_keyboard, ime, device_id)
+
+    # Setup
+
+    async def start_frame_source(self, device_id: str | None = None) -> bool:
+        """Start a persistent scrcpy frame source (ADB only)."""
+        return await asyncio.to_thread(self.sync.start_frame_source, device_id)
+
+    async def stop_frame_source(self, device_id: str | None = None):
+        """Stop the persistent frame source started by start_frame_source."""
+        await asyncio.to_thread(self.sync.stop_frame_source, device_id)
+
+    async def list_devices(self):
+        """List connected devices."""
+        return await asyncio.to_thread(self.sync.list_devices)
+
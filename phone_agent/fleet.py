@@ -0,0 +1,294 @@
+"""Run a queue of tasks across a pool of ADB and HarmonyOS devices.
+
+Tasks are read as JSON Lines, one task per line::
+
+    {"task": "打开微信", "id": "daily-1"}
+    {"task": "Open Settings", "device_id": "emulator-5554", "max_steps": 30}
+    "A bare JSON string is also accepted"
+
+Each device gets one worker thread with its own agent and device backend.
+Tasks pinned to a device with ``device_id`` wait for that device; the others
+go to whichever device is idle first. One JSON line per finished task is
+written to the output as soon as the task ends.
+"""
+
+import json
+import queue
+import threading
+import time
+import traceback
+from dataclasses import asdict, dataclass, field, replace
+from typing import IO, Iterable
+
+from phone_agent.agent import AgentConfig, PhoneAgent
+from phone_agent.device_factory import DeviceFactory, DeviceType
+from phone_agent.model import ModelConfig
+from phone_agent.telemetry import TaskTrace
+
+
+@dataclass
+class FleetTask:
+    """One task in the queue."""
+
+    task: str
+    id: str | None = None
+    device_id: str | None = None  # Run only on this device
+    max_steps: int | None = None  # Overrides AgentConfig.max_steps
+
+
+@dataclass
+class FleetDevice:
+    """A device that can run tasks."""
+
+    device_id: str
+    device_type: DeviceType
+
+
+@dataclass
+class TaskResult:
+    """Outcome of one task, written as a JSON line."""
+
+    id: str | None
+    task: str
+    device_id: str
+    device_type: str
+    status: str  # "success", "failed", "max_steps" or "error"
+    message: str | None
+    steps: int
+    wall_time: float  # Seconds from start to end of the task
+    model_time: float  # Seconds spent waiting for the model
+    started_at: float  # Unix timestamp
+    stage_times: dict[str, float] = field(default_factory=dict)  # Seconds per stage
+
+
+def parse_task_line(line: str, line_number: int = 0) -> FleetTask | None:
+    """
+    Parse one JSON line into a task.
+
+    Args:
+        line: A JSON object with a "task" key, or a JSON string.
+        line_number: Line number used for default task IDs and messages.
+
+    Returns:
+        The task, or None for blank lines.
+
+    Raises:
+        ValueError: If the line is not a valid task.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    data = json.loads(line)
+    if isinstance(data, str):
+        data = {"task": data}
+    if not isinstance(data, dict) or not data.get("task"):
+        raise ValueError(f"Line {line_number}: expected an object with a 'task' key")
+    return FleetTask(
+        task=data["task"],
+        id=str(data.get("id", line_number)),
+        device_id=data.get("device_id"),
+        max_steps=data.get("max_steps"),
+    )
+
+
+def read_tasks(stream: IO[str]) -> Iterable[FleetTask]:
+    """
+    Read tasks from a JSON Lines stream, skipping invalid lines.
+
+    Args:
+        stream: Text stream such as an open file or sys.stdin.
+
+    Yields:
+        Tasks in input order, as they are read.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        try:
+            task = parse_task_line(line, line_number)
+        except ValueError as e:
+            print(f"Skipping invalid task line {line_number}: {e}")
+            continue
+        if task is not None:
+            yield task
+
+
+def discover_devices(
+    device_types: Iterable[DeviceType] = (DeviceType.ADB, DeviceType.HDC),
+) -> list[FleetDevice]:
+    """
+    Find connected, ready devices via ADB and HDC.
+
+    Args:
+        device_types: Tools to query; missing tools are skipped.
+
+    Returns:
+        Ready devices in discovery order.
+    """
+    devices = []
+    for device_type in device_types:
+        try:
+            connection = DeviceFactory(device_type).get_connection_class()()
+            found = connection.list_devices()
+        except Exception as e:
+            print(f"Could not list {device_type.value.upper()} devices: {e}")
+            continue
+        for info in found:
+            # "hdc list targets" prints "[Empty]" when nothing is connected
+            if info.status != "device" or info.device_id.startswith("["):
+                continue
+            devices.append(FleetDevice(info.device_id, device_type))
+    return devices
+
+
+class FleetRunner:
+    """
+    Schedules tasks onto idle devices, one worker thread per device.
+
+    Agents share the process-wide model connection pool, so the model
+    endpoint sees one client with several concurrent requests.
+
+    Args:
+        devices: Devices to run tasks on.
+        model_config: Model configuration shared by all agents.
+        agent_config: Template agent configuration; device_id is set per worker.
+        output: Text stream that receives one JSON result line per task.
+
+    Example:
+        >>> runner = FleetRunner(discover_devices(), ModelConfig(), AgentConfig(), out)
+        >>> results = runner.run(read_tasks(open("tasks.jsonl")))
+    """
+
+    POLL_INTERVAL = 0.5  # Seconds between queue checks while idle
+
+    def __init__(
+        self,
+        devices: list[FleetDevice],
+        model_config: ModelConfig,
+        agent_config: AgentConfig,
+        output: IO[str],
+    ):
+        if not devices:
+            raise ValueError("FleetRunner needs at least one device")
+        self.devices = devices
+        self.model_config = model_config
+        self.agent_config = agent_config
+        self.output = output
+        self.results: list[TaskResult] = []
+        self.traces: list[TaskTrace] = []  # Stage spans of every finished task
+        self._shared: queue.Queue[FleetTask] = queue.Queue()
+        self._pinned: dict[str, queue.Queue[FleetTask]] = {
+            device.device_id: queue.Queue() for device in devices
+        }
+        self._input_done = threading.Event()
+        self._output_lock = threading.Lock()
+
+    def run(self, tasks: Iterable[FleetTask]) -> list[TaskResult]:
+        """
+        Run all tasks and wait for them to finish.
+
+        Tasks are consumed lazily, so a stream such as stdin can keep
+        feeding the queue while devices are already working.
+
+        Args:
+            tasks: Tasks to run.
+
+        Returns:
+            Results in completion order.
+        """
+        workers = [
+            threading.Thread(
+                target=self._worker,
+                args=(device,),
+                name=f"fleet-{device.device_id}",
+                daemon=True,
+            )
+            for device in self.devices
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            for task in tasks:
+                if task.device_id is None:
+                    self._shared.put(task)
+                elif task.device_id in self._pinned:
+                    self._pinned[task.device_id].put(task)
+                else:
+                    print(f"Skipping task {task.id}: device {task.device_id} not found")
+        finally:
+            self._input_done.set()
+
+        for worker in workers:
+            worker.join()
+        return self.results
+
+    def _next_task(self, device: FleetDevice) -> FleetTask | None:
+        """Get the next task for a device, or None once all input is done."""
+        pinned = self._pinned[device.device_id]
+        while True:
+            try:
+                return pinned.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                return self._shared.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                if self._input_done.is_set() and pinned.empty() and self._shared.empty():
+                    return None
+
+    def _worker(self, device: FleetDevice) -> None:
+        agent = PhoneAgent(
+            model_config=self.model_config,
+            agent_config=replace(self.agent_config, device_id=device.device_id),
+            device_factory=DeviceFactory(device.device_type),
+        )
+        while True:
+            task = self._next_task(device)
+            if task is None:
+                return
+            self._emit(self._run_task(agent, device, task))
+
+    def _run_task(
+        self, agent: PhoneAgent, device: FleetDevice, task: FleetTask
+    ) -> TaskResult:
+        """Run one task on a device's agent and summarize the outcome."""
+        agent.agent_config.max_steps = task.max_steps or self.agent_config.max_steps
+        started_at = time.time()
+        try:
+            message = agent.run(task.task)
+            last = agent.last_result
+            if last is not None and last.finished:
+                status = "success" if last.success else "failed"
+            else:
+                status = "max_steps"
+        except Exception as e:
+            traceback.print_exc()
+            message = f"{type(e).__name__}: {e}"
+            status = "error"
+
+        trace = agent.trace
+        if trace is not None:
+            with self._output_lock:
+                self.traces.append(trace)
+
+        return TaskResult(
+            id=task.id,
+            task=task.task,
+            device_id=device.device_id,
+            device_type=device.device_type.value,
+            status=status,
+            message=message,
+            steps=agent.step_count,
+            wall_time=round(time.time() - started_at, 3),
+            model_time=round(agent.model_time, 3),
+            started_at=started_at,
+            stage_times=(
+                {k: round(v, 3) for k, v in trace.totals().items()} if trace else {}
+            ),
+        )
+
+    def _emit(self, result: TaskResult) -> None:
+        """Write a result line and keep it for the summary."""
+        with self._output_lock:
+            self.results.append(result)
+            self.output.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+            self.output.flush()
@@ -4,6 +4,7 @@ from phone_agent.hdc.connection import (
     HDCConnection,
     ConnectionType,
     DeviceInfo,
+    is_hdc_verbose,
     list_devices,
     quick_connect,
     set_hdc_verbose,
@@ -17,10 +18,13 @@ from phone_agent.hdc.device import (
     long_press,
     swipe,
     tap,
+    wait_for_screen,
 )
 from phone_agent.hdc.input import (
     clear_text,
     detect_and_set_adb_keyboard,
+    get_current_ime,
+    paste_text,
     restore_keyboard,
     type_text,
 )
@@ -31,8 +35,10 @@ __all__ = [
     "get_screenshot",
     # Input
     "type_text",
+    "paste_text",
     "clear_text",
     "detect_and_set_adb_keyboard",
+    "get_current_ime",
     "restore_keyboard",
     # Device control
     "get_current_app",
@@ -43,6 +49,7 @@ __all__ = [
     "double_tap",
     "long_press",
     "launch_app",
+    "wait_for_screen",
     # Connection management
     "HDCConnection",
     "DeviceInfo",
@@ -50,4 +57,5 @@ __all__ = [
     "quick_connect",
     "list_devices",
     "set_hdc_verbose",
+    "is_hdc_verbose",
 ]
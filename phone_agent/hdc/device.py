@@ -5,9 +5,21 @@ import subprocess
 import time
 from typing import List, Optional, Tuple
 
+from phone_agent.config.app_index import get_app_index
 from phone_agent.config.apps_harmonyos import APP_ABILITIES, APP_PACKAGES
 from phone_agent.config.timing import TIMING_CONFIG
 from phone_agent.hdc.connection import _run_hdc_command
+from phone_agent.telemetry import span
+
+_HIDUMPER = ["hidumper", "-s", "WindowManagerService", "-a", "-a"]
+
+# Commands printing the window manager state, tried in order until one has
+# output. The first filters on the device so only the focus lines cross the
+# wire.
+CURRENT_APP_COMMANDS = (
+    _HIDUMPER + ["|", "grep", "-iE", "'focused|current'"],
+    _HIDUMPER,
+)
 
 
 def get_current_app(device_id: str | None = None) -> str:
@@ -22,22 +34,31 @@ def get_current_app(device_id: str | None = None) -> str:
     """
     hdc_prefix = _get_hdc_prefix(device_id)
 
-    result = _run_hdc_command(
-        hdc_prefix + ["shell", "hidumper", "-s", "WindowManagerService", "-a", "-a"],
-        capture_output=True,
-        text=True,
-        encoding="utf-8"
-    )
-    output = result.stdout
+    output = ""
+    for command in CURRENT_APP_COMMANDS:
+        result = _run_hdc_command(
+            hdc_prefix + ["shell"] + command,
+            capture_output=True,
+            text=True,
+            encoding="utf-8"
+        )
+        output = result.stdout
+        if output:
+            break
     if not output:
         raise ValueError("No output from hidumper")
 
-    # Parse window focus info
+    return parse_current_app(output)
+
+
+def parse_current_app(output: str) -> str:
+    """Find the focused app in `hidumper` window manager output."""
+    index = get_app_index(APP_PACKAGES)
     for line in output.split("\n"):
         if "focused" in line.lower() or "current" in line.lower():
-            for app_name, package in APP_PACKAGES.items():
-                if package in line:
-                    return app_name
+            app_name = index.find_app_name(line)
+            if app_name is not None:
+                return app_name
 
     return "System Home"
 
@@ -59,12 +80,8 @@ def tap(
 
     hdc_prefix = _get_hdc_prefix(device_id)
 
-    # HarmonyOS uses uitest uiInput click
-    _run_hdc_command(
-        hdc_prefix + ["shell", "uitest", "uiInput", "click", str(x), str(y)],
-        capture_output=True
-    )
-    time.sleep(delay)
+    _run_hdc_command(hdc_prefix + ["shell"] + tap_args(x, y), capture_output=True)
+    wait_for_screen(device_id, delay)
 
 
 def double_tap(
@@ -84,12 +101,10 @@ def double_tap(
 
     hdc_prefix = _get_hdc_prefix(device_id)
 
-    # HarmonyOS uses uitest uiInput doubleClick
     _run_hdc_command(
-        hdc_prefix + ["shell", "uitest", "uiInput", "doubleClick", str(x), str(y)],
-        capture_output=True
+        hdc_prefix + ["shell"] + double_tap_args(x, y), capture_output=True
     )
-    time.sleep(delay)
+    wait_for_screen(device_id, delay)
 
 
 def long_press(
@@ -114,13 +129,10 @@ def long_press(
 
     hdc_prefix = _get_hdc_prefix(device_id)
 
-    # HarmonyOS uses uitest uiInput longClick
-    # Note: longClick may have a fixed duration, duration_ms parameter might not be supported
     _run_hdc_command(
-        hdc_prefix + ["shell", "uitest", "uiInput", "longClick", str(x), str(y)],
-        capture_output=True,
+        hdc_prefix + ["shell"] + long_press_args(x, y), capture_output=True
     )
-    time.sleep(delay)
+    wait_for_screen(device_id, delay)
 
 
 def swipe(
@@ -149,30 +161,11 @@ def swipe(
 
     hdc_prefix = _get_hdc_prefix(device_id)
 
-    if duration_ms is None:
-        # Calculate duration based on distance
-        dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
-        duration_ms = int(dist_sq / 1000)
-        duration_ms = max(500, min(duration_ms, 1000))  # Clamp between 500-1000ms
-
-    # HarmonyOS uses uitest uiInput swipe
-    # Format: swipe startX startY endX endY duration
     _run_hdc_command(
-        hdc_prefix
-        + [
-            "shell",
-            "uitest",
-            "uiInput",
-            "swipe",
-            str(start_x),
-            str(start_y),
-            str(end_x),
-            str(end_y),
-            str(duration_ms),
-        ],
+        hdc_prefix + ["shell"] + swipe_args(start_x, start_y, end_x, end_y, duration_ms),
         capture_output=True,
     )
-    time.sleep(delay)
+    wait_for_screen(device_id, delay)
 
 
 def back(device_id: str | None = None, delay: float | None = None) -> None:
@@ -188,12 +181,8 @@ def back(device_id: str | None = None, delay: float | None = None) -> None:
 
     hdc_prefix = _get_hdc_prefix(device_id)
 
-    # HarmonyOS uses uitest uiInput keyEvent Back
-    _run_hdc_command(
-        hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "Back"],
-        capture_output=True
-    )
-    time.sleep(delay)
+    _run_hdc_command(hdc_prefix + ["shell"] + back_args(), capture_output=True)
+    wait_for_screen(device_id, delay)
 
 
 def home(device_id: str | None = None, delay: float | None = None) -> None:
@@ -209,12 +198,8 @@ def home(device_id: str | None = None, delay: float | None = None) -> None:
 
     hdc_prefix = _get_hdc_prefix(device_id)
 
-    # HarmonyOS uses uitest uiInput keyEvent Home
-    _run_hdc_command(
-        hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "Home"],
-        capture_output=True
-    )
-    time.sleep(delay)
+    _run_hdc_command(hdc_prefix + ["shell"] + home_args(), capture_output=True)
+    wait_for_screen(device_id, delay)
 
 
 def launch_app(
@@ -240,31 +225,96 @@ def launch_app(
         return False
 
     hdc_prefix = _get_hdc_prefix(device_id)
-    bundle = APP_PACKAGES[app_name]
-
-    # Get the ability name for this bundle
-    # Default to "EntryAbility" if not specified in APP_ABILITIES
-    ability = APP_ABILITIES.get(bundle, "EntryAbility")
-
-    # HarmonyOS uses 'aa start' command to launch apps
-    # Format: aa start -b {bundle} -a {ability}
     _run_hdc_command(
-        hdc_prefix
-        + [
-            "shell",
-            "aa",
-            "start",
-            "-b",
-            bundle,
-            "-a",
-            ability,
-        ],
+        hdc_prefix + ["shell"] + launch_args(APP_PACKAGES[app_name]),
         capture_output=True,
     )
-    time.sleep(delay)
+    wait_for_screen(device_id, delay)
     return True
 
 
+def wait_for_screen(
+    device_id: str | None = None, max_wait: float = 1.0, min_wait: float = 0.0
+) -> float:
+    """
+    Wait after an action.
+
+    Args:
+        device_id: Optional HDC device ID.
+        max_wait: Maximum time to wait in seconds.
+        min_wait: Minimum time to wait in seconds.
+
+    Returns:
+        The time actually waited in seconds.
+
+    Note:
+        HDC screen capture is too slow to poll for stability, so this always
+        sleeps for ``max_wait``.
+    """
+    if max_wait <= 0:
+        return 0.0
+    with span("post_action_wait"):
+        time.sleep(max_wait)
+    return max_wait
+
+
+def tap_args(x: int, y: int) -> list[str]:
+    """Shell command tapping at the coordinates."""
+    return ["uitest", "uiInput", "click", str(x), str(y)]
+
+
+def double_tap_args(x: int, y: int) -> list[str]:
+    """Shell command double tapping at the coordinates."""
+    return ["uitest", "uiInput", "doubleClick", str(x), str(y)]
+
+
+def long_press_args(x: int, y: int) -> list[str]:
+    """Shell command long pressing the coordinates."""
+    # Note: longClick may have a fixed duration, duration_ms parameter might not be supported
+    return ["uitest", "uiInput", "longClick", str(x), str(y)]
+
+
+def swipe_args(
+    start_x: int, start_y: int, end_x: int, end_y: int, duration_ms: int | None = None
+) -> list[str]:
+    """Shell command swiping from start to end (duration from the distance if None)."""
+    if duration_ms is None:
+        # Calculate duration based on distance
+        dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
+        duration_ms = int(dist_sq / 1000)
+        duration_ms = max(500, min(duration_ms, 1000))  # Clamp between 500-1000ms
+
+    # Format: swipe startX startY endX endY duration
+    return [
+        "uitest",
+        "uiInput",
+        "swipe",
+        str(start_x),
+        str(start_y),
+        str(end_x),
+        str(end_y),
+        str(duration_ms),
+    ]
+
+
+def back_args() -> list[str]:
+    """Shell command pressing the back button."""
+    return ["uitest", "uiInput", "keyEvent", "Back"]
+
+
+def home_args() -> list[str]:
+    """Shell command pressing the home button."""
+    return ["uitest", "uiInput", "keyEvent", "Home"]
+
+
+def launch_args(bundle: str) -> list[str]:
+    """Shell command starting the ability of a bundle."""
+    # Default to "EntryAbility" if not specified in APP_ABILITIES
+    ability = APP_ABILITIES.get(bundle, "EntryAbility")
+    # Format: aa start -b {bundle} -a {ability}
+    return ["aa", "start", "-b", bundle, "-a", ability]
+
+
 def _get_hdc_prefix(device_id: str | None) -> list:
     """Get HDC command prefix with optional device specifier."""
     if device_id:
@@ -5,6 +5,13 @@ import subprocess
 from typing import Optional
 
 from phone_agent.hdc.connection import _run_hdc_command
+from phone_agent.text_chunks import split_utf8
+
+# HarmonyOS key code for ENTER
+_KEYCODE_ENTER = "2054"
+
+# Maximum size of one batched shell command line
+_MAX_SCRIPT_BYTES = 4000
 
 
 def type_text(text: str, device_id: str | None = None) -> None:
@@ -63,6 +70,52 @@ def type_text(text: str, device_id: str | None = None) -> None:
         )
 
 
+def paste_text(text: str, device_id: str | None = None) -> None:
+    """
+    Enter a long text in bulk.
+
+    All lines and ENTER key events are batched into as few ``hdc shell``
+    invocations as the argument limit allows, instead of one process per
+    line and per ENTER.
+
+    Args:
+        text: The text to enter. Supports multi-line text.
+        device_id: Optional HDC device ID for multi-device setups.
+
+    Note:
+        There is no clipboard path on HarmonyOS. Neither hdc nor uitest has
+        a command that writes the system pasteboard (nothing like WDA's
+        setPasteboard), and the pasteboard service only accepts data from
+        the foreground application, not from the shell. ``uitest uiInput
+        text`` injects a whole chunk per call, so batching the calls is the
+        bulk path.
+    """
+    hdc_prefix = _get_hdc_prefix(device_id)
+
+    commands = []
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        # Leave room for the command and quoting around each chunk
+        for chunk in split_utf8(line, _MAX_SCRIPT_BYTES // 2) if line else []:
+            quoted = "'" + chunk.replace("'", "'\\''") + "'"
+            commands.append(f"uitest uiInput text {quoted}")
+        if i < len(lines) - 1:
+            commands.append(f"uitest uiInput keyEvent {_KEYCODE_ENTER}")
+
+    script = []
+    for command in commands:
+        if script and len("; ".join(script + [command]).encode("utf-8")) > _MAX_SCRIPT_BYTES:
+            _run_hdc_command(
+                hdc_prefix + ["shell", "; ".join(script)], capture_output=True, text=True
+            )
+            script = []
+        script.append(command)
+    if script:
+        _run_hdc_command(
+            hdc_prefix + ["shell", "; ".join(script)], capture_output=True, text=True
+        )
+
+
 def clear_text(device_id: str | None = None) -> None:
     """
     Clear text in the currently focused input field.
@@ -103,20 +156,30 @@ def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
         This is a placeholder. HarmonyOS may not support ADB Keyboard.
         If there's a similar tool for HarmonyOS, integrate it here.
     """
+    # If ADB Keyboard equivalent exists for HarmonyOS, switch to it
+    # For now, we'll just return the current IME
+    return get_current_ime(device_id)
+
+
+def get_current_ime(device_id: str | None = None) -> str:
+    """
+    Get the current input method (if HarmonyOS supports querying it).
+
+    Args:
+        device_id: Optional HDC device ID for multi-device setups.
+
+    Returns:
+        The IME identifier, or an empty string if unavailable.
+    """
     hdc_prefix = _get_hdc_prefix(device_id)
 
-    # Get current IME (if HarmonyOS supports this)
     try:
         result = _run_hdc_command(
             hdc_prefix + ["shell", "settings", "get", "secure", "default_input_method"],
             capture_output=True,
             text=True,
         )
-        current_ime = (result.stdout + result.stderr).strip()
-
-        # If ADB Keyboard equivalent exists for HarmonyOS, switch to it
-        # For now, we'll just return the current IME
-        return current_ime
+        return (result.stdout + result.stderr).strip()
     except Exception:
         return ""
 
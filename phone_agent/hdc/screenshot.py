@@ -11,6 +11,18 @@ from typing import Tuple
 
 from PIL import Image
 from phone_agent.hdc.connection import _run_hdc_command
+from phone_agent.imaging import encode_image_bytes
+
+# HarmonyOS HDC only supports JPEG format
+_REMOTE_PATH = "/data/local/tmp/tmp_screenshot.jpeg"
+
+# Capture commands, tried in order, with the output words marking a failure:
+# `screenshot` on newer HarmonyOS versions, `snapshot_display` on older ones
+# or different devices. When all fail, the screen is sensitive.
+CAPTURE_COMMANDS = (
+    (["screenshot", _REMOTE_PATH], ("fail", "error", "not found")),
+    (["snapshot_display", "-f", _REMOTE_PATH], ("fail", "error")),
+)
 
 
 @dataclass
@@ -21,6 +33,7 @@ class Screenshot:
     width: int
     height: int
     is_sensitive: bool = False
+    mime_type: str = "image/png"
 
 
 def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
@@ -42,63 +55,70 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
     hdc_prefix = _get_hdc_prefix(device_id)
 
     try:
-        # Execute screenshot command
-        # HarmonyOS HDC only supports JPEG format
-        remote_path = "/data/local/tmp/tmp_screenshot.jpeg"
-
-        # Try method 1: hdc shell screenshot (newer HarmonyOS versions)
-        result = _run_hdc_command(
-            hdc_prefix + ["shell", "screenshot", remote_path],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
-
-        # Check for screenshot failure (sensitive screen)
-        output = result.stdout + result.stderr
-        if "fail" in output.lower() or "error" in output.lower() or "not found" in output.lower():
-            # Try method 2: snapshot_display (older versions or different devices)
+        for command, failure_words in CAPTURE_COMMANDS:
             result = _run_hdc_command(
-                hdc_prefix + ["shell", "snapshot_display", "-f", remote_path],
+                hdc_prefix + ["shell"] + command,
                 capture_output=True,
                 text=True,
                 timeout=timeout,
             )
-            output = result.stdout + result.stderr
-            if "fail" in output.lower() or "error" in output.lower():
-                return _create_fallback_screenshot(is_sensitive=True)
+            if not capture_failed(result.stdout + result.stderr, failure_words):
+                break
+        else:
+            # Screenshot failure (sensitive screen)
+            return create_fallback_screenshot(is_sensitive=True)
 
-        # Pull screenshot to local temp path
-        # Note: remote file is JPEG, but PIL can open it regardless of local extension
         _run_hdc_command(
-            hdc_prefix + ["file", "recv", remote_path, temp_path],
+            hdc_prefix + recv_args(temp_path),
             capture_output=True,
             text=True,
             timeout=5,
         )
+        return load_screenshot(temp_path) or create_fallback_screenshot(is_sensitive=False)
 
-        if not os.path.exists(temp_path):
-            return _create_fallback_screenshot(is_sensitive=False)
+    except Exception as e:
+        print(f"Screenshot error: {e}")
+        return create_fallback_screenshot(is_sensitive=False)
 
-        # Read JPEG image and convert to PNG for model inference
-        # PIL automatically detects the image format from file content
-        img = Image.open(temp_path)
-        width, height = img.size
 
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+def capture_failed(output: str, failure_words: tuple[str, ...]) -> bool:
+    """Whether the output of a CAPTURE_COMMANDS command reports a failure."""
+    output = output.lower()
+    return any(word in output for word in failure_words)
 
-        # Cleanup
-        os.remove(temp_path)
 
-        return Screenshot(
-            base64_data=base64_data, width=width, height=height, is_sensitive=False
-        )
+def recv_args(local_path: str) -> list[str]:
+    """HDC command pulling the captured screenshot to a local path."""
+    # Note: remote file is JPEG, but PIL can open it regardless of local extension
+    return ["file", "recv", _REMOTE_PATH, local_path]
 
-    except Exception as e:
-        print(f"Screenshot error: {e}")
-        return _create_fallback_screenshot(is_sensitive=False)
+
+def load_screenshot(local_path: str) -> Screenshot | None:
+    """
+    Read a pulled screenshot and encode it for model inference.
+
+    The file is removed afterwards.
+
+    Returns:
+        Screenshot object, or None if the file was not pulled.
+    """
+    if not os.path.exists(local_path):
+        return None
+
+    # PIL automatically detects the image format from file content
+    with open(local_path, "rb") as f:
+        data = f.read()
+    os.remove(local_path)
+
+    width, height = Image.open(BytesIO(data)).size
+    base64_data, mime_type = encode_image_bytes(data, width, height)
+    return Screenshot(
+        base64_data=base64_data,
+        width=width,
+        height=height,
+        is_sensitive=False,
+        mime_type=mime_type,
+    )
 
 
 def _get_hdc_prefix(device_id: str | None) -> list:
@@ -108,7 +128,7 @@ def _get_hdc_prefix(device_id: str | None) -> list:
     return ["hdc"]
 
 
-def _create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
+def create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
     """Create a black fallback image when screenshot fails."""
     default_width, default_height = 1080, 2400
 
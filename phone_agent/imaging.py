@@ -0,0 +1,154 @@
+"""Image helpers shared by the device backends."""
+
+import base64
+from io import BytesIO
+
+from PIL import Image
+
+from phone_agent.config.screenshot import ScreenshotConfig, get_screenshot_config
+
+# Leading bytes of each supported container format
+_SIGNATURES = {
+    "png": (b"\x89PNG\r\n\x1a\n",),
+    "jpeg": (b"\xff\xd8\xff",),
+    "webp": (b"RIFF",),
+}
+
+
+def detect_format(data: bytes) -> str | None:
+    """
+    Detect the image format from its leading bytes.
+
+    Args:
+        data: Encoded image bytes.
+
+    Returns:
+        "png", "jpeg", "webp" or None if unknown.
+    """
+    for fmt, signatures in _SIGNATURES.items():
+        if any(data.startswith(sig) for sig in signatures):
+            if fmt == "webp" and data[8:12] != b"WEBP":
+                continue
+            return fmt
+    return None
+
+
+def encode_image(
+    image: Image.Image, config: ScreenshotConfig | None = None
+) -> tuple[str, str]:
+    """
+    Downscale and encode an image for upload to the model.
+
+    Args:
+        image: Source image at device resolution.
+        config: Encoding configuration. Defaults to the global configuration.
+
+    Returns:
+        Tuple of (base64_data, mime_type).
+    """
+    config = config or get_screenshot_config()
+
+    image = _fit_long_edge(image, config.max_long_edge)
+
+    buffered = BytesIO()
+    if config.format == "png":
+        image.save(buffered, format="PNG")
+    else:
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(buffered, format=config.format.upper(), quality=config.quality)
+
+    return base64.b64encode(buffered.getvalue()).decode("utf-8"), config.mime_type
+
+
+def encode_image_bytes(
+    data: bytes,
+    width: int,
+    height: int,
+    config: ScreenshotConfig | None = None,
+) -> tuple[str, str]:
+    """
+    Encode already-compressed image bytes, avoiding a decode when possible.
+
+    If the bytes are already in the configured format and need no
+    downscaling, they are passed through unchanged.
+
+    Args:
+        data: Encoded image bytes (PNG, JPEG or WebP).
+        width: Image width in pixels.
+        height: Image height in pixels.
+        config: Encoding configuration. Defaults to the global configuration.
+
+    Returns:
+        Tuple of (base64_data, mime_type).
+    """
+    config = config or get_screenshot_config()
+
+    if detect_format(data) == config.format and not _needs_downscale(
+        width, height, config.max_long_edge
+    ):
+        return base64.b64encode(data).decode("utf-8"), config.mime_type
+
+    image = Image.open(BytesIO(data))
+    if image.format == "JPEG" and config.max_long_edge:
+        # Let the JPEG decoder skip detail that would be discarded anyway
+        image.draft("RGB", _scaled_size(width, height, config.max_long_edge))
+    return encode_image(image, config)
+
+
+def _needs_downscale(width: int, height: int, max_long_edge: int) -> bool:
+    """Whether an image of this size exceeds the long-edge limit."""
+    return max_long_edge > 0 and max(width, height) > max_long_edge
+
+
+def _scaled_size(width: int, height: int, max_long_edge: int) -> tuple[int, int]:
+    """Size that fits the long-edge limit while keeping the aspect ratio."""
+    scale = max_long_edge / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _fit_long_edge(image: Image.Image, max_long_edge: int) -> Image.Image:
+    """Downscale an image so its long edge fits, if needed."""
+    if not _needs_downscale(image.width, image.height, max_long_edge):
+        return image
+    size = _scaled_size(image.width, image.height, max_long_edge)
+    return image.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+
+
+def dhash(image: Image.Image, hash_size: int = 16) -> int:
+    """
+    Compute a difference hash (dHash) of an image.
+
+    The image is reduced to a (hash_size + 1) x hash_size grayscale grid and
+    each bit records whether a pixel is brighter than its right neighbour.
+    Visually similar screens give hashes with a small Hamming distance.
+
+    Args:
+        image: Source image.
+        hash_size: Grid size; the hash has hash_size ** 2 bits.
+
+    Returns:
+        The hash as an integer.
+    """
+    if image.format == "JPEG":
+        image.draft("L", (image.width // 8, image.height // 8))
+    gray = image.convert("L").resize(
+        (hash_size + 1, hash_size), Image.Resampling.BILINEAR
+    )
+    pixels = list(gray.getdata())
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+def dhash_base64(base64_data: str, hash_size: int = 16) -> int:
+    """Compute the dHash of a base64-encoded image such as Screenshot.base64_data."""
+    return dhash(Image.open(BytesIO(base64.b64decode(base64_data))), hash_size)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count("1")
@@ -1,5 +1,16 @@
 """Model client module for AI inference."""
 
+from phone_agent.model.admission import AdmissionConfig, AdmissionController
 from phone_agent.model.client import ModelClient, ModelConfig
+from phone_agent.model.client_async import AsyncModelClient
+from phone_agent.model.router import Endpoint, ModelRouter
 
-__all__ = ["ModelClient", "ModelConfig"]
+__all__ = [
+    "ModelClient",
+    "ModelConfig",
+    "AsyncModelClient",
+    "Endpoint",
+    "ModelRouter",
+    "AdmissionConfig",
+    "AdmissionController",
+]
@@ -0,0 +1,304 @@
+"""Process-wide admission control for model requests.
+
+When many agents share a model endpoint they tend to send requests in bursts,
+which hosted providers answer with 429s and self-hosted servers answer with
+long queues. ``AdmissionController`` sits in front of the router and admits
+each request only when:
+
+- fewer than ``max_concurrency`` requests are in flight (if set),
+- the requests-per-second token bucket has a token, and
+- the tokens-per-minute bucket covers the estimated prompt size.
+
+Waiting requests are served in arrival order, or by priority and then arrival
+order. Output tokens are charged to the tokens-per-minute bucket when a
+request finishes, so the bucket may go briefly negative and delay the next
+request instead of the current one.
+
+Settings can be changed with environment variables:
+    PHONE_AGENT_MODEL_MAX_CONCURRENCY, PHONE_AGENT_MODEL_RPS,
+    PHONE_AGENT_MODEL_TPM, PHONE_AGENT_ADMISSION_POLICY
+"""
+
+import asyncio
+import bisect
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from phone_agent.model.router import Endpoint
+
+
+@dataclass
+class AdmissionConfig:
+    """Limits applied to all requests sent to one set of endpoints."""
+
+    max_concurrency: int = 0  # In-flight requests; 0 means unlimited
+    rps: float = 0.0  # Requests per second; 0 means unlimited
+    tpm: int = 0  # Estimated tokens per minute; 0 means unlimited
+    policy: str = "fifo"  # "fifo" or "priority"
+    timeout: float = 300.0  # Max wait for admission in seconds
+
+    def __post_init__(self):
+        """Load values from environment variables if present."""
+        self.max_concurrency = int(
+            os.getenv("PHONE_AGENT_MODEL_MAX_CONCURRENCY", self.max_concurrency)
+        )
+        self.rps = float(os.getenv("PHONE_AGENT_MODEL_RPS", self.rps))
+        self.tpm = int(os.getenv("PHONE_AGENT_MODEL_TPM", self.tpm))
+        self.policy = os.getenv("PHONE_AGENT_ADMISSION_POLICY", self.policy)
+        if self.policy not in ("fifo", "priority"):
+            raise ValueError(f"Unknown admission policy: {self.policy}")
+
+
+# Seconds between admission checks of coroutines; they cannot wait on the
+# controller's condition without blocking the event loop
+ASYNC_POLL_INTERVAL = 0.05
+
+
+class AdmissionTimeout(RuntimeError):
+    """Raised when a request waits longer than the admission timeout."""
+
+
+class TokenBucket:
+    """
+    Token bucket that refills continuously up to its capacity.
+
+    Args:
+        rate: Tokens added per second.
+        capacity: Maximum tokens held; also the largest burst.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """
+        Seconds until ``amount`` tokens are available.
+
+        Amounts above the capacity only need a full bucket, so oversized
+        requests are delayed rather than rejected.
+        """
+        self._refill(now)
+        needed = min(amount, self.capacity) - self.tokens
+        return max(0.0, needed / self.rate)
+
+    def consume(self, amount: float, now: float) -> None:
+        """Take tokens; the balance may go negative."""
+        self._refill(now)
+        self.tokens -= amount
+
+
+class AdmissionController:
+    """
+    Bounds concurrency and request/token rates for a set of endpoints.
+
+    One controller is shared by every client using the same endpoints; see
+    get_admission_controller().
+
+    Args:
+        config: Admission limits.
+
+    Example:
+        >>> admission = AdmissionController(AdmissionConfig(rps=2, tpm=60000))
+        >>> wait = admission.acquire(tokens=3500)
+        >>> try:
+        ...     response = send_request()
+        ... finally:
+        ...     admission.release(output_tokens=200)
+    """
+
+    def __init__(self, config: AdmissionConfig | None = None):
+        self.config = config or AdmissionConfig()
+        self.max_concurrency = self.config.max_concurrency
+        self.in_flight = 0
+        self.admitted = 0
+        self.total_wait = 0.0
+        self._rps = (
+            TokenBucket(self.config.rps, max(self.config.rps, 1.0))
+            if self.config.rps > 0
+            else None
+        )
+        self._tpm = (
+            TokenBucket(self.config.tpm / 60.0, self.config.tpm)
+            if self.config.tpm > 0
+            else None
+        )
+        self._condition = threading.Condition()
+        self._waiting: list[tuple[int, int]] = []  # Sorted (order, sequence)
+        self._sequence = itertools.count()
+
+    def acquire(self, tokens: int = 0, priority: int = 0) -> float:
+        """
+        Wait until a request may be sent.
+
+        Args:
+            tokens: Estimated prompt tokens of the request.
+            priority: Higher values are admitted first under the "priority"
+                policy; ignored under "fifo".
+
+        Returns:
+            Seconds spent waiting for admission.
+
+        Raises:
+            AdmissionTimeout: If the request was not admitted in time.
+        """
+        start = time.monotonic()
+        ticket = self._enqueue(priority)
+        with self._condition:
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = self._admission_delay(ticket, tokens, now)
+                    if delay == 0.0:
+                        break
+                    self._condition.wait(min(delay, self._remaining(start, now)))
+            finally:
+                self._dequeue_locked(ticket)
+            return self._admit_locked(tokens, start, now)
+
+    async def acquire_async(self, tokens: int = 0, priority: int = 0) -> float:
+        """
+        Coroutine version of acquire() for asyncio clients.
+
+        Shares the queue and limits with blocking callers. A cancelled
+        coroutine leaves the queue without being admitted.
+
+        Args:
+            tokens: Estimated prompt tokens of the request.
+            priority: Admission priority (see acquire()).
+
+        Returns:
+            Seconds spent waiting for admission.
+        """
+        start = time.monotonic()
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._condition:
+                    now = time.monotonic()
+                    delay = self._admission_delay(ticket, tokens, now)
+                    if delay == 0.0:
+                        self._dequeue_locked(ticket)
+                        return self._admit_locked(tokens, start, now)
+                    remaining = self._remaining(start, now)
+                await asyncio.sleep(min(delay, remaining, ASYNC_POLL_INTERVAL))
+        except BaseException:
+            with self._condition:
+                if ticket in self._waiting:
+                    self._dequeue_locked(ticket)
+            raise
+
+    def _enqueue(self, priority: int) -> tuple[int, int]:
+        """Add a waiter to the queue and return its ticket."""
+        order = -priority if self.config.policy == "priority" else 0
+        ticket = (order, next(self._sequence))
+        with self._condition:
+            bisect.insort(self._waiting, ticket)
+        return ticket
+
+    def _dequeue_locked(self, ticket: tuple[int, int]) -> None:
+        """Remove a waiter; the caller holds the lock."""
+        self._waiting.remove(ticket)
+        # The head of the queue changed
+        self._condition.notify_all()
+
+    def _remaining(self, start: float, now: float) -> float:
+        """Seconds left before a waiter times out."""
+        remaining = start + self.config.timeout - now
+        if remaining <= 0:
+            raise AdmissionTimeout(
+                f"Model request not admitted within {self.config.timeout:.0f}s"
+            )
+        return remaining
+
+    def _admit_locked(self, tokens: int, start: float, now: float) -> float:
+        """Take the rate tokens and a slot; the caller holds the lock."""
+        if self._rps is not None:
+            self._rps.consume(1, now)
+        if self._tpm is not None:
+            self._tpm.consume(tokens, now)
+        self.in_flight += 1
+        waited = time.monotonic() - start
+        self.admitted += 1
+        self.total_wait += waited
+        return waited
+
+    def _admission_delay(self, ticket: tuple[int, int], tokens: int, now: float) -> float:
+        """
+        How long a waiter should sleep before checking again; 0 admits it.
+
+        Only the head of the queue is admitted, so later requests cannot
+        overtake an earlier one that needs more tokens. The caller holds the
+        lock.
+        """
+        if self._waiting[0] != ticket or (
+            0 < self.max_concurrency <= self.in_flight
+        ):
+            return float("inf")  # Woken by release() or a queue change
+        delay = 0.0
+        if self._rps is not None:
+            delay = max(delay, self._rps.wait_time(1, now))
+        if self._tpm is not None:
+            delay = max(delay, self._tpm.wait_time(tokens, now))
+        return delay
+
+    def release(self, output_tokens: int = 0) -> None:
+        """
+        Mark a request as finished.
+
+        Args:
+            output_tokens: Estimated tokens generated by the request.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if self._tpm is not None and output_tokens:
+                self._tpm.consume(output_tokens, time.monotonic())
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        """Queue and wait statistics."""
+        with self._condition:
+            return {
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiting),
+                "admitted": self.admitted,
+                "mean_wait": self.total_wait / self.admitted if self.admitted else 0.0,
+            }
+
+
+_controllers: dict[tuple, AdmissionController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_admission_controller(
+    endpoints: list[Endpoint], config: AdmissionConfig | None = None
+) -> AdmissionController:
+    """
+    Get the shared admission controller for a set of endpoints.
+
+    The first client to ask creates the controller, so its limits apply to
+    every agent in the process that uses the same endpoints.
+
+    Args:
+        endpoints: Endpoints the requests are sent to.
+        config: Limits used if the controller does not exist yet.
+
+    Returns:
+        The shared AdmissionController.
+    """
+    key = tuple(endpoint.key for endpoint in endpoints)
+    with _controllers_lock:
+        controller = _controllers.get(key)
+        if controller is None:
+            controller = AdmissionController(config)
+            _controllers[key] = controller
+        return controller
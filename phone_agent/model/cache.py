@@ -0,0 +1,337 @@
+"""Screen-keyed cache of model responses.
+
+Repeated tasks see the same screens with the same action history, and the
+model answers them the same way. The cache is keyed by the model, prompt
+language, task text, a signature of the actions taken so far and a
+perceptual hash (dHash) of the current screenshot, matched within a
+Hamming-distance tolerance. A hit skips inference entirely. Entries are
+evicted least recently used and after a TTL.
+
+Entries are indexed by everything but the screen hash, so a lookup only
+compares hashes of the same task and history. New entries are appended to a
+JSONL log in the cache directory by a background thread; the log is
+compacted when it is loaded.
+
+Settings can be changed with environment variables:
+    PHONE_AGENT_RESPONSE_CACHE_MAX_ENTRIES, PHONE_AGENT_RESPONSE_CACHE_TTL,
+    PHONE_AGENT_RESPONSE_CACHE_MAX_DISTANCE
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from phone_agent.config.paths import get_cache_dir
+from phone_agent.imaging import dhash_base64, hamming_distance
+
+
+@dataclass
+class ResponseCacheConfig:
+    """Limits for the response cache."""
+
+    max_entries: int = 2000  # Entries kept before LRU eviction
+    ttl: float = 7 * 24 * 3600.0  # Seconds an entry stays valid
+    max_distance: int = 8  # Hamming tolerance between screen hashes (of 256 bits)
+    hash_size: int = 16  # dHash grid size; hashes have hash_size ** 2 bits
+
+    def __post_init__(self):
+        """Load values from environment variables if present."""
+        self.max_entries = int(
+            os.getenv("PHONE_AGENT_RESPONSE_CACHE_MAX_ENTRIES", self.max_entries)
+        )
+        self.ttl = float(os.getenv("PHONE_AGENT_RESPONSE_CACHE_TTL", self.ttl))
+        self.max_distance = int(
+            os.getenv("PHONE_AGENT_RESPONSE_CACHE_MAX_DISTANCE", self.max_distance)
+        )
+
+
+@dataclass
+class CacheKey:
+    """What a cached response is looked up by."""
+
+    model: str
+    lang: str
+    task: str
+    history: str  # Signature of the actions taken so far
+    screen_hash: int  # dHash of the current screenshot
+
+    @property
+    def bucket(self) -> tuple[str, str, str, str]:
+        """Everything but the screen hash; lookups scan one bucket."""
+        return (self.model, self.lang, self.task, self.history)
+
+    @property
+    def entry_id(self) -> str:
+        """Stable ID of the entry stored under this key."""
+        text = "\n".join(self.bucket) + f"\n{self.screen_hash:x}"
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    """A cached model reply."""
+
+    thinking: str
+    action: str
+    raw_content: str
+
+
+def history_signature(actions: list[str]) -> str:
+    """
+    Build a compact signature of an action history.
+
+    Args:
+        actions: Action texts of the previous steps, oldest first.
+
+    Returns:
+        A short hex digest; the same history always gives the same value.
+    """
+    digest = hashlib.sha1("\n".join(actions).encode("utf-8"))
+    return f"{len(actions)}:{digest.hexdigest()[:16]}"
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of model responses, persisted as a JSONL log.
+
+    Args:
+        path: Log file path; defaults to <cache dir>/responses/responses.jsonl.
+        config: Cache limits.
+
+    Example:
+        >>> cache = ResponseCache()
+        >>> key = cache.make_key(task, actions, screenshot.base64_data, model, lang)
+        >>> cached = cache.get(key)
+        >>> if cached is None:
+        ...     cache.put(key, response.thinking, response.action, response.raw_content)
+    """
+
+    def __init__(
+        self, path: str | None = None, config: ResponseCacheConfig | None = None
+    ):
+        self.config = config or ResponseCacheConfig()
+        self.path = path or os.path.join(get_cache_dir("responses"), "responses.jsonl")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Entry id -> entry, in least recently used order
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        # Key bucket -> ids of the entries in it
+        self._buckets: dict[tuple[str, str, str, str], set[str]] = {}
+        # Log lines not yet written, and the thread writing them
+        self._pending: list[str] = []
+        self._file_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._writer: threading.Thread | None = None
+        self._load()
+
+    def make_key(
+        self,
+        task: str,
+        actions: list[str],
+        screenshot_base64: str,
+        model: str,
+        lang: str,
+    ) -> CacheKey:
+        """
+        Build the lookup key for the current step.
+
+        Args:
+            task: Task text.
+            actions: Action texts of the previous steps.
+            screenshot_base64: Base64 data of the current screenshot.
+            model: Model name the request is sent to.
+            lang: Prompt language ('cn' or 'en').
+
+        Returns:
+            The cache key.
+        """
+        return CacheKey(
+            model=model,
+            lang=lang,
+            task=task,
+            history=history_signature(actions),
+            screen_hash=dhash_base64(screenshot_base64, self.config.hash_size),
+        )
+
+    def get(self, key: CacheKey) -> CachedResponse | None:
+        """
+        Look up a response for a model, language, task, history and similar screen.
+
+        Args:
+            key: Lookup key.
+
+        Returns:
+            The closest cached response within the tolerance, or None.
+        """
+        now = time.time()
+        with self._lock:
+            best_id = None
+            best_distance = self.config.max_distance + 1
+            for entry_id in list(self._buckets.get(key.bucket, ())):
+                entry = self._entries[entry_id]
+                if now - entry["created"] > self.config.ttl:
+                    self._remove(entry_id)
+                    continue
+                distance = hamming_distance(int(entry["screen_hash"], 16), key.screen_hash)
+                if distance < best_distance:
+                    best_id, best_distance = entry_id, distance
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(best_id)
+            entry = self._entries[best_id]
+            return CachedResponse(
+                thinking=entry["thinking"],
+                action=entry["action"],
+                raw_content=entry["raw_content"],
+            )
+
+    def put(self, key: CacheKey, thinking: str, action: str, raw_content: str) -> None:
+        """
+        Store a response; it is appended to the log in the background.
+
+        Args:
+            key: Lookup key of the step.
+            thinking: The model's reasoning text.
+            action: The action call text.
+            raw_content: The full response text.
+        """
+        entry = {
+            "id": key.entry_id,
+            "model": key.model,
+            "lang": key.lang,
+            "task": key.task,
+            "history": key.history,
+            "screen_hash": f"{key.screen_hash:x}",
+            "thinking": thinking,
+            "action": action,
+            "raw_content": raw_content,
+            "created": time.time(),
+        }
+        with self._lock:
+            self._add(entry)
+            self._pending.append(json.dumps(entry, ensure_ascii=False))
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="response-cache-writer", daemon=True
+                )
+                self._writer.start()
+        self._wake.set()
+
+    def flush(self) -> None:
+        """Write pending entries to the log now."""
+        with self._file_lock:
+            with self._lock:
+                lines, self._pending = self._pending, []
+            if not lines:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+            except OSError as e:
+                print(f"Failed to save response cache: {e}")
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._file_lock:
+            with self._lock:
+                self._entries.clear()
+                self._buckets.clear()
+                self._pending.clear()
+                self.hits = 0
+                self.misses = 0
+            try:
+                open(self.path, "w", encoding="utf-8").close()
+            except OSError as e:
+                print(f"Failed to save response cache: {e}")
+
+    def stats(self) -> dict:
+        """Hit and miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _add(self, entry: dict) -> None:
+        """Insert or replace an entry and evict beyond max_entries; the caller holds the lock."""
+        entry_id = entry["id"]
+        self._entries[entry_id] = entry
+        self._entries.move_to_end(entry_id)
+        bucket = (entry["model"], entry["lang"], entry["task"], entry["history"])
+        self._buckets.setdefault(bucket, set()).add(entry_id)
+        while len(self._entries) > self.config.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id: str) -> None:
+        """Drop an entry from the index; the caller holds the lock."""
+        entry = self._entries.pop(entry_id)
+        bucket = (entry["model"], entry["lang"], entry["task"], entry["history"])
+        ids = self._buckets[bucket]
+        ids.discard(entry_id)
+        if not ids:
+            del self._buckets[bucket]
+
+    def _write_loop(self) -> None:
+        """Append pending entries to the log whenever put() signals."""
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self.flush()
+
+    def _load(self) -> None:
+        """Replay the log, then rewrite it if it holds stale or evicted entries."""
+        lines = 0
+        now = time.time()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                        if now - entry["created"] <= self.config.ttl:
+                            self._add(entry)
+                    except (ValueError, TypeError, KeyError):
+                        continue  # A line cut short by a crash
+        except OSError:
+            return
+
+        if lines > len(self._entries):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the log with only the live entries, oldest first."""
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in self._entries.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Failed to compact response cache: {e}")
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the shared response cache, loading it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+            atexit.register(_cache.flush)
+        return _cache
@@ -3,11 +3,22 @@
 import json
 import time
 from dataclasses import dataclass, field
-from typing import Any
-
-from openai import OpenAI
+from typing import Any, Callable, Iterator
 
 from phone_agent.config.i18n import get_message
+from phone_agent.model import transport
+from phone_agent.model.admission import AdmissionConfig, get_admission_controller
+from phone_agent.model.cache import CacheKey, get_response_cache
+from phone_agent.model.hedging import HedgedRace, HedgeStats, iter_content
+from phone_agent.model.router import (
+    RETRYABLE_ERRORS,
+    Endpoint,
+    EndpointState,
+    get_router,
+    is_retryable_error,
+)
+from phone_agent.model.stream_parser import ACTION_MARKERS, ActionStreamParser
+from phone_agent.model.tokens import PrefixTracker, estimate_tokens
 
 
 @dataclass
@@ -23,6 +34,22 @@ class ModelConfig:
     frequency_penalty: float = 0.2
     extra_body: dict[str, Any] = field(default_factory=dict)
     lang: str = "cn"  # Language for UI messages: 'cn' or 'en'
+    early_stop: bool = True  # Close the stream once the action call is complete
+    # Replicas to balance across; empty means just base_url/api_key
+    endpoints: list[Endpoint] = field(default_factory=list)
+    # Hedging: send a backup request if the first token is later than usual
+    hedge: bool = False
+    hedge_percentile: float = 95.0  # TTFT percentile used as the hedge delay
+    hedge_min_delay: float = 0.5  # Lower bound for the hedge delay (seconds)
+    hedge_default_delay: float = 3.0  # Delay until enough TTFT samples exist
+    response_cache: bool = False  # Reuse responses for repeated task screens
+    # Concurrency and rate limits shared by all clients of the same endpoints
+    admission: AdmissionConfig | None = None
+    priority: int = 0  # Admission priority under the "priority" policy
+
+    def get_endpoints(self) -> list[Endpoint]:
+        """Endpoints to route requests to."""
+        return self.endpoints or [Endpoint(self.base_url, self.api_key)]
 
 
 @dataclass
@@ -36,6 +63,14 @@ class ModelResponse:
     time_to_first_token: float | None = None  # Time to first token (seconds)
     time_to_thinking_end: float | None = None  # Time to thinking end (seconds)
     total_time: float | None = None  # Total inference time (seconds)
+    endpoint: str | None = None  # Base URL that served the request
+    hedged: bool = False  # Whether a hedge request was sent
+    hedge_won: bool = False  # Whether the hedge request produced the response
+    # Estimated prompt size and the part repeating the previous prompt
+    prompt_tokens: int | None = None
+    cacheable_prefix_tokens: int | None = None
+    cached: bool = False  # Served from the response cache without inference
+    queue_wait_time: float = 0.0  # Time waiting for admission (seconds)
 
 
 class ModelClient:
@@ -48,29 +83,173 @@ class ModelClient:
 
     def __init__(self, config: ModelConfig | None = None):
         self.config = config or ModelConfig()
-        self.client = OpenAI(base_url=self.config.base_url, api_key=self.config.api_key)
-
-    def request(self, messages: list[dict[str, Any]]) -> ModelResponse:
+        self.router = get_router(self.config.get_endpoints())
+        self.admission = get_admission_controller(
+            self.config.get_endpoints(), self.config.admission
+        )
+        self.hedge_stats = HedgeStats()
+        self.prefix_tracker = PrefixTracker()
+        self.cache = get_response_cache() if self.config.response_cache else None
+
+    def prewarm(self) -> None:
+        """Open the API connections in the background before the first request."""
+        for endpoint in self.config.get_endpoints():
+            transport.prewarm(endpoint.base_url, endpoint.api_key)
+
+    def request(
+        self, messages: list[dict[str, Any]], cache_key: CacheKey | None = None
+    ) -> ModelResponse:
         """
         Send a request to the model.
 
         Args:
             messages: List of message dictionaries in OpenAI format.
+            cache_key: Response cache key for this step. Pass None for
+                screens that must not be cached (e.g. sensitive ones).
 
         Returns:
             ModelResponse containing thinking and action.
 
         Raises:
             ValueError: If the response cannot be parsed.
+            openai.APIError: If every endpoint failed.
         """
+        use_cache = self.cache is not None and cache_key is not None
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(cached.thinking)
+                response = ModelResponse(
+                    thinking=cached.thinking,
+                    action=cached.action,
+                    raw_content=cached.raw_content,
+                    total_time=0.0,
+                    cached=True,
+                )
+                print_metrics(response, self.config.lang)
+                return response
+
+        cacheable, total = self.prefix_tracker.update(messages)
+
+        # Retries and hedges of this request count as one admission
+        queue_wait_time = self.admission.acquire(total, self.config.priority)
+        output_tokens = 0
+        try:
+            if self.config.hedge:
+                response = self._request_hedged(messages)
+            else:
+                response = self._request_routed(messages)
+            output_tokens = estimate_tokens(response.raw_content)
+        finally:
+            self.admission.release(output_tokens)
+        response.queue_wait_time = queue_wait_time
+        response.prompt_tokens = total
+        response.cacheable_prefix_tokens = cacheable
+
+        if use_cache and response.action.startswith(ACTION_MARKERS):
+            self.cache.put(
+                cache_key, response.thinking, response.action, response.raw_content
+            )
+
+        print_metrics(response, self.config.lang)
+        return response
+
+    def _request_routed(self, messages: list[dict[str, Any]]) -> ModelResponse:
+        """Send a request to the best endpoint, failing over on errors."""
+        tried: set[str] = set()
+        while True:
+            state = self.router.acquire(exclude=tried)
+            endpoint = state.endpoint
+            try:
+                response = self._request_endpoint(state, messages)
+            except RETRYABLE_ERRORS as e:
+                if not is_retryable_error(e):
+                    # The request itself is bad; another replica will not help
+                    self.router.release(state)
+                    raise
+                self.router.release(state, error=e)
+                tried.add(endpoint.base_url)
+                if len(tried) >= len(self.router.states):
+                    raise
+                print(f"\n⚠️  Model endpoint {endpoint.base_url} failed ({e}), retrying")
+                continue
+            except BaseException:
+                self.router.release(state)
+                raise
+
+            self.router.release(
+                state, ttft=response.time_to_first_token, total=response.total_time
+            )
+            return response
+
+    def _request_endpoint(
+        self, state: EndpointState, messages: list[dict[str, Any]]
+    ) -> ModelResponse:
+        """Stream one request from a single endpoint."""
+        endpoint = state.endpoint
+        # An ejected endpoint picked as the last resort is retried after its backoff
+        backoff = state.ejected_until - time.time()
+        if backoff > 0:
+            print(f"⏳ Waiting {backoff:.1f}s before retrying {endpoint.base_url}")
+            time.sleep(backoff)
+
         # Start timing
         start_time = time.time()
-        time_to_first_token = None
-        time_to_thinking_end = None
+        stream = self.create_stream(endpoint, messages)
+        response = self._read_response(
+            iter_content(stream), start_time, stop=stream.close
+        )
+        transport.mark_used(endpoint.base_url)
+        response.endpoint = endpoint.base_url
+        return response
+
+    def _request_hedged(self, messages: list[dict[str, Any]]) -> ModelResponse:
+        """Stream a request, sending a backup if the first token is late."""
+        start_time = time.time()
+        race = HedgedRace(self, messages)
+        delay = self.hedge_delay()
+        try:
+            winner, first_content = race.wait_for_winner(delay)
+            response = self._read_response(
+                race.iter_winner(first_content),
+                start_time,
+                stop=winner.cancel,
+            )
+        finally:
+            race.cancel_all()
+
+        response.endpoint = winner.state.endpoint.base_url
+        response.hedged = race.hedged
+        response.hedge_won = winner is not race.attempts[0]
+        self.hedge_stats.record(response.hedged, response.hedge_won)
+        return response
+
+    def hedge_delay(self) -> float:
+        """Time to wait for a first token before sending a hedge request."""
+        observed = self.router.ttft_percentile(self.config.hedge_percentile)
+        if observed is None:
+            return self.config.hedge_default_delay
+        return max(observed, self.config.hedge_min_delay)
+
+    def create_stream(self, endpoint: Endpoint, messages: list[dict[str, Any]]):
+        """
+        Open a streaming chat completion on one endpoint.
 
-        stream = self.client.chat.completions.create(
+        Args:
+            endpoint: Endpoint to send the request to.
+            messages: List of message dictionaries in OpenAI format.
+
+        Returns:
+            The OpenAI stream object.
+        """
+        client = transport.get_openai_client(endpoint.base_url, endpoint.api_key)
+        if len(self.router.states) > 1:
+            # Fail over to another replica instead of retrying this one
+            client = client.with_options(max_retries=0)
+
+        return client.chat.completions.create(
             messages=messages,
-            model=self.config.model_name,
+            model=endpoint.model_name or self.config.model_name,
             max_tokens=self.config.max_tokens,
             temperature=self.config.temperature,
             top_p=self.config.top_p,
@@ -79,142 +258,92 @@ class ModelClient:
             stream=True,
         )
 
-        raw_content = ""
-        buffer = ""  # Buffer to hold content that might be part of a marker
-        action_markers = ["finish(message=", "do(action="]
-        in_action_phase = False  # Track if we've entered the action phase
-        first_token_received = False
+    def _read_response(
+        self, contents: Iterator[str], start_time: float, stop: Callable[[], None]
+    ) -> ModelResponse:
+        """
+        Consume streamed text into a ModelResponse, printing thinking live.
 
-        for chunk in stream:
-            if len(chunk.choices) == 0:
-                continue
-            if chunk.choices[0].delta.content is not None:
-                content = chunk.choices[0].delta.content
-                raw_content += content
-
-                # Record time to first token
-                if not first_token_received:
-                    time_to_first_token = time.time() - start_time
-                    first_token_received = True
-
-                if in_action_phase:
-                    # Already in action phase, just accumulate content without printing
-                    continue
-
-                buffer += content
-
-                # Check if any marker is fully present in buffer
-                marker_found = False
-                for marker in action_markers:
-                    if marker in buffer:
-                        # Marker found, print everything before it
-                        thinking_part = buffer.split(marker, 1)[0]
-                        print(thinking_part, end="", flush=True)
-                        print()  # Print newline after thinking is complete
-                        in_action_phase = True
-                        marker_found = True
-
-                        # Record time to thinking end
-                        if time_to_thinking_end is None:
-                            time_to_thinking_end = time.time() - start_time
-
-                        break
-
-                if marker_found:
-                    continue  # Continue to collect remaining content
-
-                # Check if buffer ends with a prefix of any marker
-                # If so, don't print yet (wait for more content)
-                is_potential_marker = False
-                for marker in action_markers:
-                    for i in range(1, len(marker)):
-                        if buffer.endswith(marker[:i]):
-                            is_potential_marker = True
-                            break
-                    if is_potential_marker:
-                        break
-
-                if not is_potential_marker:
-                    # Safe to print the buffer
-                    print(buffer, end="", flush=True)
-                    buffer = ""
+        Args:
+            contents: Iterator over streamed text chunks.
+            start_time: Time the request was started.
+            stop: Called to abandon the stream once the action is complete.
+
+        Returns:
+            The parsed response with timing metrics.
+        """
+        reader = ResponseReader(start_time, self.config.early_stop)
+        for content in contents:
+            if reader.feed(content):
+                # The action is complete; skip any trailing tokens
+                stop()
+                break
+        return reader.result()
+
+
+class ResponseReader:
+    """
+    Assembles streamed text into a ModelResponse, printing thinking live.
+
+    Shared by the blocking and asyncio clients, which only differ in how
+    they iterate over the stream.
+
+    Args:
+        start_time: Time the request was started.
+        early_stop: Stop reading once the action call is complete.
+    """
+
+    def __init__(self, start_time: float, early_stop: bool = True):
+        self.start_time = start_time
+        self.early_stop = early_stop
+        self.parser = ActionStreamParser()
+        self.time_to_first_token: float | None = None
+        self.time_to_thinking_end: float | None = None
+
+    def feed(self, content: str) -> bool:
+        """
+        Process one streamed chunk.
+
+        Returns:
+            True if the stream should be closed because the action is complete.
+        """
+        parser = self.parser
+        # Record time to first token
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.time() - self.start_time
+
+        was_in_action = parser.in_action
+        # Thinking is printed as it arrives, holding back partial markers
+        print(parser.feed(content), end="", flush=True)
 
+        if parser.in_action and not was_in_action:
+            print()  # Print newline after thinking is complete
+            # Record time to thinking end
+            self.time_to_thinking_end = time.time() - self.start_time
+
+        return parser.complete and self.early_stop
+
+    def result(self) -> ModelResponse:
+        """Parse the text read so far into a ModelResponse with timing metrics."""
         # Calculate total time
-        total_time = time.time() - start_time
+        total_time = time.time() - self.start_time
 
         # Parse thinking and action from response
-        thinking, action = self._parse_response(raw_content)
-
-        # Print performance metrics
-        lang = self.config.lang
-        print()
-        print("=" * 50)
-        print(f"⏱️  {get_message('performance_metrics', lang)}:")
-        print("-" * 50)
-        if time_to_first_token is not None:
-            print(
-                f"{get_message('time_to_first_token', lang)}: {time_to_first_token:.3f}s"
-            )
-        if time_to_thinking_end is not None:
-            print(
-                f"{get_message('time_to_thinking_end', lang)}:        {time_to_thinking_end:.3f}s"
-            )
-        print(
-            f"{get_message('total_inference_time', lang)}:          {total_time:.3f}s"
-        )
-        print("=" * 50)
+        raw_content = self.parser.raw_content
+        if self.parser.complete:
+            thinking, action = self.parser.thinking, self.parser.action
+        else:
+            thinking, action = parse_response(raw_content)
 
         return ModelResponse(
             thinking=thinking,
             action=action,
             raw_content=raw_content,
-            time_to_first_token=time_to_first_token,
-            time_to_thinking_end=time_to_thinking_end,
+            time_to_first_token=self.time_to_first_token,
+            time_to_thinking_end=self.time_to_thinking_end,
             total_time=total_time,
         )
 
-    def _parse_response(self, content: str) -> tuple[str, str]:
-        """
-        Parse the model response into thinking and action parts.
-
-        Parsing rules:
-        1. If content contains 'finish(message=', everything before is thinking,
-           everything from 'finish(message=' onwards is action.
-        2. If rule 1 doesn't apply but content contains 'do(action=',
-           everything before is thinking, everything from 'do(action=' onwards is action.
-        3. Fallback: If content contains '<answer>', use legacy parsing with XML tags.
-        4. Otherwise, return empty thinking and full content as action.
-
-        Args:
-            content: Raw response content.
-
-        Returns:
-            Tuple of (thinking, action).
-        """
-        # Rule 1: Check for finish(message=
-        if "finish(message=" in content:
-            parts = content.split("finish(message=", 1)
-            thinking = parts[0].strip()
-            action = "finish(message=" + parts[1]
-            return thinking, action
-
-        # Rule 2: Check for do(action=
-        if "do(action=" in content:
-            parts = content.split("do(action=", 1)
-            thinking = parts[0].strip()
-            action = "do(action=" + parts[1]
-            return thinking, action
-
-        # Rule 3: Fallback to legacy XML tag parsing
-        if "<answer>" in content:
-            parts = content.split("<answer>", 1)
-            thinking = parts[0].replace("<think>", "").replace("</think>", "").strip()
-            action = parts[1].replace("</answer>", "").strip()
-            return thinking, action
-
-        # Rule 4: No markers found, return content as action
-        return "", content
-
 
 class MessageBuilder:
     """Helper class for building conversation messages."""
@@ -226,7 +355,7 @@ class MessageBuilder:
 
     @staticmethod
     def create_user_message(
-        text: str, image_base64: str | None = None
+        text: str, image_base64: str | None = None, mime_type: str = "image/png"
     ) -> dict[str, Any]:
         """
         Create a user message with optional image.
@@ -234,6 +363,7 @@ class MessageBuilder:
         Args:
             text: Text content.
             image_base64: Optional base64-encoded image.
+            mime_type: MIME type of the image (e.g. image/png, image/jpeg).
 
         Returns:
             Message dictionary.
@@ -244,7 +374,7 @@ class MessageBuilder:
             content.append(
                 {
                     "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{image_base64}"},
+                    "image_url": {"url": f"data:{mime_type};base64,{image_base64}"},
                 }
             )
 
@@ -288,3 +418,78 @@ class MessageBuilder:
         """
         info = {"current_app": current_app, **extra_info}
         return json.dumps(info, ensure_ascii=False)
+
+
+def parse_response(content: str) -> tuple[str, str]:
+    """
+    Parse the model response into thinking and action parts.
+
+    Parsing rules:
+    1. If content contains 'finish(message=', everything before is thinking,
+       everything from 'finish(message=' onwards is action.
+    2. If rule 1 doesn't apply but content contains 'do(action=',
+       everything before is thinking, everything from 'do(action=' onwards is action.
+    3. Fallback: If content contains '<answer>', use legacy parsing with XML tags.
+    4. Otherwise, return empty thinking and full content as action.
+
+    Args:
+        content: Raw response content.
+
+    Returns:
+        Tuple of (thinking, action).
+    """
+    # Rule 1: Check for finish(message=
+    if "finish(message=" in content:
+        parts = content.split("finish(message=", 1)
+        thinking = parts[0].strip()
+        action = "finish(message=" + parts[1]
+        return thinking, action
+
+    # Rule 2: Check for do(action=
+    if "do(action=" in content:
+        parts = content.split("do(action=", 1)
+        thinking = parts[0].strip()
+        action = "do(action=" + parts[1]
+        return thinking, action
+
+    # Rule 3: Fallback to legacy XML tag parsing
+    if "<answer>" in content:
+        parts = content.split("<answer>", 1)
+        thinking = parts[0].replace("<think>", "").replace("</think>", "").strip()
+        action = parts[1].replace("</answer>", "").strip()
+        return thinking, action
+
+    # Rule 4: No markers found, return content as action
+    return "", content
+
+
+def print_metrics(response: ModelResponse, lang: str = "cn") -> None:
+    """Print performance metrics for a response."""
+    print()
+    print("=" * 50)
+    print(f"⏱️  {get_message('performance_metrics', lang)}:")
+    print("-" * 50)
+    if response.cached:
+        print(get_message("response_cache_hit", lang))
+    if response.queue_wait_time >= 0.001:
+        print(
+            f"{get_message('queue_wait_time', lang)}: {response.queue_wait_time:.3f}s"
+        )
+    if response.time_to_first_token is not None:
+        print(
+            f"{get_message('time_to_first_token', lang)}: {response.time_to_first_token:.3f}s"
+        )
+    if response.time_to_thinking_end is not None:
+        print(
+            f"{get_message('time_to_thinking_end', lang)}:        {response.time_to_thinking_end:.3f}s"
+        )
+    print(
+        f"{get_message('total_inference_time', lang)}:          {response.total_time:.3f}s"
+    )
+    if response.prompt_tokens:
+        share = response.cacheable_prefix_tokens / response.prompt_tokens * 100
+        print(
+            f"{get_message('cacheable_prefix', lang)}: "
+            f"{response.cacheable_prefix_tokens}/{response.prompt_tokens} tokens ({share:.0f}%)"
+        )
+    print("=" * 50)
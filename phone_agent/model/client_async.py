@@ -0,0 +1,215 @@
+"""Asyncio model client for event-loop based agents.
+
+``AsyncModelClient`` shares its configuration, endpoint routing, admission
+control and response cache with ``ModelClient``, but streams through
+``AsyncOpenAI`` so one event loop can wait on many requests at once.
+Cancelling ``request()`` closes the HTTP stream and gives back the router
+slot and the admission.
+
+Hedged requests are not supported here; ``ModelConfig.hedge`` is ignored.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator
+
+from phone_agent.model import transport
+from phone_agent.model.admission import ASYNC_POLL_INTERVAL, get_admission_controller
+from phone_agent.model.cache import CacheKey, get_response_cache
+from phone_agent.model.client import (
+    ModelConfig,
+    ModelResponse,
+    ResponseReader,
+    print_metrics,
+)
+from phone_agent.model.router import (
+    RETRYABLE_ERRORS,
+    Endpoint,
+    EndpointState,
+    NoEndpointAvailable,
+    get_router,
+    is_retryable_error,
+)
+from phone_agent.model.stream_parser import ACTION_MARKERS
+from phone_agent.model.tokens import PrefixTracker, estimate_tokens
+
+
+async def aiter_content(stream) -> AsyncIterator[str]:
+    """Yield the text of each chunk in an async chat completion stream."""
+    async for chunk in stream:
+        if len(chunk.choices) == 0:
+            continue
+        if chunk.choices[0].delta.content is not None:
+            yield chunk.choices[0].delta.content
+
+
+class AsyncModelClient:
+    """
+    Asyncio client for OpenAI-compatible vision-language models.
+
+    Args:
+        config: Model configuration.
+
+    Example:
+        >>> client = AsyncModelClient(ModelConfig(base_url="http://localhost:8000/v1"))
+        >>> response = await client.request(messages)
+    """
+
+    def __init__(self, config: ModelConfig | None = None):
+        self.config = config or ModelConfig()
+        self.router = get_router(self.config.get_endpoints())
+        self.admission = get_admission_controller(
+            self.config.get_endpoints(), self.config.admission
+        )
+        self.prefix_tracker = PrefixTracker()
+        self.cache = get_response_cache() if self.config.response_cache else None
+
+    async def request(
+        self, messages: list[dict[str, Any]], cache_key: CacheKey | None = None
+    ) -> ModelResponse:
+        """
+        Send a request to the model.
+
+        Args:
+            messages: List of message dictionaries in OpenAI format.
+            cache_key: Response cache key for this step, or None.
+
+        Returns:
+            ModelResponse containing thinking and action.
+
+        Raises:
+            openai.APIError: If every endpoint failed.
+        """
+        use_cache = self.cache is not None and cache_key is not None
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(cached.thinking)
+                response = ModelResponse(
+                    thinking=cached.thinking,
+                    action=cached.action,
+                    raw_content=cached.raw_content,
+                    total_time=0.0,
+                    cached=True,
+                )
+                print_metrics(response, self.config.lang)
+                return response
+
+        cacheable, total = self.prefix_tracker.update(messages)
+
+        queue_wait_time = await self.admission.acquire_async(total, self.config.priority)
+        output_tokens = 0
+        try:
+            response = await self._request_routed(messages)
+            output_tokens = estimate_tokens(response.raw_content)
+        finally:
+            self.admission.release(output_tokens)
+        response.queue_wait_time = queue_wait_time
+        response.prompt_tokens = total
+        response.cacheable_prefix_tokens = cacheable
+
+        if use_cache and response.action.startswith(ACTION_MARKERS):
+            # Writes the cache file; keep it off the event loop
+            await asyncio.to_thread(
+                self.cache.put,
+                cache_key,
+                response.thinking,
+                response.action,
+                response.raw_content,
+            )
+
+        print_metrics(response, self.config.lang)
+        return response
+
+    async def _acquire(self, exclude: set[str]) -> EndpointState:
+        """Reserve a router slot without blocking the event loop."""
+        if all(s.endpoint.base_url in exclude for s in self.router.states):
+            raise NoEndpointAvailable("All model endpoints have been tried")
+        deadline = time.time() + self.router.config.acquire_timeout
+        while True:
+            state = self.router.try_acquire(exclude)
+            if state is not None:
+                return state
+            if time.time() >= deadline:
+                raise NoEndpointAvailable("All model endpoints are at max concurrency")
+            await asyncio.sleep(ASYNC_POLL_INTERVAL)
+
+    async def _request_routed(self, messages: list[dict[str, Any]]) -> ModelResponse:
+        """Send a request to the best endpoint, failing over on errors."""
+        tried: set[str] = set()
+        while True:
+            state = await self._acquire(tried)
+            endpoint = state.endpoint
+            try:
+                response = await self._request_endpoint(state, messages)
+            except RETRYABLE_ERRORS as e:
+                if not is_retryable_error(e):
+                    self.router.release(state)
+                    raise
+                self.router.release(state, error=e)
+                tried.add(endpoint.base_url)
+                if len(tried) >= len(self.router.states):
+                    raise
+                print(f"\n⚠️  Model endpoint {endpoint.base_url} failed ({e}), retrying")
+                continue
+            except BaseException:
+                # Includes cancellation of the calling task
+                self.router.release(state)
+                raise
+
+            self.router.release(
+                state, ttft=response.time_to_first_token, total=response.total_time
+            )
+            return response
+
+    async def _request_endpoint(
+        self, state: EndpointState, messages: list[dict[str, Any]]
+    ) -> ModelResponse:
+        """Stream one request from a single endpoint."""
+        endpoint = state.endpoint
+        backoff = state.ejected_until - time.time()
+        if backoff > 0:
+            print(f"⏳ Waiting {backoff:.1f}s before retrying {endpoint.base_url}")
+            await asyncio.sleep(backoff)
+
+        start_time = time.time()
+        stream = await self.create_stream(endpoint, messages)
+        reader = ResponseReader(start_time, self.config.early_stop)
+        try:
+            async for content in aiter_content(stream):
+                if reader.feed(content):
+                    # The action is complete; skip any trailing tokens
+                    break
+        finally:
+            await stream.close()
+        response = reader.result()
+        transport.mark_used(endpoint.base_url)
+        response.endpoint = endpoint.base_url
+        return response
+
+    async def create_stream(self, endpoint: Endpoint, messages: list[dict[str, Any]]):
+        """
+        Open a streaming chat completion on one endpoint.
+
+        Args:
+            endpoint: Endpoint to send the request to.
+            messages: List of message dictionaries in OpenAI format.
+
+        Returns:
+            The AsyncOpenAI stream object.
+        """
+        client = transport.get_async_openai_client(endpoint.base_url, endpoint.api_key)
+        if len(self.router.states) > 1:
+            # Fail over to another replica instead of retrying this one
+            client = client.with_options(max_retries=0)
+
+        return await client.chat.completions.create(
+            messages=messages,
+            model=endpoint.model_name or self.config.model_name,
+            max_tokens=self.config.max_tokens,
+            temperature=self.config.temperature,
+            top_p=self.config.top_p,
+            frequency_penalty=self.config.frequency_penalty,
+            extra_body=self.config.extra_body,
+            stream=True,
+        )
@@ -0,0 +1,160 @@
+"""Bounded conversation context for long-running tasks.
+
+Every step adds the model's full ``<think>…</think><answer>…</answer>`` reply
+and a screen-info user turn, so without a bound the prompt (and prefill time)
+grows linearly with the task. ``ContextManager`` keeps the system prompt and
+the task verbatim, keeps the most recent turns in full, and reduces older
+assistant turns to their action. If the estimate still exceeds the token
+budget, the oldest compacted turns are dropped.
+
+With ``compact_block`` above 1, turns are compacted and dropped a block at a
+time, so earlier messages stay byte-identical for several steps in a row and
+serving engines can reuse their cached prefix.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Any
+
+from phone_agent.model.client import MessageBuilder
+from phone_agent.model.tokens import estimate_message_tokens
+
+# Block size used when the prompt is laid out for prefix caching
+PREFIX_CACHE_BLOCK = 8
+
+
+@dataclass
+class ContextConfig:
+    """Limits for the conversation context sent to the model."""
+
+    token_budget: int = 16000  # Estimated prompt tokens, screenshot included
+    keep_turns: int = 4  # Recent assistant turns kept with their thinking
+    image_tokens: int = 1200  # Estimated tokens per screenshot
+    compact_block: int = 1  # Turns compacted or dropped together
+
+    def __post_init__(self):
+        """Load values from environment variables if present."""
+        self.token_budget = int(
+            os.getenv("PHONE_AGENT_CONTEXT_TOKEN_BUDGET", self.token_budget)
+        )
+        self.keep_turns = int(os.getenv("PHONE_AGENT_CONTEXT_KEEP_TURNS", self.keep_turns))
+
+
+class ContextManager:
+    """
+    Conversation history with a sliding window and compacted older turns.
+
+    The first system message and the first user message (the task) are the
+    head and are always sent verbatim. After that the history alternates
+    assistant replies and screen-info user turns.
+
+    Args:
+        config: Context limits; defaults to ContextConfig().
+
+    Example:
+        >>> context = ContextManager()
+        >>> context.append(MessageBuilder.create_system_message(prompt))
+        >>> context.append(MessageBuilder.create_user_message(task))
+        >>> context.add_response(thinking, action)
+        >>> messages = context.build()
+    """
+
+    HEAD_SIZE = 2  # System prompt and task
+
+    def __init__(self, config: ContextConfig | None = None):
+        self.config = config or ContextConfig()
+        self._messages: list[dict[str, Any]] = []
+        self._compact: dict[int, dict[str, Any]] = {}  # Index -> action-only turn
+        self.last_estimate = 0  # Estimated tokens of the last build()
+        self.dropped_turns = 0  # Turns omitted by the last build()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    @property
+    def messages(self) -> list[dict[str, Any]]:
+        """The full, uncompacted history."""
+        return self._messages.copy()
+
+    def clear(self) -> None:
+        """Forget the whole conversation."""
+        self._messages = []
+        self._compact = {}
+        self.last_estimate = 0
+        self.dropped_turns = 0
+
+    def append(self, message: dict[str, Any]) -> None:
+        """Append a message as-is."""
+        self._messages.append(message)
+
+    def add_response(self, thinking: str, action: str) -> None:
+        """
+        Append a model reply, remembering its compact action-only form.
+
+        Args:
+            thinking: The model's reasoning text.
+            action: The action call text.
+        """
+        self._compact[len(self._messages)] = MessageBuilder.create_assistant_message(
+            f"<answer>{action}</answer>"
+        )
+        self._messages.append(
+            MessageBuilder.create_assistant_message(
+                f"<think>{thinking}</think><answer>{action}</answer>"
+            )
+        )
+
+    def remove_images(self) -> None:
+        """Remove images from the latest message to save context space."""
+        if self._messages:
+            self._messages[-1] = MessageBuilder.remove_images_from_message(
+                self._messages[-1]
+            )
+
+    def build(self) -> list[dict[str, Any]]:
+        """
+        Build the messages to send to the model within the token budget.
+
+        Returns:
+            Head messages verbatim, recent turns in full, older turns compacted
+            and, if still over budget, the oldest turns dropped.
+        """
+        head = self._messages[: self.HEAD_SIZE]
+        body_start = len(head)
+
+        # Assistant turns older than the last keep_turns lose their thinking
+        assistant_indices = [
+            i
+            for i in range(body_start, len(self._messages))
+            if self._messages[i].get("role") == "assistant"
+        ]
+        keep_turns = max(self.config.keep_turns, 0)
+        block = max(self.config.compact_block, 1)
+        old_count = max(len(assistant_indices) - keep_turns, 0)
+        old_count -= old_count % block
+        old = set(assistant_indices[:old_count])
+        body = [
+            self._compact.get(i, self._messages[i]) if i in old else self._messages[i]
+            for i in range(body_start, len(self._messages))
+        ]
+        compacted = [i in old for i in range(body_start, len(self._messages))]
+
+        image_tokens = self.config.image_tokens
+        total = sum(estimate_message_tokens(m, image_tokens) for m in head + body)
+
+        # Drop the oldest compacted (assistant, screen info) pairs until in budget
+        dropped = 0
+        size = 2 * block
+        while (
+            total > self.config.token_budget
+            and len(body) > size
+            and all(compacted[0:size:2])
+        ):
+            total -= sum(estimate_message_tokens(m, image_tokens) for m in body[:size])
+            body = body[size:]
+            compacted = compacted[size:]
+            dropped += block
+
+        self.last_estimate = total
+        self.dropped_turns = dropped
+        return head + body
@@ -0,0 +1,259 @@
+"""Hedged model requests.
+
+When the first token of a request is later than usual (a configurable
+percentile of recent time-to-first-token samples), a duplicate request is
+sent, preferably to another endpoint. Both streams run in background threads;
+the first one to produce a token wins and the other is cancelled. This trades
+a little extra load for a much shorter latency tail.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from phone_agent.model import transport
+from phone_agent.model.router import (
+    EndpointState,
+    NoEndpointAvailable,
+    is_retryable_error,
+)
+
+
+def iter_content(stream) -> Iterator[str]:
+    """Yield the text of each chunk in an OpenAI chat completion stream."""
+    for chunk in stream:
+        if len(chunk.choices) == 0:
+            continue
+        if chunk.choices[0].delta.content is not None:
+            yield chunk.choices[0].delta.content
+
+
+@dataclass
+class HedgeStats:
+    """Counters for tuning the hedge threshold."""
+
+    requests: int = 0  # Requests sent in hedging mode
+    hedges_fired: int = 0  # Requests where a hedge was sent
+    hedge_wins: int = 0  # Requests answered by the hedge
+
+    def record(self, hedged: bool, hedge_won: bool) -> None:
+        """Record the outcome of one request."""
+        self.requests += 1
+        if hedged:
+            self.hedges_fired += 1
+        if hedge_won:
+            self.hedge_wins += 1
+
+    @property
+    def fire_rate(self) -> float:
+        """Fraction of requests that sent a hedge."""
+        return self.hedges_fired / self.requests if self.requests else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        """Fraction of fired hedges that beat the original request."""
+        return self.hedge_wins / self.hedges_fired if self.hedges_fired else 0.0
+
+
+class StreamAttempt:
+    """
+    One streaming request running in a background thread.
+
+    Text chunks are put on a shared queue as ``(attempt, "token", text)``,
+    followed by ``(attempt, "end", None)`` or ``(attempt, "error", exc)``.
+    The attempt releases its router slot when it finishes.
+    """
+
+    def __init__(
+        self,
+        client,
+        state: EndpointState,
+        messages: list[dict[str, Any]],
+        events: queue.Queue,
+    ):
+        self.client = client
+        self.state = state
+        self.messages = messages
+        self.events = events
+        self.lost = False  # Another attempt won the race
+        self._cancelled = threading.Event()
+        self._stream = None
+        self._thread = threading.Thread(
+            target=self._run, name="model-stream", daemon=True
+        )
+
+    def start(self) -> None:
+        """Start streaming in the background."""
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """Stop streaming and close the HTTP response."""
+        self._cancelled.set()
+        stream = self._stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def _run(self) -> None:
+        start_time = time.time()
+        ttft = None
+        error = None
+        try:
+            self._stream = self.client.create_stream(self.state.endpoint, self.messages)
+            if not self._cancelled.is_set():
+                for content in iter_content(self._stream):
+                    if ttft is None:
+                        ttft = time.time() - start_time
+                    self.events.put((self, "token", content))
+                    if self._cancelled.is_set():
+                        break
+        except Exception as e:
+            # Closing the stream from another thread surfaces as an error
+            if not self._cancelled.is_set():
+                error = e
+        finally:
+            self.cancel()
+            self._release(ttft, time.time() - start_time, error)
+            if error is not None:
+                self.events.put((self, "error", error))
+            else:
+                self.events.put((self, "end", None))
+
+    def _release(self, ttft: float | None, total: float, error: Exception | None):
+        router = self.client.router
+        if error is not None:
+            if is_retryable_error(error):
+                router.release(self.state, error=error)
+            else:
+                router.release(self.state)
+        elif self.lost or ttft is None:
+            # A cancelled loser says nothing about the endpoint's speed
+            router.release(self.state)
+        else:
+            router.release(self.state, ttft=ttft, total=total)
+            transport.mark_used(self.state.endpoint.base_url)
+
+
+class HedgedRace:
+    """
+    Races a request against a delayed duplicate.
+
+    Args:
+        client: The ModelClient issuing the request.
+        messages: List of message dictionaries in OpenAI format.
+    """
+
+    def __init__(self, client, messages: list[dict[str, Any]]):
+        self.client = client
+        self.messages = messages
+        self.events: queue.Queue = queue.Queue()
+        self.attempts: list[StreamAttempt] = []
+        self.hedged = False
+        self.winner: StreamAttempt | None = None
+        self._tried: set[str] = set()
+        self._hedge_considered = False
+        self._winner_finished = False
+        self._launch(client.router.acquire())
+
+    def _launch(self, state: EndpointState) -> None:
+        self._tried.add(state.endpoint.base_url)
+        attempt = StreamAttempt(self.client, state, self.messages, self.events)
+        self.attempts.append(attempt)
+        attempt.start()
+
+    def _hedge(self, delay: float) -> None:
+        """Send the duplicate request, preferring an endpoint not yet used."""
+        self._hedge_considered = True
+        router = self.client.router
+        state = router.try_acquire(exclude=self._tried) or router.try_acquire()
+        if state is None:
+            return
+        print(
+            f"\n⚡ No first token after {delay:.2f}s, "
+            f"hedging on {state.endpoint.base_url}"
+        )
+        self.hedged = True
+        self._launch(state)
+
+    def wait_for_winner(self, delay: float) -> tuple[StreamAttempt, str]:
+        """
+        Wait for the first attempt to produce a token.
+
+        Args:
+            delay: Seconds to wait for a first token before hedging.
+
+        Returns:
+            Tuple of (winning attempt, its first text chunk).
+
+        Raises:
+            Exception: The last error if every attempt failed.
+        """
+        deadline = time.time() + delay
+        finished: set[StreamAttempt] = set()
+        while True:
+            timeout = None
+            if not self._hedge_considered:
+                timeout = max(0.0, deadline - time.time())
+            try:
+                attempt, kind, payload = self.events.get(timeout=timeout)
+            except queue.Empty:
+                self._hedge(delay)
+                continue
+
+            if kind == "token":
+                self._set_winner(attempt)
+                return attempt, payload
+
+            finished.add(attempt)
+            if any(a not in finished for a in self.attempts):
+                continue  # Another attempt may still answer
+
+            if kind == "end":
+                # The stream ended without any text
+                self._set_winner(attempt)
+                self._winner_finished = True
+                return attempt, ""
+
+            if not is_retryable_error(payload):
+                raise payload
+            try:
+                state = self.client.router.acquire(exclude=self._tried)
+            except NoEndpointAvailable:
+                raise payload from None
+            print(
+                f"\n⚠️  Model endpoint {attempt.state.endpoint.base_url} failed "
+                f"({payload}), retrying"
+            )
+            self._launch(state)
+
+    def _set_winner(self, winner: StreamAttempt) -> None:
+        self.winner = winner
+        for attempt in self.attempts:
+            if attempt is not winner:
+                attempt.lost = True
+                attempt.cancel()
+
+    def iter_winner(self, first_content: str) -> Iterator[str]:
+        """Yield the winning stream's text, starting with its first chunk."""
+        if self._winner_finished:
+            return
+        yield first_content
+        while True:
+            attempt, kind, payload = self.events.get()
+            if attempt is not self.winner:
+                continue
+            if kind == "token":
+                yield payload
+            elif kind == "error":
+                raise payload
+            else:
+                return
+
+    def cancel_all(self) -> None:
+        """Cancel every attempt that is still streaming."""
+        for attempt in self.attempts:
+            attempt.cancel()
@@ -0,0 +1,312 @@
+"""Latency-aware routing across several OpenAI-compatible model endpoints.
+
+A router sits under ``ModelClient`` when ``ModelConfig.endpoints`` lists more
+than one replica. Each request goes to the healthy endpoint with the lowest
+expected latency, scaled by its current load and weight. Latency estimates
+are EWMAs of the time to first token and total time that ``ModelResponse``
+already measures. An endpoint that fails is ejected for an exponentially
+growing backoff and the request is retried on another endpoint. A single
+endpoint is never ejected, since there is nothing to route to instead.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import httpx
+import openai
+
+
+@dataclass
+class Endpoint:
+    """One model server replica."""
+
+    base_url: str
+    api_key: str = "EMPTY"
+    weight: float = 1.0  # Relative capacity; higher weights get more traffic
+    max_concurrency: int = 0  # Maximum in-flight requests; 0 means unlimited
+    model_name: str | None = None  # Overrides ModelConfig.model_name if set
+
+    @property
+    def key(self) -> tuple[str, str, str | None]:
+        """Identity used to share routing state between clients."""
+        return (self.base_url.rstrip("/"), self.api_key, self.model_name)
+
+
+@dataclass
+class RouterConfig:
+    """Tuning knobs for endpoint selection and ejection."""
+
+    ewma_alpha: float = 0.3  # Weight of the newest sample in the EWMA
+    base_backoff: float = 1.0  # First ejection period in seconds
+    max_backoff: float = 60.0  # Cap for the ejection period in seconds
+    acquire_timeout: float = 120.0  # Max wait for a free slot in seconds
+    ttft_window: int = 200  # Recent TTFT samples kept for percentiles
+    min_ttft_samples: int = 10  # Samples needed before percentiles are used
+
+
+class EndpointState:
+    """Live statistics and health for one endpoint."""
+
+    def __init__(self, endpoint: Endpoint):
+        self.endpoint = endpoint
+        self.in_flight = 0
+        self.ewma_ttft: float | None = None
+        self.ewma_total: float | None = None
+        self.requests = 0
+        self.failures = 0  # Total failures
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+    def is_healthy(self, now: float) -> bool:
+        """Whether the endpoint is outside its ejection period."""
+        return now >= self.ejected_until
+
+    def has_capacity(self) -> bool:
+        """Whether another request may be sent to the endpoint."""
+        limit = self.endpoint.max_concurrency
+        return limit <= 0 or self.in_flight < limit
+
+    def score(self) -> float:
+        """Expected latency of one more request; lower is better."""
+        if self.ewma_total is None:
+            # Unmeasured endpoints are tried first so they get a sample
+            return self.in_flight / max(self.endpoint.weight, 1e-6)
+        return self.ewma_total * (self.in_flight + 1) / max(self.endpoint.weight, 1e-6)
+
+    def snapshot(self) -> dict:
+        """Statistics as a plain dictionary."""
+        return {
+            "base_url": self.endpoint.base_url,
+            "in_flight": self.in_flight,
+            "ewma_ttft": self.ewma_ttft,
+            "ewma_total": self.ewma_total,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejected_for": max(0.0, self.ejected_until - time.time()),
+        }
+
+
+class NoEndpointAvailable(RuntimeError):
+    """Raised when no endpoint can take a request."""
+
+
+class ModelRouter:
+    """
+    Picks an endpoint for each request and records the outcome.
+
+    Args:
+        endpoints: Endpoints to balance across.
+        config: Router configuration.
+
+    Example:
+        >>> router = ModelRouter([Endpoint("http://a:8000/v1"), Endpoint("http://b:8000/v1")])
+        >>> state = router.acquire()
+        >>> router.release(state, ttft=0.4, total=2.1)
+    """
+
+    def __init__(self, endpoints: list[Endpoint], config: RouterConfig | None = None):
+        if not endpoints:
+            raise ValueError("ModelRouter needs at least one endpoint")
+        self.config = config or RouterConfig()
+        self.states = [EndpointState(endpoint) for endpoint in endpoints]
+        self._ttft_samples: deque[float] = deque(maxlen=self.config.ttft_window)
+        self._condition = threading.Condition()
+
+    def acquire(self, exclude: set[str] | None = None) -> EndpointState:
+        """
+        Reserve a slot on the best endpoint.
+
+        Healthy endpoints are preferred. If every candidate is ejected, the
+        one whose ejection ends first is used rather than failing outright.
+
+        Args:
+            exclude: Base URLs not to use (e.g. ones already tried).
+
+        Returns:
+            The reserved endpoint state; pass it to release().
+
+        Raises:
+            NoEndpointAvailable: If every endpoint is excluded or all
+                candidates stay at capacity.
+        """
+        exclude = exclude or set()
+        if all(s.endpoint.base_url in exclude for s in self.states):
+            raise NoEndpointAvailable("All model endpoints have been tried")
+        deadline = time.time() + self.config.acquire_timeout
+        with self._condition:
+            while True:
+                state = self._pick(exclude)
+                if state is not None:
+                    state.in_flight += 1
+                    return state
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise NoEndpointAvailable(
+                        "All model endpoints are at max concurrency"
+                    )
+                self._condition.wait(remaining)
+
+    def try_acquire(self, exclude: set[str] | None = None) -> EndpointState | None:
+        """
+        Reserve a slot without waiting.
+
+        Args:
+            exclude: Base URLs not to use.
+
+        Returns:
+            The reserved endpoint state, or None if no endpoint has capacity.
+        """
+        with self._condition:
+            state = self._pick(exclude or set())
+            if state is not None:
+                state.in_flight += 1
+            return state
+
+    def _pick(self, exclude: set[str]) -> EndpointState | None:
+        """Choose an endpoint with free capacity; the caller holds the lock."""
+        now = time.time()
+        candidates = [
+            s
+            for s in self.states
+            if s.endpoint.base_url not in exclude and s.has_capacity()
+        ]
+        if not candidates:
+            return None
+        healthy = [s for s in candidates if s.is_healthy(now)]
+        if healthy:
+            return min(healthy, key=lambda s: s.score())
+        return min(candidates, key=lambda s: s.ejected_until)
+
+    def release(
+        self,
+        state: EndpointState,
+        ttft: float | None = None,
+        total: float | None = None,
+        error: Exception | None = None,
+    ) -> None:
+        """
+        Return a slot and record the request outcome.
+
+        Args:
+            state: State returned by acquire().
+            ttft: Time to first token in seconds.
+            total: Total request time in seconds.
+            error: The exception if the request failed.
+        """
+        with self._condition:
+            state.in_flight -= 1
+            state.requests += 1
+            if error is not None:
+                state.failures += 1
+                state.consecutive_failures += 1
+                if len(self.states) > 1:
+                    # With a single endpoint there is nothing to fail over
+                    # to, so ejecting it would only delay the next request
+                    backoff = min(
+                        self.config.base_backoff
+                        * 2 ** (state.consecutive_failures - 1),
+                        self.config.max_backoff,
+                    )
+                    state.ejected_until = time.time() + backoff
+            else:
+                state.consecutive_failures = 0
+                state.ejected_until = 0.0
+                alpha = self.config.ewma_alpha
+                if ttft is not None:
+                    state.ewma_ttft = _ewma(state.ewma_ttft, ttft, alpha)
+                    self._ttft_samples.append(ttft)
+                if total is not None:
+                    state.ewma_total = _ewma(state.ewma_total, total, alpha)
+            self._condition.notify_all()
+
+    def ttft_percentile(self, percentile: float) -> float | None:
+        """
+        Percentile of recent time-to-first-token samples across endpoints.
+
+        Args:
+            percentile: Percentile between 0 and 100.
+
+        Returns:
+            The TTFT in seconds, or None until enough samples exist.
+        """
+        with self._condition:
+            samples = sorted(self._ttft_samples)
+        if len(samples) < self.config.min_ttft_samples:
+            return None
+        index = round(percentile / 100 * (len(samples) - 1))
+        return samples[min(max(index, 0), len(samples) - 1)]
+
+    def stats(self) -> list[dict]:
+        """Per-endpoint statistics."""
+        with self._condition:
+            return [state.snapshot() for state in self.states]
+
+
+# Failures that may be specific to one replica
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.APIStatusError, httpx.HTTPError)
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Whether a failed request should eject its endpoint and be retried elsewhere.
+
+    Connection errors and 429 / 5xx responses are; other 4xx responses mean
+    the request itself is bad and another replica will not help.
+    """
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+def _ewma(current: float | None, sample: float, alpha: float) -> float:
+    """Update an exponentially weighted moving average."""
+    if current is None:
+        return sample
+    return alpha * sample + (1 - alpha) * current
+
+
+_routers: dict[tuple, ModelRouter] = {}
+_routers_lock = threading.Lock()
+
+
+def get_router(endpoints: list[Endpoint]) -> ModelRouter:
+    """
+    Get the shared router for a set of endpoints.
+
+    Clients configured with the same endpoints share one router, so that
+    concurrency limits and latency statistics cover every agent in the
+    process.
+
+    Args:
+        endpoints: Endpoints to balance across.
+
+    Returns:
+        The shared ModelRouter.
+    """
+    key = tuple(endpoint.key for endpoint in endpoints)
+    with _routers_lock:
+        router = _routers.get(key)
+        if router is None:
+            router = ModelRouter(endpoints)
+            _routers[key] = router
+        return router
+
+
+def parse_endpoints(spec: str, api_key: str = "EMPTY") -> list[Endpoint]:
+    """
+    Parse a comma-separated list of base URLs.
+
+    Args:
+        spec: e.g. "http://10.0.0.1:8000/v1,http://10.0.0.2:8000/v1".
+        api_key: API key used for every endpoint.
+
+    Returns:
+        List of endpoints with default weight and concurrency.
+    """
+    return [
+        Endpoint(base_url=url.strip(), api_key=api_key)
+        for url in spec.split(",")
+        if url.strip()
+    ]
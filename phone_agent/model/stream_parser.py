@@ -0,0 +1,151 @@
+"""Incremental parser for streamed model output.
+
+The parser is fed stream chunks as they arrive. It separates the thinking
+text from the action, and tracks bracket depth and string literals inside the
+action so that it knows the moment a ``do(...)`` or ``finish(...)`` call is
+syntactically complete. The client can then close the HTTP stream without
+waiting for trailing tokens.
+"""
+
+import ast
+
+ACTION_MARKERS = ("finish(message=", "do(action=")
+
+_OPENERS = "([{"
+_CLOSERS = ")]}"
+_QUOTES = "\"'"
+
+
+class ActionStreamParser:
+    """
+    Stateful parser for one streamed model response.
+
+    Example:
+        >>> parser = ActionStreamParser()
+        >>> parser.feed("Tap the icon. do(action=")
+        'Tap the icon. '
+        >>> parser.feed('"Tap", element=[1, 2])</answer>')
+        ''
+        >>> parser.action
+        'do(action="Tap", element=[1, 2])'
+    """
+
+    def __init__(self):
+        self._chunks: list[str] = []
+        self._pending = ""  # Thinking text that may end with a partial marker
+        self._thinking: list[str] = []
+        self._action: list[str] | None = None  # None until a marker is seen
+        self._depth = 0
+        self._quote: str | None = None
+        self._escape = False
+        self.action: str | None = None  # Set once the action is complete
+
+    @property
+    def raw_content(self) -> str:
+        """All text received so far."""
+        return "".join(self._chunks)
+
+    @property
+    def in_action(self) -> bool:
+        """Whether an action marker has been seen."""
+        return self._action is not None
+
+    @property
+    def complete(self) -> bool:
+        """Whether a syntactically complete action has been received."""
+        return self.action is not None
+
+    @property
+    def thinking(self) -> str:
+        """Thinking text before the action marker."""
+        return "".join(self._thinking).strip()
+
+    def feed(self, content: str) -> str:
+        """
+        Consume one stream chunk.
+
+        Args:
+            content: Text of the chunk.
+
+        Returns:
+            Thinking text that is now safe to display (never part of a marker).
+        """
+        self._chunks.append(content)
+        if self.complete:
+            return ""
+        if self.in_action:
+            self._scan_action(content)
+            return ""
+
+        self._pending += content
+        positions = [
+            (self._pending.find(marker), marker)
+            for marker in ACTION_MARKERS
+            if marker in self._pending
+        ]
+        if positions:
+            index, marker = min(positions)
+            visible = self._pending[:index]
+            self._thinking.append(visible)
+            self._action = [marker]
+            self._depth = 1  # The marker ends with the opening parenthesis
+            rest = self._pending[index + len(marker):]
+            self._pending = ""
+            self._scan_action(rest)
+            return visible
+
+        # Hold back a suffix that could be the start of a marker
+        keep = _partial_marker_length(self._pending)
+        visible = self._pending[: len(self._pending) - keep]
+        self._pending = self._pending[len(self._pending) - keep:]
+        self._thinking.append(visible)
+        return visible
+
+    def _scan_action(self, text: str) -> None:
+        """Track brackets and strings until the action call closes."""
+        for i, char in enumerate(text):
+            if self._quote is not None:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == self._quote:
+                    self._quote = None
+                continue
+
+            if char in _QUOTES:
+                self._quote = char
+            elif char in _OPENERS:
+                self._depth += 1
+            elif char in _CLOSERS:
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = "".join(self._action) + text[: i + 1]
+                    if _is_complete_call(candidate):
+                        self.action = candidate
+                        return
+                    # Unbalanced quotes in free text; keep scanning
+                    self._depth = 1
+        self._action.append(text)
+
+
+def _partial_marker_length(text: str) -> int:
+    """Length of the longest suffix of text that is a proper prefix of a marker."""
+    longest = 0
+    for marker in ACTION_MARKERS:
+        for length in range(min(len(marker) - 1, len(text)), longest, -1):
+            if text.endswith(marker[:length]):
+                longest = length
+                break
+    return longest
+
+
+def _is_complete_call(candidate: str) -> bool:
+    """Check that the candidate parses as a single call expression."""
+    # Models emit raw newlines inside strings; escape them as parse_action does
+    source = candidate.replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError:
+        return False
+    return isinstance(tree.body, ast.Call)
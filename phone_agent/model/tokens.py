@@ -0,0 +1,94 @@
+"""Tokenizer-free token estimates for prompts."""
+
+import hashlib
+import json
+from typing import Any
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the token count of a text.
+
+    CJK characters are counted as one token each and other text as one
+    token per four characters, which is close enough for budgeting without
+    loading a tokenizer.
+
+    Args:
+        text: Text to estimate.
+
+    Returns:
+        Estimated number of tokens.
+    """
+    wide = sum(1 for char in text if ord(char) >= 0x2E80)
+    narrow = len(text) - wide
+    return wide + (narrow + 3) // 4
+
+
+def estimate_message_tokens(message: dict[str, Any], image_tokens: int = 1200) -> int:
+    """
+    Estimate the token count of one chat message.
+
+    Args:
+        message: Message dictionary in OpenAI format.
+        image_tokens: Tokens counted per image part.
+
+    Returns:
+        Estimated number of tokens, including a small per-message overhead.
+    """
+    content = message.get("content")
+    tokens = 4  # Role and formatting overhead
+    if isinstance(content, str):
+        return tokens + estimate_tokens(content)
+    for item in content or []:
+        if item.get("type") == "text":
+            tokens += estimate_tokens(item.get("text", ""))
+        elif item.get("type") == "image_url":
+            tokens += image_tokens
+    return tokens
+
+
+class PrefixTracker:
+    """
+    Estimates how much of each prompt repeats the previous one.
+
+    Serving engines with automatic prefix caching (vLLM, SGLang) reuse the KV
+    cache for a byte-identical prompt prefix, so the leading messages shared
+    with the previous request approximate the prefill work that is skipped.
+
+    Args:
+        image_tokens: Tokens counted per image part.
+    """
+
+    def __init__(self, image_tokens: int = 1200):
+        self.image_tokens = image_tokens
+        self._previous: list[str] = []
+
+    def update(self, messages: list[dict[str, Any]]) -> tuple[int, int]:
+        """
+        Record a prompt and compare it with the previous one.
+
+        Args:
+            messages: Messages about to be sent.
+
+        Returns:
+            Tuple of (estimated cacheable prefix tokens, estimated total tokens).
+        """
+        digests = [
+            hashlib.sha1(
+                json.dumps(m, ensure_ascii=False, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+            for m in messages
+        ]
+        cached = 0
+        total = 0
+        matching = True
+        for i, message in enumerate(messages):
+            tokens = estimate_message_tokens(message, self.image_tokens)
+            total += tokens
+            matching = (
+                matching and i < len(self._previous) and self._previous[i] == digests[i]
+            )
+            if matching:
+                cached += tokens
+        self._previous = digests
+        return cached, total
@@ -0,0 +1,251 @@
+"""Shared, pooled HTTP transport for model API clients.
+
+Every ``OpenAI`` client used to bring its own connection pool, so each agent,
+preflight check and GUI run paid a fresh TCP and TLS handshake. This module
+keeps one keep-alive ``httpx.Client`` per base URL for the whole process and
+caches ``OpenAI`` clients on top of it. ``prewarm`` opens the connection in
+the background, e.g. while the first screenshot is being captured.
+
+``AsyncOpenAI`` clients for asyncio agents are pooled the same way, per event
+loop, since an ``httpx.AsyncClient`` cannot be shared between loops.
+
+Pool settings can be changed with environment variables:
+    PHONE_AGENT_HTTP_MAX_CONNECTIONS, PHONE_AGENT_HTTP_MAX_KEEPALIVE,
+    PHONE_AGENT_HTTP_KEEPALIVE_EXPIRY, PHONE_AGENT_HTTP2
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+
+@dataclass
+class TransportConfig:
+    """Connection pool settings for model API traffic."""
+
+    max_connections: int = 20  # Maximum open connections per base URL
+    max_keepalive_connections: int = 10  # Idle connections kept open
+    keepalive_expiry: float = 60.0  # Seconds an idle connection is kept
+    connect_timeout: float = 10.0  # TCP/TLS connect timeout in seconds
+    http2: bool = False  # Use HTTP/2 (requires: pip install httpx[http2])
+
+    def __post_init__(self):
+        """Load values from environment variables if present."""
+        self.max_connections = int(
+            os.getenv("PHONE_AGENT_HTTP_MAX_CONNECTIONS", self.max_connections)
+        )
+        self.max_keepalive_connections = int(
+            os.getenv("PHONE_AGENT_HTTP_MAX_KEEPALIVE", self.max_keepalive_connections)
+        )
+        self.keepalive_expiry = float(
+            os.getenv("PHONE_AGENT_HTTP_KEEPALIVE_EXPIRY", self.keepalive_expiry)
+        )
+        self.http2 = os.getenv("PHONE_AGENT_HTTP2", str(self.http2)).lower() in (
+            "true",
+            "1",
+            "yes",
+        )
+
+
+TRANSPORT_CONFIG = TransportConfig()
+
+_lock = threading.Lock()
+_http_clients: dict[str, httpx.Client] = {}
+_openai_clients: dict[tuple[str, str], OpenAI] = {}
+_last_warmed: dict[str, float] = {}
+# Per event loop: {base URL: httpx.AsyncClient} and {(base URL, API key): AsyncOpenAI}
+_async_http_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_async_openai_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _normalize(base_url: str) -> str:
+    """Normalize a base URL for use as a cache key."""
+    return base_url.rstrip("/")
+
+
+def _http2_available() -> bool:
+    """Check whether the optional h2 package is installed."""
+    try:
+        import h2  # noqa: F401
+
+        return True
+    except ImportError:
+        print("HTTP/2 disabled: h2 not installed. Install: pip install httpx[http2]")
+        return False
+
+
+def _create_limits() -> httpx.Limits:
+    """Connection pool limits from the transport config."""
+    config = TRANSPORT_CONFIG
+    return httpx.Limits(
+        max_connections=config.max_connections,
+        max_keepalive_connections=config.max_keepalive_connections,
+        keepalive_expiry=config.keepalive_expiry,
+    )
+
+
+def get_http_client(base_url: str) -> httpx.Client:
+    """
+    Get the shared pooled HTTP client for a base URL.
+
+    Args:
+        base_url: Model API base URL.
+
+    Returns:
+        An httpx.Client with keep-alive connection pooling.
+    """
+    with _lock:
+        return _get_http_client_locked(_normalize(base_url))
+
+
+def _get_http_client_locked(key: str) -> httpx.Client:
+    """Get or create the HTTP client for a key; the caller holds the lock."""
+    client = _http_clients.get(key)
+    if client is None or client.is_closed:
+        config = TRANSPORT_CONFIG
+        client = httpx.Client(
+            http2=config.http2 and _http2_available(),
+            limits=_create_limits(),
+            timeout=httpx.Timeout(600.0, connect=config.connect_timeout),
+            follow_redirects=True,
+        )
+        _http_clients[key] = client
+        # OpenAI clients bound to a closed pool must be rebuilt
+        for cached_key in [k for k in _openai_clients if k[0] == key]:
+            del _openai_clients[cached_key]
+    return client
+
+
+def get_openai_client(base_url: str, api_key: str = "EMPTY") -> OpenAI:
+    """
+    Get a cached OpenAI client that uses the shared transport.
+
+    Args:
+        base_url: Model API base URL.
+        api_key: API key.
+
+    Returns:
+        OpenAI client; use ``with_options(timeout=...)`` for per-call timeouts.
+    """
+    key = _normalize(base_url)
+    with _lock:
+        http_client = _get_http_client_locked(key)
+        client = _openai_clients.get((key, api_key))
+        if client is None:
+            client = OpenAI(base_url=base_url, api_key=api_key, http_client=http_client)
+            _openai_clients[(key, api_key)] = client
+        return client
+
+
+def get_async_openai_client(base_url: str, api_key: str = "EMPTY") -> AsyncOpenAI:
+    """
+    Get a cached AsyncOpenAI client for the running event loop.
+
+    Clients on the same loop share one pooled ``httpx.AsyncClient`` per base
+    URL. Must be called from a coroutine.
+
+    Args:
+        base_url: Model API base URL.
+        api_key: API key.
+
+    Returns:
+        AsyncOpenAI client.
+    """
+    loop = asyncio.get_running_loop()
+    key = _normalize(base_url)
+    with _lock:
+        http_clients = _async_http_clients.setdefault(loop, {})
+        openai_clients = _async_openai_clients.setdefault(loop, {})
+        client = openai_clients.get((key, api_key))
+        if client is None:
+            http_client = http_clients.get(key)
+            if http_client is None:
+                config = TRANSPORT_CONFIG
+                http_client = httpx.AsyncClient(
+                    http2=config.http2 and _http2_available(),
+                    limits=_create_limits(),
+                    timeout=httpx.Timeout(600.0, connect=config.connect_timeout),
+                    follow_redirects=True,
+                )
+                http_clients[key] = http_client
+            client = AsyncOpenAI(
+                base_url=base_url, api_key=api_key, http_client=http_client
+            )
+            openai_clients[(key, api_key)] = client
+        return client
+
+
+async def close_async_clients() -> None:
+    """Close the pooled async connections of the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        _async_openai_clients.pop(loop, None)
+        http_clients = _async_http_clients.pop(loop, {})
+    for client in http_clients.values():
+        await client.aclose()
+
+
+def mark_used(base_url: str) -> None:
+    """Record that a request just used the pooled connection."""
+    with _lock:
+        _last_warmed[_normalize(base_url)] = time.time()
+
+
+def prewarm(base_url: str, api_key: str = "EMPTY") -> threading.Thread | None:
+    """
+    Open a pooled connection (TCP and TLS) to the API in the background.
+
+    Sends a cheap GET to ``{base_url}/models``; the response itself is
+    ignored. Skipped if the connection was warmed within the keep-alive
+    window.
+
+    Args:
+        base_url: Model API base URL.
+        api_key: API key sent with the warm-up request.
+
+    Returns:
+        The background thread, or None if no warm-up was needed.
+    """
+    key = _normalize(base_url)
+    now = time.time()
+    with _lock:
+        if now - _last_warmed.get(key, 0.0) < TRANSPORT_CONFIG.keepalive_expiry / 2:
+            return None
+        _last_warmed[key] = now
+
+    def warm():
+        try:
+            get_http_client(base_url).get(
+                f"{key}/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=TRANSPORT_CONFIG.connect_timeout,
+            )
+        except httpx.HTTPError:
+            # The real request will report connection problems
+            with _lock:
+                _last_warmed.pop(key, None)
+
+    thread = threading.Thread(target=warm, name="model-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def close_all() -> None:
+    """Close all pooled connections."""
+    with _lock:
+        clients = list(_http_clients.values())
+        _http_clients.clear()
+        _openai_clients.clear()
+        _last_warmed.clear()
+    for client in clients:
+        client.close()
+
+
+atexit.register(close_all)
@@ -0,0 +1,173 @@
+"""Adaptive post-action waits based on screen stability.
+
+Instead of sleeping a fixed time after every action, poll cheap low-resolution
+frames and return as soon as the screen has stopped changing.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from phone_agent.config.timing import TIMING_CONFIG
+
+
+def frames_differ(
+    previous, current, pixel_tolerance: int | None = None, threshold: float | None = None
+) -> bool:
+    """
+    Compare two low-resolution frames with a vectorized NumPy diff.
+
+    Args:
+        previous: Previous frame as a uint8 array.
+        current: Current frame as a uint8 array.
+        pixel_tolerance: Per-pixel difference ignored as noise.
+        threshold: Fraction of changed pixels above which frames differ.
+
+    Returns:
+        True if the frames differ meaningfully.
+    """
+    import numpy as np
+
+    config = TIMING_CONFIG.stability
+    if pixel_tolerance is None:
+        pixel_tolerance = config.pixel_tolerance
+    if threshold is None:
+        threshold = config.diff_threshold
+
+    if previous.shape != current.shape:
+        return True
+
+    diff = np.abs(previous.astype(np.int16) - current.astype(np.int16))
+    changed = np.count_nonzero(diff > pixel_tolerance)
+    return changed > threshold * diff.size
+
+
+class _StabilityWait:
+    """
+    Polling state shared by the sync and async stable-screen waits.
+
+    The caller grabs a frame, passes it to observe() and sleeps for the
+    returned time, until observe() returns None.
+    """
+
+    def __init__(self, max_wait: float, min_wait: float, stable_duration: float | None):
+        config = TIMING_CONFIG.stability
+        self.poll_interval = config.poll_interval
+        self.stable_duration = (
+            config.stable_duration if stable_duration is None else stable_duration
+        )
+        self.start = time.time()
+        self.deadline = self.start + max_wait
+        self.min_deadline = self.start + min(min_wait, max_wait)
+        self.previous = None
+        self.stable_since: float | None = None
+
+    def observe(self, frame, poll_start: float) -> float | None:
+        """
+        Record a frame grabbed at ``poll_start``.
+
+        Returns:
+            Seconds to sleep before the next poll, or None to stop waiting.
+        """
+        now = time.time()
+        if self.previous is not None and not frames_differ(self.previous, frame):
+            if self.stable_since is None:
+                self.stable_since = poll_start
+        else:
+            self.stable_since = None
+        self.previous = frame
+
+        if now >= self.deadline:
+            return None
+        if (
+            self.stable_since is not None
+            and now >= self.min_deadline
+            and now - self.stable_since >= self.stable_duration
+        ):
+            return None
+
+        # Keep polling frequency bounded when capture is very fast
+        sleep_time = self.poll_interval - (now - poll_start)
+        return min(max(0.0, sleep_time), max(0.0, self.deadline - now))
+
+    def remaining(self) -> float:
+        """Time left until max_wait, for the fixed-delay fallback."""
+        return max(0.0, self.deadline - time.time())
+
+    def elapsed(self) -> float:
+        """Time waited so far."""
+        return time.time() - self.start
+
+
+def wait_for_stable_screen(
+    grab_frame: Callable[[], object],
+    max_wait: float,
+    min_wait: float = 0.0,
+    stable_duration: float | None = None,
+) -> float:
+    """
+    Wait until the screen has been stable for ``stable_duration``.
+
+    Args:
+        grab_frame: Returns the current low-resolution frame as a NumPy array.
+        max_wait: Maximum time to wait in seconds.
+        min_wait: Minimum time to wait in seconds.
+        stable_duration: How long the screen must be unchanged. Defaults to
+            the configured value.
+
+    Returns:
+        The time actually waited in seconds.
+
+    Note:
+        If frames cannot be captured (or NumPy is missing), this falls back
+        to sleeping for ``max_wait``.
+    """
+    wait = _StabilityWait(max_wait, min_wait, stable_duration)
+    try:
+        while True:
+            poll_start = time.time()
+            sleep_time = wait.observe(grab_frame(), poll_start)
+            if sleep_time is None:
+                break
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+    except Exception as e:
+        print(f"Screen stability check failed, using fixed delay: {e}")
+        time.sleep(wait.remaining())
+
+    return wait.elapsed()
+
+
+async def wait_for_stable_screen_async(
+    grab_frame: Callable[[], Awaitable[object]],
+    max_wait: float,
+    min_wait: float = 0.0,
+    stable_duration: float | None = None,
+) -> float:
+    """
+    Async version of wait_for_stable_screen() for event-loop based agents.
+
+    Args:
+        grab_frame: Coroutine function returning the current low-resolution
+            frame as a NumPy array.
+        max_wait: Maximum time to wait in seconds.
+        min_wait: Minimum time to wait in seconds.
+        stable_duration: How long the screen must be unchanged.
+
+    Returns:
+        The time actually waited in seconds.
+    """
+    wait = _StabilityWait(max_wait, min_wait, stable_duration)
+    try:
+        while True:
+            poll_start = time.time()
+            sleep_time = wait.observe(await grab_frame(), poll_start)
+            if sleep_time is None:
+                break
+            if sleep_time > 0:
+                await asyncio.sleep(sleep_time)
+    except Exception as e:
+        print(f"Screen stability check failed, using fixed delay: {e}")
+        await asyncio.sleep(wait.remaining())
+
+    return wait.elapsed()
@@ -0,0 +1,259 @@
+"""Per-stage step telemetry.
+
+Each agent step is split into timed spans: screenshot capture, current-app
+lookup, context build, admission queue wait, model time to first token,
+model decode, action parse, action execute and post-action wait. The spans
+of one task are collected in a ``TaskTrace``, which can be exported as
+Chrome trace JSON (open in chrome://tracing or https://ui.perfetto.dev) or
+printed as a per-stage summary table. This shows whether a slow task was
+waiting on the phone, the network or the model.
+
+Code below the agent (e.g. ``wait_for_screen``) records into the trace of
+the task it runs for through ``span()``, which uses a context variable and
+is a no-op when no trace is active:
+
+    >>> trace = TaskTrace(task="Open Settings")
+    >>> token = set_current_trace(trace)
+    >>> with span("post_action_wait"):
+    ...     time.sleep(0.1)
+    >>> reset_current_trace(token)
+    >>> print(trace.summary())
+"""
+
+import contextvars
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator
+
+# Stage names in pipeline order, used to order summaries
+STAGES = (
+    "screenshot",
+    "current_app",
+    "context_build",
+    "queue_wait",
+    "model_ttft",
+    "model_decode",
+    "model_cached",
+    "model_error",
+    "action_parse",
+    "action_execute",
+    "post_action_wait",
+)
+STEP_SPAN = "step"  # Encloses all spans of one step
+
+# Spans on different tracks may overlap (e.g. current_app runs next to the
+# screenshot); spans on the same track nest
+MAIN_TRACK = "agent"
+OBSERVE_TRACK = "observe"
+STEP_TRACK = "steps"
+_TRACK_IDS = {STEP_TRACK: 0, MAIN_TRACK: 1, OBSERVE_TRACK: 2}
+
+
+@dataclass
+class Span:
+    """One timed stage of a step."""
+
+    name: str
+    start: float  # Unix timestamp
+    duration: float  # Seconds
+    step: int = 0
+    track: str = MAIN_TRACK
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class TaskTrace:
+    """Spans recorded while running one task."""
+
+    task: str | None = None
+    device_id: str | None = None
+    started: float = field(default_factory=time.time)
+    step: int = 0  # Step new spans are attributed to
+    spans: list[Span] = field(default_factory=list)
+
+    def add(
+        self,
+        name: str,
+        start: float,
+        duration: float,
+        track: str = MAIN_TRACK,
+        **args: Any,
+    ) -> Span:
+        """
+        Record a span that has already finished.
+
+        Args:
+            name: Stage name.
+            start: Unix timestamp the stage started at.
+            duration: Stage duration in seconds.
+            track: Track for spans that overlap others.
+            **args: Extra details shown in the trace viewer.
+
+        Returns:
+            The recorded span.
+        """
+        recorded = Span(name, start, max(0.0, duration), self.step, track, args)
+        self.spans.append(recorded)
+        return recorded
+
+    @contextmanager
+    def span(self, name: str, track: str = MAIN_TRACK, **args: Any) -> Iterator[None]:
+        """Record the duration of a with-block as a span."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.time() - start, track, **args)
+
+    def add_model_response(self, response, start: float) -> None:
+        """
+        Record the queue wait, time to first token and decode of a model call.
+
+        Args:
+            response: ModelResponse returned by the model client.
+            start: Unix timestamp the request was made at.
+        """
+        if response.cached:
+            self.add("model_cached", start, time.time() - start)
+            return
+
+        queue_wait = response.queue_wait_time
+        total = response.total_time or 0.0
+        ttft = min(response.time_to_first_token or total, total)
+        if queue_wait > 0:
+            self.add("queue_wait", start, queue_wait)
+        model_start = start + queue_wait
+        self.add("model_ttft", model_start, ttft, endpoint=response.endpoint)
+        self.add("model_decode", model_start + ttft, total - ttft)
+
+    def totals(self) -> dict[str, float]:
+        """
+        Total seconds per stage, in pipeline order.
+
+        ``action_execute`` includes the ``post_action_wait`` inside it.
+        """
+        totals: dict[str, float] = {}
+        for recorded in self.spans:
+            if recorded.name != STEP_SPAN:
+                totals[recorded.name] = totals.get(recorded.name, 0.0) + recorded.duration
+        order = {name: index for index, name in enumerate(STAGES)}
+        return dict(sorted(totals.items(), key=lambda item: order.get(item[0], len(order))))
+
+    def summary(self) -> str:
+        """Format the per-stage totals as a table."""
+        step_time = sum(s.duration for s in self.spans if s.name == STEP_SPAN)
+        counts: dict[str, int] = {}
+        for recorded in self.spans:
+            counts[recorded.name] = counts.get(recorded.name, 0) + 1
+
+        lines = [
+            f"{'Stage':<18}{'Count':>7}{'Total (s)':>11}{'Mean (s)':>10}{'Share':>8}",
+            "-" * 54,
+        ]
+        for name, total in self.totals().items():
+            count = counts[name]
+            share = f"{total / step_time:.0%}" if step_time > 0 else "-"
+            lines.append(
+                f"{name:<18}{count:>7}{total:>11.3f}{total / count:>10.3f}{share:>8}"
+            )
+        lines.append("-" * 54)
+        lines.append(f"{'steps':<18}{counts.get(STEP_SPAN, 0):>7}{step_time:>11.3f}")
+        return "\n".join(lines)
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Export this task as a Chrome trace JSON object."""
+        return chrome_trace([self])
+
+
+def chrome_trace(traces: Iterable[TaskTrace]) -> dict[str, Any]:
+    """
+    Build a Chrome trace JSON object, one process per task.
+
+    Args:
+        traces: Task traces to include.
+
+    Returns:
+        Dictionary in the Trace Event Format; serialize it with json.dump().
+    """
+    traces = [t for t in traces if t.spans]
+    origin = min((t.started for t in traces), default=0.0)
+    events: list[dict[str, Any]] = []
+    for pid, trace in enumerate(traces, start=1):
+        label = f"{trace.device_id or 'device'}: {trace.task or ''}"
+        events.append(
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": label}}
+        )
+        for track, tid in _TRACK_IDS.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": track},
+                }
+            )
+        for recorded in trace.spans:
+            events.append(
+                {
+                    "name": recorded.name,
+                    "cat": recorded.track,
+                    "ph": "X",
+                    "ts": round((recorded.start - origin) * 1e6),
+                    "dur": round(recorded.duration * 1e6),
+                    "pid": pid,
+                    "tid": _TRACK_IDS.get(recorded.track, len(_TRACK_IDS)),
+                    "args": {"step": recorded.step, **recorded.args},
+                }
+            )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(traces: Iterable[TaskTrace], path: str) -> None:
+    """
+    Write task traces to a Chrome trace JSON file.
+
+    Args:
+        traces: Task traces to include.
+        path: Output file path.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(traces), f, ensure_ascii=False)
+
+
+_current_trace: contextvars.ContextVar[TaskTrace | None] = contextvars.ContextVar(
+    "phone_agent_trace", default=None
+)
+
+
+def current_trace() -> TaskTrace | None:
+    """Get the trace of the task running in this thread or asyncio task."""
+    return _current_trace.get()
+
+
+def set_current_trace(trace: TaskTrace | None) -> contextvars.Token:
+    """
+    Make a trace current for this thread or asyncio task.
+
+    Returns:
+        Token to pass to reset_current_trace().
+    """
+    return _current_trace.set(trace)
+
+
+def reset_current_trace(token: contextvars.Token) -> None:
+    """Restore the trace that was current before set_current_trace()."""
+    _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, track: str = MAIN_TRACK, **args: Any) -> Iterator[None]:
+    """Record a with-block into the current trace, if there is one."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.span(name, track, **args):
+        yield
@@ -0,0 +1,38 @@
+"""Helpers for bulk text entry and shell-argument-sized chunks."""
+
+import os
+
+# Texts at least this long use the bulk paste path instead of typing
+PASTE_THRESHOLD = int(os.getenv("PHONE_AGENT_PASTE_THRESHOLD", "32"))
+
+
+def split_utf8(text: str, max_bytes: int) -> list[str]:
+    """
+    Split text into chunks of at most ``max_bytes`` UTF-8 bytes.
+
+    Chunks never split a character, so each one can be encoded on its own.
+
+    Args:
+        text: Text to split.
+        max_bytes: Maximum encoded size of each chunk.
+
+    Returns:
+        List of chunks; a single empty chunk for empty text.
+    """
+    if len(text.encode("utf-8")) <= max_bytes:
+        return [text]
+
+    chunks = []
+    current = []
+    size = 0
+    for char in text:
+        char_size = len(char.encode("utf-8"))
+        if current and size + char_size > max_bytes:
+            chunks.append("".join(current))
+            current = []
+            size = 0
+        current.append(char)
+        size += char_size
+    if current:
+        chunks.append("".join(current))
+    return chunks
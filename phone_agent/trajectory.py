@@ -0,0 +1,110 @@
+"""Recorded action trajectories for model-free replay.
+
+A successful run is saved as the ordered list of actions, each with the
+perceptual hash of the screen it was taken on and its timing. Routine tasks
+can then be replayed without calling the model: before every action the live
+screen is compared with the recorded hash, and on the first mismatch the
+agent hands control back to the model-driven loop.
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+
+from phone_agent.config.paths import get_cache_dir
+from phone_agent.imaging import hamming_distance
+
+
+@dataclass
+class TrajectoryStep:
+    """One recorded action and the screen it was taken on."""
+
+    action: str  # Action text, e.g. 'do(action="Tap", element=[500, 300])'
+    screen_hash: str  # Hex dHash of the screen before the action
+    current_app: str
+    thinking: str = ""
+    duration: float = 0.0  # Wall time of the step in seconds
+
+    def matches(self, screen_hash: int, max_distance: int) -> bool:
+        """Whether a live screen hash is within tolerance of the recorded one."""
+        return hamming_distance(int(self.screen_hash, 16), screen_hash) <= max_distance
+
+
+@dataclass
+class Trajectory:
+    """A complete, successful run of one task."""
+
+    task: str
+    steps: list[TrajectoryStep] = field(default_factory=list)
+    created: float = field(default_factory=time.time)
+    duration: float = 0.0  # Wall time of the whole run in seconds
+
+    def to_dict(self) -> dict:
+        """Convert to a JSON-serializable dictionary."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Trajectory":
+        """Create a trajectory from a dictionary made by to_dict()."""
+        steps = [TrajectoryStep(**step) for step in data.get("steps", [])]
+        return cls(
+            task=data["task"],
+            steps=steps,
+            created=data.get("created", 0.0),
+            duration=data.get("duration", 0.0),
+        )
+
+
+class TrajectoryStore:
+    """
+    Stores one trajectory per task as JSON files.
+
+    Args:
+        directory: Storage directory; defaults to <cache dir>/trajectories.
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory or get_cache_dir("trajectories")
+
+    def path_for(self, task: str) -> str:
+        """File path of the trajectory for a task."""
+        digest = hashlib.sha1(task.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def load(self, task: str) -> Trajectory | None:
+        """
+        Load the trajectory recorded for a task.
+
+        Args:
+            task: Task text, matched exactly.
+
+        Returns:
+            The trajectory, or None if none was recorded.
+        """
+        try:
+            with open(self.path_for(task), encoding="utf-8") as f:
+                trajectory = Trajectory.from_dict(json.load(f))
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+        # Guard against hash collisions between task texts
+        return trajectory if trajectory.task == task else None
+
+    def save(self, trajectory: Trajectory) -> None:
+        """Save a trajectory, replacing any earlier one for the same task."""
+        path = self.path_for(trajectory.task)
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(trajectory.to_dict(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Failed to save trajectory: {e}")
+
+    def delete(self, task: str) -> None:
+        """Delete the trajectory for a task if there is one."""
+        try:
+            os.remove(self.path_for(task))
+        except OSError:
+            pass
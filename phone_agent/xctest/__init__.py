@@ -1,5 +1,6 @@
 """XCTest utilities for iOS device interaction via WebDriverAgent/XCUITest."""
 
+from phone_agent.xctest.client_async import AsyncWDAClient
 from phone_agent.xctest.connection import (
     ConnectionType,
     DeviceInfo,
@@ -19,6 +20,7 @@ from phone_agent.xctest.device import (
 )
 from phone_agent.xctest.input import (
     clear_text,
+    paste_text,
     type_text,
 )
 from phone_agent.xctest.screenshot import get_screenshot
@@ -28,6 +30,7 @@ __all__ = [
     "get_screenshot",
     # Input
     "type_text",
+    "paste_text",
     "clear_text",
     # Device control
     "get_current_app",
@@ -44,4 +47,6 @@ __all__ = [
     "ConnectionType",
     "quick_connect",
     "list_devices",
+    # Asyncio
+    "AsyncWDAClient",
 ]
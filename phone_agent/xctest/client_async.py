@@ -0,0 +1,346 @@
+"""Async WebDriverAgent client for driving iOS devices from an event loop.
+
+``AsyncWDAClient`` offers the coroutine interface of ``AsyncDeviceFactory``,
+so ``AsyncPhoneAgent`` and ``AsyncActionHandler`` drive an iOS device the same
+way they drive ADB and HDC devices:
+
+    >>> async with AsyncWDAClient("http://localhost:8100") as device:
+    ...     agent = AsyncPhoneAgent(model_config, agent_config, device_factory=device)
+    ...     await agent.run("Open Safari and search for Apple")
+
+Requests go over one pooled aiohttp session, so waiting on WDA never holds a
+thread, and cancelling a coroutine aborts its request. The payloads are the
+ones the synchronous ``phone_agent.xctest`` functions send. Pasting long
+text and the idevicescreenshot fallback run the synchronous code in the
+default executor.
+
+The ``device_id`` arguments are accepted for interface compatibility; the
+device is the one behind ``wda_url`` (``device_id`` is only passed to the
+idevicescreenshot fallback).
+"""
+
+import asyncio
+from typing import Any
+
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.device_factory import DeviceType
+from phone_agent.telemetry import span
+from phone_agent.xctest.device import (
+    _BACK_PAYLOAD,
+    _double_tap_actions,
+    _get_wda_session_url,
+    _long_press_actions,
+    _parse_active_app,
+    _swipe_payload,
+    _tap_actions,
+)
+from phone_agent.xctest.screenshot import (
+    _create_fallback_screenshot,
+    _get_screenshot_idevice,
+    _parse_wda_screenshot,
+)
+
+# Key of the element ID in W3C element references
+_W3C_ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+
+class AsyncWDAClient:
+    """
+    Coroutine versions of the device operations for iOS via WebDriverAgent.
+
+    Args:
+        wda_url: WebDriverAgent URL.
+        session_id: WDA session ID. Call start_session() to create one.
+        timeout: Default request timeout in seconds.
+
+    Example:
+        >>> device = AsyncWDAClient("http://localhost:8100")
+        >>> await device.start_session()
+        >>> screenshot = await device.get_screenshot()
+        >>> await device.tap(500, 1000)
+        >>> await device.close()
+    """
+
+    device_type = DeviceType.IOS
+
+    def __init__(
+        self,
+        wda_url: str = "http://localhost:8100",
+        session_id: str | None = None,
+        timeout: float = 10,
+    ):
+        self.wda_url = wda_url.rstrip("/")
+        self.session_id = session_id
+        self.timeout = timeout
+        self._session = None  # aiohttp.ClientSession, created on first use
+
+    async def __aenter__(self) -> "AsyncWDAClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the HTTP session."""
+        session, self._session = self._session, None
+        if session is not None:
+            await session.close()
+
+    # Requests
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        payload: dict | None = None,
+        session: bool = True,
+        timeout: float | None = None,
+    ) -> tuple[int, Any]:
+        """
+        Send a request to WDA.
+
+        Args:
+            method: HTTP method.
+            endpoint: Endpoint path, e.g. "actions".
+            payload: JSON body.
+            session: Whether the endpoint is under /session/<id> (if a
+                session ID is set).
+            timeout: Timeout in seconds; defaults to the client timeout.
+
+        Returns:
+            Tuple of (HTTP status, decoded JSON body or None).
+        """
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError(
+                "aiohttp is required for async iOS control. Install: pip install aiohttp"
+            ) from None
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        url = (
+            _get_wda_session_url(self.wda_url, self.session_id, endpoint)
+            if session
+            else f"{self.wda_url}/{endpoint}"
+        )
+        async with self._session.request(
+            method,
+            url,
+            json=payload,
+            ssl=False,
+            timeout=aiohttp.ClientTimeout(total=timeout or self.timeout),
+        ) as response:
+            try:
+                data = await response.json(content_type=None)
+            except ValueError:
+                data = None
+            return response.status, data
+
+    async def start_session(self) -> str | None:
+        """
+        Start a WDA session and use it for later requests.
+
+        Returns:
+            The session ID, or None if WDA did not return one.
+        """
+        status, data = await self.request(
+            "POST", "session", {"capabilities": {}}, session=False, timeout=30
+        )
+        if status not in (200, 201) or not isinstance(data, dict):
+            raise RuntimeError(f"Failed to start WDA session: {data}")
+        session_id = data.get("sessionId") or (data.get("value") or {}).get("sessionId")
+        if session_id:
+            self.session_id = session_id
+        return session_id
+
+    # Observation
+
+    async def get_screenshot(self, device_id: str | None = None, timeout: int = 10):
+        """Get screenshot from device, as xctest.get_screenshot."""
+        try:
+            status, data = await self.request(
+                "GET", "screenshot", session=False, timeout=timeout
+            )
+            if status == 200 and isinstance(data, dict):
+                screenshot = _parse_wda_screenshot(data)
+                if screenshot is not None:
+                    return screenshot
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"WDA screenshot failed: {e}")
+
+        screenshot = await asyncio.to_thread(_get_screenshot_idevice, device_id, timeout)
+        if screenshot is not None:
+            return screenshot
+        return _create_fallback_screenshot(is_sensitive=False)
+
+    async def get_current_app(self, device_id: str | None = None) -> str:
+        """Get current app name."""
+        try:
+            status, data = await self.request(
+                "GET", "wda/activeAppInfo", session=False, timeout=5
+            )
+            if status == 200 and isinstance(data, dict):
+                return _parse_active_app(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error getting current app: {e}")
+        return "System Home"
+
+    async def wait_for_screen(
+        self, device_id: str | None = None, max_wait: float = 1.0, min_wait: float = 0.0
+    ) -> float:
+        """Wait after an action (a fixed delay; WDA screenshots are too slow to poll)."""
+        if max_wait <= 0:
+            return 0.0
+        with span("post_action_wait"):
+            await asyncio.sleep(max_wait)
+        return max_wait
+
+    # Gestures
+
+    async def tap(
+        self, x: int, y: int, device_id: str | None = None, delay: float | None = None
+    ):
+        """Tap at coordinates."""
+        if delay is None:
+            delay = TIMING_CONFIG.device.default_tap_delay
+        await self.request("POST", "actions", _tap_actions(x, y), timeout=15)
+        await self.wait_for_screen(device_id, delay)
+
+    async def double_tap(
+        self, x: int, y: int, device_id: str | None = None, delay: float | None = None
+    ):
+        """Double tap at coordinates."""
+        if delay is None:
+            delay = TIMING_CONFIG.device.default_double_tap_delay
+        await self.request("POST", "actions", _double_tap_actions(x, y))
+        await self.wait_for_screen(device_id, delay)
+
+    async def long_press(
+        self,
+        x: int,
+        y: int,
+        duration_ms: int = 3000,
+        device_id: str | None = None,
+        delay: float | None = None,
+    ):
+        """Long press at coordinates."""
+        if delay is None:
+            delay = TIMING_CONFIG.device.default_long_press_delay
+        duration = duration_ms / 1000
+        await self.request(
+            "POST", "actions", _long_press_actions(x, y, duration), timeout=duration + 10
+        )
+        await self.wait_for_screen(device_id, delay)
+
+    async def swipe(
+        self,
+        start_x: int,
+        start_y: int,
+        end_x: int,
+        end_y: int,
+        duration_ms: int | None = None,
+        device_id: str | None = None,
+        delay: float | None = None,
+    ):
+        """Swipe from start to end."""
+        if delay is None:
+            delay = TIMING_CONFIG.device.default_swipe_delay
+        payload = _swipe_payload(
+            start_x,
+            start_y,
+            end_x,
+            end_y,
+            None if duration_ms is None else duration_ms / 1000,
+        )
+        await self.request(
+            "POST",
+            "wda/dragfromtoforduration",
+            payload,
+            timeout=payload["duration"] + 10,
+        )
+        await self.wait_for_screen(device_id, delay)
+
+    async def back(self, device_id: str | None = None, delay: float | None = None):
+        """Navigate back with a swipe from the left edge."""
+        if delay is None:
+            delay = TIMING_CONFIG.device.default_back_delay
+        await self.request("POST", "wda/dragfromtoforduration", _BACK_PAYLOAD)
+        await self.wait_for_screen(device_id, delay)
+
+    async def home(self, device_id: str | None = None, delay: float | None = None):
+        """Press home button."""
+        if delay is None:
+            delay = TIMING_CONFIG.device.default_home_delay
+        await self.request("POST", "wda/homescreen", session=False)
+        await self.wait_for_screen(device_id, delay)
+
+    async def launch_app(
+        self, app_name: str, device_id: str | None = None, delay: float | None = None
+    ) -> bool:
+        """Launch an app by name."""
+        from phone_agent.config.apps_ios import APP_PACKAGES_IOS
+
+        if app_name not in APP_PACKAGES_IOS:
+            return False
+        if delay is None:
+            delay = TIMING_CONFIG.device.default_launch_delay
+        status, _ = await self.request(
+            "POST", "wda/apps/launch", {"bundleId": APP_PACKAGES_IOS[app_name]}
+        )
+        await self.wait_for_screen(device_id, delay)
+        return status in (200, 201)
+
+    # Text input
+
+    async def type_text(self, text: str, device_id: str | None = None):
+        """Type text into the focused field, then hide the keyboard."""
+        status, _ = await self.request(
+            "POST", "wda/keys", {"value": list(text), "frequency": 60}, timeout=30
+        )
+        if status not in (200, 201):
+            print(f"Warning: Text input may have failed. Status: {status}")
+        await self._hide_keyboard()
+
+    async def paste_text(self, text: str, device_id: str | None = None):
+        """Enter long text through the pasteboard, typing it if pasting fails."""
+        from phone_agent.xctest.input import paste_text
+
+        if await asyncio.to_thread(paste_text, text, self.wda_url, self.session_id):
+            await self._hide_keyboard()
+        else:
+            await self.type_text(text, device_id)
+
+    async def clear_text(self, device_id: str | None = None):
+        """Clear the focused field."""
+        status, data = await self.request("GET", "element/active")
+        value = data.get("value") if status == 200 and isinstance(data, dict) else None
+        element_id = (value or {}).get("ELEMENT") or (value or {}).get(_W3C_ELEMENT_KEY)
+        if element_id:
+            await self.request("POST", f"element/{element_id}/clear")
+        else:
+            # Backspaces, as xctest.clear_text falls back to
+            await self.request("POST", "wda/keys", {"value": ["\u0008"] * 100})
+
+    async def _hide_keyboard(self) -> None:
+        """Dismiss the on-screen keyboard, as IOSActionHandler does after typing."""
+        await self.request("POST", "wda/keyboard/dismiss", session=False)
+
+    # Setup
+
+    async def start_frame_source(self, device_id: str | None = None) -> bool:
+        """No scrcpy on iOS."""
+        return False
+
+    async def stop_frame_source(self, device_id: str | None = None):
+        """No scrcpy on iOS."""
+
+    async def list_devices(self):
+        """List connected iOS devices."""
+        from phone_agent.xctest.connection import list_devices
+
+        return await asyncio.to_thread(list_devices)
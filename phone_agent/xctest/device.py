@@ -4,6 +4,7 @@ import subprocess
 import time
 from typing import Optional
 
+from phone_agent.config.app_index import get_app_index
 from phone_agent.config.apps_ios import APP_PACKAGES_IOS as APP_PACKAGES
 
 SCALE_FACTOR = 3 # 3 for most modern iPhone 
@@ -28,6 +29,100 @@ def _get_wda_session_url(wda_url: str, session_id: str | None, endpoint: str) ->
         return f"{base}/{endpoint}"
 
 
+def _pointer_actions(x: int, y: int, steps: list[dict]) -> dict:
+    """W3C Actions payload: move one finger to (x, y) pixels, then run steps."""
+    return {
+        "actions": [
+            {
+                "type": "pointer",
+                "id": "finger1",
+                "parameters": {"pointerType": "touch"},
+                "actions": [
+                    {"type": "pointerMove", "duration": 0, "x": x / SCALE_FACTOR, "y": y / SCALE_FACTOR},
+                    *steps,
+                ],
+            }
+        ]
+    }
+
+
+def _tap_actions(x: int, y: int) -> dict:
+    """W3C Actions payload for a tap."""
+    return _pointer_actions(
+        x,
+        y,
+        [
+            {"type": "pointerDown", "button": 0},
+            {"type": "pause", "duration": 0.1},
+            {"type": "pointerUp", "button": 0},
+        ],
+    )
+
+
+def _double_tap_actions(x: int, y: int) -> dict:
+    """W3C Actions payload for a double tap."""
+    return _pointer_actions(
+        x,
+        y,
+        [
+            {"type": "pointerDown", "button": 0},
+            {"type": "pause", "duration": 100},
+            {"type": "pointerUp", "button": 0},
+            {"type": "pause", "duration": 100},
+            {"type": "pointerDown", "button": 0},
+            {"type": "pause", "duration": 100},
+            {"type": "pointerUp", "button": 0},
+        ],
+    )
+
+
+def _long_press_actions(x: int, y: int, duration: float) -> dict:
+    """W3C Actions payload for a long press of ``duration`` seconds."""
+    return _pointer_actions(
+        x,
+        y,
+        [
+            {"type": "pointerDown", "button": 0},
+            {"type": "pause", "duration": int(duration * 1000)},
+            {"type": "pointerUp", "button": 0},
+        ],
+    )
+
+
+def _swipe_payload(
+    start_x: int, start_y: int, end_x: int, end_y: int, duration: float | None
+) -> dict:
+    """dragfromtoforduration payload; the duration follows the distance if None."""
+    if duration is None:
+        # Calculate duration based on distance
+        dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
+        duration = dist_sq / 1000000  # Convert to seconds
+        duration = max(0.3, min(duration, 2.0))  # Clamp between 0.3-2 seconds
+    return {
+        "fromX": start_x / SCALE_FACTOR,
+        "fromY": start_y / SCALE_FACTOR,
+        "toX": end_x / SCALE_FACTOR,
+        "toY": end_y / SCALE_FACTOR,
+        "duration": duration,
+    }
+
+
+# Swipe from the left edge to simulate the back gesture
+_BACK_PAYLOAD = {"fromX": 0, "fromY": 640, "toX": 400, "toY": 640, "duration": 0.3}
+
+
+def _parse_active_app(data: dict) -> str:
+    """App name from an activeAppInfo response; "System Home" if unknown."""
+    # Response format: {"value": {"bundleId": "com.apple.AppStore", "name": "", "pid": 825, "processArguments": {...}}, "sessionId": "..."}
+    bundle_id = data.get("value", {}).get("bundleId", "")
+    if bundle_id:
+        # Try to find app name from bundle ID
+        app_name = get_app_index(APP_PACKAGES).get_app_name(bundle_id)
+        if app_name is not None:
+            return app_name
+    return "System Home"
+
+
 def get_current_app(
     wda_url: str = "http://localhost:8100", session_id: str | None = None
 ) -> str:
@@ -50,19 +145,7 @@ def get_current_app(
         )
 
         if response.status_code == 200:
-            data = response.json()
-            # Extract bundle ID from response
-            # Response format: {"value": {"bundleId": "com.apple.AppStore", "name": "", "pid": 825, "processArguments": {...}}, "sessionId": "..."}
-            value = data.get("value", {})
-            bundle_id = value.get("bundleId", "")
-
-            if bundle_id:
-                # Try to find app name from bundle ID
-                for app_name, package in APP_PACKAGES.items():
-                    if package == bundle_id:
-                        return app_name
-
-            return "System Home"
+            return _parse_active_app(response.json())
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
@@ -94,24 +177,7 @@ def tap(
 
         url = _get_wda_session_url(wda_url, session_id, "actions")
 
-        # W3C WebDriver Actions API for tap/click
-        actions = {
-            "actions": [
-                {
-                    "type": "pointer",
-                    "id": "finger1",
-                    "parameters": {"pointerType": "touch"},
-                    "actions": [
-                        {"type": "pointerMove", "duration": 0, "x": x / SCALE_FACTOR, "y": y / SCALE_FACTOR},
-                        {"type": "pointerDown", "button": 0},
-                        {"type": "pause", "duration": 0.1},
-                        {"type": "pointerUp", "button": 0},
-                    ],
-                }
-            ]
-        }
-
-        requests.post(url, json=actions, timeout=15, verify=False)
+        requests.post(url, json=_tap_actions(x, y), timeout=15, verify=False)
 
         time.sleep(delay)
 
@@ -143,28 +209,7 @@ def double_tap(
 
         url = _get_wda_session_url(wda_url, session_id, "actions")
 
-        # W3C WebDriver Actions API for double tap
-        actions = {
-            "actions": [
-                {
-                    "type": "pointer",
-                    "id": "finger1",
-                    "parameters": {"pointerType": "touch"},
-                    "actions": [
-                        {"type": "pointerMove", "duration": 0, "x": x / SCALE_FACTOR, "y": y / SCALE_FACTOR},
-                        {"type": "pointerDown", "button": 0},
-                        {"type": "pause", "duration": 100},
-                        {"type": "pointerUp", "button": 0},
-                        {"type": "pause", "duration": 100},
-                        {"type": "pointerDown", "button": 0},
-                        {"type": "pause", "duration": 100},
-                        {"type": "pointerUp", "button": 0},
-                    ],
-                }
-            ]
-        }
-
-        requests.post(url, json=actions, timeout=10, verify=False)
+        requests.post(url, json=_double_tap_actions(x, y), timeout=10, verify=False)
 
         time.sleep(delay)
 
@@ -198,27 +243,12 @@ def long_press(
 
         url = _get_wda_session_url(wda_url, session_id, "actions")
 
-        # W3C WebDriver Actions API for long press
-        # Convert duration to milliseconds
-        duration_ms = int(duration * 1000)
-
-        actions = {
-            "actions": [
-                {
-                    "type": "pointer",
-                    "id": "finger1",
-                    "parameters": {"pointerType": "touch"},
-                    "actions": [
-                        {"type": "pointerMove", "duration": 0, "x": x / SCALE_FACTOR, "y": y / SCALE_FACTOR},
-                        {"type": "pointerDown", "button": 0},
-                        {"type": "pause", "duration": duration_ms},
-                        {"type": "pointerUp", "button": 0},
-                    ],
-                }
-            ]
-        }
-
-        requests.post(url, json=actions, timeout=int(duration + 10), verify=False)
+        requests.post(
+            url,
+            json=_long_press_actions(x, y, duration),
+            timeout=int(duration + 10),
+            verify=False,
+        )
 
         time.sleep(delay)
 
@@ -254,24 +284,12 @@ def swipe(
     try:
         import requests
 
-        if duration is None:
-            # Calculate duration based on distance
-            dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
-            duration = dist_sq / 1000000  # Convert to seconds
-            duration = max(0.3, min(duration, 2.0))  # Clamp between 0.3-2 seconds
-
         url = _get_wda_session_url(wda_url, session_id, "wda/dragfromtoforduration")
+        payload = _swipe_payload(start_x, start_y, end_x, end_y, duration)
 
-        # WDA dragfromtoforduration API payload
-        payload = {
-            "fromX": start_x / SCALE_FACTOR,
-            "fromY": start_y / SCALE_FACTOR,
-            "toX": end_x / SCALE_FACTOR,
-            "toY": end_y / SCALE_FACTOR,
-            "duration": duration,
-        }
-
-        requests.post(url, json=payload, timeout=int(duration + 10), verify=False)
+        requests.post(
+            url, json=payload, timeout=int(payload["duration"] + 10), verify=False
+        )
 
         time.sleep(delay)
 
@@ -303,16 +321,7 @@ def back(
 
         url = _get_wda_session_url(wda_url, session_id, "wda/dragfromtoforduration")
 
-        # Swipe from left edge to simulate back gesture
-        payload = {
-            "fromX": 0,
-            "fromY": 640,
-            "toX": 400,
-            "toY": 640,
-            "duration": 0.3,
-        }
-
-        requests.post(url, json=payload, timeout=10, verify=False)
+        requests.post(url, json=_BACK_PAYLOAD, timeout=10, verify=False)
 
         time.sleep(delay)
 
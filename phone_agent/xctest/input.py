@@ -1,5 +1,6 @@
 """Input utilities for iOS device text input via WebDriverAgent."""
 
+import base64
 import time
 
 
@@ -61,6 +62,108 @@ def type_text(
         print(f"Error typing text: {e}")
 
 
+def paste_text(
+    text: str,
+    wda_url: str = "http://localhost:8100",
+    session_id: str | None = None,
+) -> bool:
+    """
+    Enter a long text through the pasteboard instead of typing it key by key.
+
+    Puts the text on the pasteboard, long-presses the focused field and taps
+    the Paste menu item.
+
+    Args:
+        text: The text to enter.
+        wda_url: WebDriverAgent URL.
+        session_id: Optional WDA session ID.
+
+    Returns:
+        True if the text was pasted, False if the caller should type it.
+    """
+    try:
+        import requests
+
+        if not set_pasteboard(text, wda_url):
+            return False
+
+        # Locate the focused field
+        response = requests.get(
+            _get_wda_session_url(wda_url, session_id, "element/active"),
+            timeout=10,
+            verify=False,
+        )
+        if response.status_code != 200:
+            return False
+        value = response.json().get("value") or {}
+        element_id = value.get("ELEMENT") or value.get("element-6066-11e4-a52e-4f735466cecf")
+        if not element_id:
+            return False
+
+        response = requests.get(
+            _get_wda_session_url(wda_url, session_id, f"element/{element_id}/rect"),
+            timeout=10,
+            verify=False,
+        )
+        rect = response.json().get("value") or {}
+        if response.status_code != 200 or "width" not in rect:
+            return False
+
+        # Long-press the field (rect is in points) to open the edit menu
+        x = rect["x"] + rect["width"] / 2
+        y = rect["y"] + rect["height"] / 2
+        requests.post(
+            _get_wda_session_url(wda_url, session_id, "actions"),
+            json={
+                "actions": [
+                    {
+                        "type": "pointer",
+                        "id": "finger1",
+                        "parameters": {"pointerType": "touch"},
+                        "actions": [
+                            {"type": "pointerMove", "duration": 0, "x": x, "y": y},
+                            {"type": "pointerDown", "button": 0},
+                            {"type": "pause", "duration": 800},
+                            {"type": "pointerUp", "button": 0},
+                        ],
+                    }
+                ]
+            },
+            timeout=10,
+            verify=False,
+        )
+        time.sleep(0.5)
+
+        response = requests.post(
+            _get_wda_session_url(wda_url, session_id, "elements"),
+            json={"using": "predicate string", "value": "label IN {'Paste', '粘贴'}"},
+            timeout=10,
+            verify=False,
+        )
+        if response.status_code != 200:
+            return False
+        for element in response.json().get("value") or []:
+            paste_id = element.get("ELEMENT") or element.get(
+                "element-6066-11e4-a52e-4f735466cecf"
+            )
+            if paste_id:
+                response = requests.post(
+                    _get_wda_session_url(wda_url, session_id, f"element/{paste_id}/click"),
+                    timeout=10,
+                    verify=False,
+                )
+                return response.status_code == 200
+
+        return False
+
+    except ImportError:
+        print("Error: requests library required. Install: pip install requests")
+    except Exception as e:
+        print(f"Error pasting text: {e}")
+
+    return False
+
+
 def clear_text(
     wda_url: str = "http://localhost:8100",
     session_id: str | None = None,
@@ -241,7 +344,7 @@ def is_keyboard_shown(
 def set_pasteboard(
     text: str,
     wda_url: str = "http://localhost:8100",
-) -> None:
+) -> bool:
     """
     Set the device pasteboard (clipboard) content.
 
@@ -249,6 +352,9 @@ def set_pasteboard(
         text: Text to set in pasteboard.
         wda_url: WebDriverAgent URL.
 
+    Returns:
+        True if the pasteboard was set.
+
     Note:
         This can be useful for inputting large amounts of text.
         After setting pasteboard, you can simulate paste gesture.
@@ -258,15 +364,20 @@ def set_pasteboard(
 
         url = f"{wda_url.rstrip('/')}/wda/setPasteboard"
 
-        requests.post(
-            url, json={"content": text, "contentType": "plaintext"}, timeout=10, verify=False
+        # WDA expects the content base64-encoded
+        content = base64.b64encode(text.encode("utf-8")).decode("ascii")
+        response = requests.post(
+            url, json={"content": content, "contentType": "plaintext"}, timeout=10, verify=False
         )
+        return response.status_code == 200
 
     except ImportError:
         print("Error: requests library required. Install: pip install requests")
     except Exception as e:
         print(f"Error setting pasteboard: {e}")
 
+    return False
+
 
 def get_pasteboard(
     wda_url: str = "http://localhost:8100",
@@ -10,6 +10,8 @@ from io import BytesIO
 
 from PIL import Image
 
+from phone_agent.imaging import encode_image_bytes
+
 
 @dataclass
 class Screenshot:
@@ -19,6 +21,7 @@ class Screenshot:
     width: int
     height: int
     is_sensitive: bool = False
+    mime_type: str = "image/png"
 
 
 def get_screenshot(
@@ -79,21 +82,7 @@ def _get_screenshot_wda(
         response = requests.get(url, timeout=timeout, verify=False)
 
         if response.status_code == 200:
-            data = response.json()
-            base64_data = data.get("value", "")
-
-            if base64_data:
-                # Decode to get dimensions
-                img_data = base64.b64decode(base64_data)
-                img = Image.open(BytesIO(img_data))
-                width, height = img.size
-
-                return Screenshot(
-                    base64_data=base64_data,
-                    width=width,
-                    height=height,
-                    is_sensitive=False,
-                )
+            return _parse_wda_screenshot(response.json())
 
     except ImportError:
         print("Note: requests library not installed. Install: pip install requests")
@@ -103,6 +92,25 @@ def _get_screenshot_wda(
     return None
 
 
+def _parse_wda_screenshot(data: dict) -> Screenshot | None:
+    """Screenshot from a WDA /screenshot response; None if it has no image."""
+    base64_data = data.get("value", "")
+    if not base64_data:
+        return None
+
+    # Decode to get dimensions
+    img_data = base64.b64decode(base64_data)
+    width, height = Image.open(BytesIO(img_data)).size
+    base64_data, mime_type = encode_image_bytes(img_data, width, height)
+    return Screenshot(
+        base64_data=base64_data,
+        width=width,
+        height=height,
+        is_sensitive=False,
+        mime_type=mime_type,
+    )
+
+
 def _get_screenshot_idevice(
     device_id: str | None, timeout: int
 ) -> Screenshot | None:
@@ -132,18 +140,20 @@ def _get_screenshot_idevice(
 
         if result.returncode == 0 and os.path.exists(temp_path):
             # Read and encode image
-            img = Image.open(temp_path)
-            width, height = img.size
-
-            buffered = BytesIO()
-            img.save(buffered, format="PNG")
-            base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+            with open(temp_path, "rb") as f:
+                data = f.read()
+            width, height = Image.open(BytesIO(data)).size
+            base64_data, mime_type = encode_image_bytes(data, width, height)
 
             # Cleanup
             os.remove(temp_path)
 
             return Screenshot(
-                base64_data=base64_data, width=width, height=height, is_sensitive=False
+                base64_data=base64_data,
+                width=width,
+                height=height,
+                is_sensitive=False,
+                mime_type=mime_type,
             )
 
     except FileNotFoundError:
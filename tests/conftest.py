@@ -0,0 +1,99 @@
+"""Shared fixtures: in-process fake servers for the model API."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+REPLY_CHUNKS = ["Tap the icon. ", 'do(action="Tap", ', "element=[500,500])"]
+
+
+class MockOpenAIServer:
+    """
+    Minimal OpenAI-compatible chat completions server.
+
+    Attributes:
+        delay: Seconds to wait before streaming the reply.
+        status: HTTP status to answer with; anything but 200 is an error.
+        requests: Number of chat completion requests received.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.status = 200
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                with server._lock:
+                    server.requests += 1
+                status = server.status
+                if status != 200:
+                    body = json.dumps({"error": {"message": "unavailable"}}).encode()
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+
+                time.sleep(server.delay)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for text in REPLY_CHUNKS:
+                    chunk = {
+                        "id": "chatcmpl-test",
+                        "object": "chat.completion.chunk",
+                        "created": 0,
+                        "model": "test",
+                        "choices": [
+                            {"index": 0, "delta": {"content": text}, "finish_reason": None}
+                        ],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+@pytest.fixture
+def mock_openai():
+    """Factory fixture that starts mock model servers and stops them after the test."""
+    servers: list[MockOpenAIServer] = []
+
+    def start(delay: float = 0.0) -> MockOpenAIServer:
+        server = MockOpenAIServer(delay)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
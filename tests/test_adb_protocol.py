@@ -0,0 +1,222 @@
+"""ADBClient against a fake ADB server that runs commands in a local shell."""
+
+import socket
+import struct
+import subprocess
+import threading
+
+import pytest
+
+from phone_agent.adb.protocol import ADBClient, ADBProtocolError
+
+SERIAL = "emulator-5554"
+
+
+class FakeADBServer:
+    """
+    Speaks the ADB host protocol for one fake device.
+
+    Shell and exec commands run in ``/bin/sh`` on the host; sync transfers
+    use an in-memory file system.
+
+    Attributes:
+        shell_v2: Whether the "device" supports the shell v2 protocol.
+        files: Remote path -> contents for sync push and pull.
+    """
+
+    def __init__(self, shell_v2: bool = True):
+        self.shell_v2 = shell_v2
+        self.files: dict[str, bytes] = {}
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self._listener.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def close(self) -> None:
+        self._listener.close()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn: socket.socket) -> None:
+        with conn:
+            try:
+                while True:
+                    request = _read(conn, int(_read(conn, 4), 16)).decode()
+                    if not self._dispatch(conn, request):
+                        return
+            except EOFError:
+                return
+
+    def _dispatch(self, conn: socket.socket, request: str) -> bool:
+        """Answer one request; return True if more requests may follow."""
+        if request == "host:version":
+            _okay(conn, b"0029")
+            return False
+        if request == "host:devices-l":
+            _okay(conn, f"{SERIAL}          device product:sdk model:Pixel\n".encode())
+            return False
+        if request in (f"host:transport:{SERIAL}", "host:transport-any"):
+            conn.sendall(b"OKAY")
+            return True
+        if request.startswith("host:transport:"):
+            _fail(conn, "device not found")
+            return False
+
+        service, _, command = request.partition(":")
+        if service == "shell,v2,raw":
+            if not self.shell_v2:
+                _fail(conn, "closed")
+                return False
+            result = _run(command)
+            conn.sendall(b"OKAY")
+            for packet_id, data in ((1, result.stdout), (2, result.stderr)):
+                if data:
+                    conn.sendall(struct.pack("<BI", packet_id, len(data)) + data)
+            conn.sendall(struct.pack("<BI", 3, 1) + bytes([result.returncode]))
+        elif service == "shell":
+            result = _run(command)
+            conn.sendall(b"OKAY" + result.stdout + result.stderr)
+        elif service == "exec":
+            conn.sendall(b"OKAY" + _run(command).stdout)
+        elif service == "sync":
+            conn.sendall(b"OKAY")
+            self._sync(conn)
+        else:
+            _fail(conn, f"unknown service {service}")
+        return False
+
+    def _sync(self, conn: socket.socket) -> None:
+        while True:
+            packet_id, length = struct.unpack("<4sI", _read(conn, 8))
+            if packet_id == b"QUIT":
+                return
+            if packet_id == b"SEND":
+                path = _read(conn, length).decode().rsplit(",", 1)[0]
+                data = bytearray()
+                while True:
+                    chunk_id, size = struct.unpack("<4sI", _read(conn, 8))
+                    if chunk_id == b"DONE":
+                        break
+                    data += _read(conn, size)
+                self.files[path] = bytes(data)
+                conn.sendall(b"OKAY" + struct.pack("<I", 0))
+            elif packet_id == b"RECV":
+                path = _read(conn, length).decode()
+                if path not in self.files:
+                    message = b"No such file or directory"
+                    conn.sendall(b"FAIL" + struct.pack("<I", len(message)) + message)
+                    continue
+                data = self.files[path]
+                for offset in range(0, len(data), 1000):
+                    chunk = data[offset:offset + 1000]
+                    conn.sendall(b"DATA" + struct.pack("<I", len(chunk)) + chunk)
+                conn.sendall(b"DONE" + struct.pack("<I", 0))
+
+
+def _read(conn: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return bytes(data)
+
+
+def _okay(conn: socket.socket, payload: bytes) -> None:
+    conn.sendall(b"OKAY" + f"{len(payload):04x}".encode() + payload)
+
+
+def _fail(conn: socket.socket, message: str) -> None:
+    conn.sendall(b"FAIL" + f"{len(message):04x}".encode() + message.encode())
+
+
+def _run(command: str) -> subprocess.CompletedProcess:
+    return subprocess.run(["/bin/sh", "-c", command], capture_output=True, timeout=10)
+
+
+@pytest.fixture
+def adb_server():
+    servers = []
+
+    def start(shell_v2: bool = True) -> tuple[FakeADBServer, ADBClient]:
+        server = FakeADBServer(shell_v2)
+        servers.append(server)
+        return server, ADBClient(port=server.port, timeout=5)
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def test_host_requests(adb_server):
+    _, client = adb_server()
+
+    assert client.is_available()
+    assert client.server_version() == 0x29
+    devices = client.list_devices()
+    assert [(d.serial, d.state) for d in devices] == [(SERIAL, "device")]
+    assert devices[0].properties["model"] == "Pixel"
+
+
+def test_shell_v2_separates_streams_and_exit_code(adb_server):
+    _, client = adb_server()
+
+    result = client.shell(SERIAL, "echo out; echo err >&2; exit 3")
+
+    assert result.returncode == 3
+    assert result.stdout == b"out\n"
+    assert result.stderr == b"err\n"
+    assert client.shell(SERIAL, "true").returncode == 0
+
+
+@pytest.mark.parametrize(
+    "command, returncode, stdout",
+    [
+        ("echo hello", 0, b"hello\n"),
+        ("printf partial; exit 2", 2, b"partial"),
+        ("false", 1, b""),
+    ],
+)
+def test_legacy_shell_reports_exit_code(adb_server, command, returncode, stdout):
+    _, client = adb_server(shell_v2=False)
+
+    result = client.shell(SERIAL, command)
+
+    assert result.returncode == returncode
+    assert result.stdout == stdout
+
+
+def test_exec_out_returns_binary_stdout(adb_server):
+    _, client = adb_server()
+
+    assert client.exec_out(SERIAL, r"printf '\001\002\377'") == b"\x01\x02\xff"
+
+
+def test_unknown_device_raises(adb_server):
+    _, client = adb_server()
+
+    with pytest.raises(ADBProtocolError, match="device not found"):
+        client.shell("missing", "true")
+
+
+def test_sync_push_and_pull(adb_server):
+    server, client = adb_server()
+    data = bytes(range(256)) * 600  # Spans several DATA packets
+
+    client.push(SERIAL, data, "/data/local/tmp/blob")
+
+    assert server.files["/data/local/tmp/blob"] == data
+    assert client.pull(SERIAL, "/data/local/tmp/blob") == data
+
+
+def test_pull_missing_file_raises(adb_server):
+    _, client = adb_server()
+
+    with pytest.raises(ADBProtocolError, match="No such file"):
+        client.pull(SERIAL, "/missing")
@@ -0,0 +1,90 @@
+"""PhoneAgent against the mock model server and a fake device."""
+
+import base64
+import threading
+from io import BytesIO
+
+from PIL import Image
+
+from phone_agent.adb.screenshot import Screenshot
+from phone_agent.agent import AgentConfig, PhoneAgent
+from phone_agent.device_factory import DeviceType
+from phone_agent.model import ModelConfig
+
+
+class FakeDevice:
+    """Synchronous device factory answering with a blank screen."""
+
+    device_type = DeviceType.ADB
+
+    def __init__(self):
+        self.taps: list[tuple[int, int]] = []
+        buffer = BytesIO()
+        Image.new("RGB", (108, 240), "white").save(buffer, format="PNG")
+        self._png = base64.b64encode(buffer.getvalue()).decode()
+
+    def get_screenshot(self, device_id=None, timeout=10):
+        return Screenshot(base64_data=self._png, width=1080, height=2400)
+
+    def get_current_app(self, device_id=None):
+        return "System Home"
+
+    def tap(self, x, y, device_id=None, delay=None):
+        self.taps.append((x, y))
+
+    def start_frame_source(self, device_id=None):
+        return False
+
+    def stop_frame_source(self, device_id=None):
+        pass
+
+
+def observe_threads() -> list[threading.Thread]:
+    return [t for t in threading.enumerate() if t.name.startswith("observe")]
+
+
+def test_observe_thread_is_released_after_each_run(mock_openai):
+    model = mock_openai()
+    device = FakeDevice()
+
+    for _ in range(3):
+        agent = PhoneAgent(
+            ModelConfig(base_url=model.base_url),
+            AgentConfig(max_steps=2, verbose=False),
+            device_factory=device,
+        )
+        assert agent.run("Open Settings") == "Max steps reached"
+        assert agent._observe_executor is None
+
+    assert len(device.taps) == 6
+    for thread in observe_threads():
+        thread.join(timeout=5)
+    assert not observe_threads()
+
+
+def test_model_connection_is_prewarmed_when_replay_hands_over(mock_openai, monkeypatch):
+    model = mock_openai()
+    agent = PhoneAgent(
+        ModelConfig(base_url=model.base_url),
+        AgentConfig(max_steps=2, verbose=False, replay=True),
+        device_factory=FakeDevice(),
+    )
+    prewarms = []
+    monkeypatch.setattr(
+        agent.model_client, "prewarm", lambda: prewarms.append(len(agent._context))
+    )
+
+    def replay_one_step(task):
+        # One replayed step, then the screen no longer matches the recording
+        agent._step_count += 1
+        screenshot = agent.device_factory.get_screenshot()
+        agent._append_screen_message(task, "System Home", screenshot, True)
+        agent._context.add_response("Replayed.", 'do(action="Back")')
+        return None
+
+    monkeypatch.setattr(agent, "_replay", replay_one_step)
+    agent.run("Open Settings")
+
+    # Before the first model request of the handed-over task
+    assert prewarms and prewarms[0] > 0
+    assert model.requests == 1
@@ -0,0 +1,119 @@
+"""AsyncDeviceFactory sends the same device commands as the synchronous backends."""
+
+import asyncio
+import subprocess
+
+import pytest
+
+from phone_agent.adb import device as adb_device
+from phone_agent.adb import input as adb_input
+from phone_agent.device_factory import DeviceType
+from phone_agent.device_factory_async import AsyncDeviceFactory
+from phone_agent.hdc import device as hdc_device
+
+# (method, args) pairs exercising every command builder
+ACTIONS = [
+    ("tap", (100, 200)),
+    ("double_tap", (100, 200)),
+    ("long_press", (100, 200, 1500)),
+    ("swipe", (100, 200, 300, 1400)),
+    ("swipe", (10, 20, 30, 40, 700)),
+    ("back", ()),
+    ("home", ()),
+]
+
+
+def record_async(factory: AsyncDeviceFactory, monkeypatch, stdout: str = "") -> list:
+    """Record the shell commands of an async factory instead of running them."""
+    commands = []
+
+    async def shell(args, device_id=None, timeout=10):
+        commands.append(list(args))
+        return subprocess.CompletedProcess(args, 0, stdout, "")
+
+    async def wait_for_screen(*args, **kwargs):
+        return 0.0
+
+    monkeypatch.setattr(factory, "shell", shell)
+    monkeypatch.setattr(factory, "wait_for_screen", wait_for_screen)
+    monkeypatch.setattr(asyncio, "sleep", _no_sleep)
+    return commands
+
+
+async def _no_sleep(*args, **kwargs):
+    return None
+
+
+@pytest.mark.parametrize("method, args", ACTIONS)
+def test_adb_actions_match_sync(method, args, monkeypatch):
+    sync_commands = []
+    monkeypatch.setattr(
+        adb_device,
+        "run_shell",
+        lambda command, device_id=None, timeout=None: sync_commands.append(list(command)),
+    )
+    monkeypatch.setattr(adb_device, "wait_for_screen", lambda *a, **k: 0.0)
+    monkeypatch.setattr(adb_device.time, "sleep", lambda _: None)
+    getattr(adb_device, method)(*args)
+
+    factory = AsyncDeviceFactory(DeviceType.ADB)
+    async_commands = record_async(factory, monkeypatch)
+    asyncio.run(getattr(factory, method)(*args))
+
+    assert async_commands == sync_commands
+
+
+@pytest.mark.parametrize("method, args", ACTIONS)
+def test_hdc_actions_match_sync(method, args, monkeypatch):
+    sync_commands = []
+
+    def run_hdc_command(cmd, **kwargs):
+        # Drop the "hdc shell" prefix to compare the device commands
+        sync_commands.append(cmd[cmd.index("shell") + 1:])
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    monkeypatch.setattr(hdc_device, "_run_hdc_command", run_hdc_command)
+    monkeypatch.setattr(hdc_device, "wait_for_screen", lambda *a, **k: 0.0)
+    getattr(hdc_device, method)(*args)
+
+    factory = AsyncDeviceFactory(DeviceType.HDC)
+    async_commands = record_async(factory, monkeypatch)
+    asyncio.run(getattr(factory, method)(*args))
+
+    assert async_commands == sync_commands
+
+
+def test_adb_type_text_chunks_like_sync(monkeypatch):
+    text = "你好, world " * 400
+    sync_commands = []
+    monkeypatch.setattr(
+        adb_input,
+        "run_shell",
+        lambda command, device_id=None, timeout=None: sync_commands.append(list(command)),
+    )
+    adb_input.type_text(text)
+
+    factory = AsyncDeviceFactory(DeviceType.ADB)
+    async_commands = record_async(factory, monkeypatch)
+    asyncio.run(factory.type_text(text))
+
+    assert len(sync_commands) > 1
+    assert async_commands == sync_commands
+
+
+def test_adb_current_app_parsed_like_sync(monkeypatch):
+    output = "  mCurrentFocus=Window{1 u0 com.tencent.mm/.ui.LauncherUI}\n"
+    monkeypatch.setattr(
+        adb_device,
+        "run_shell",
+        lambda command, device_id=None, timeout=None: subprocess.CompletedProcess(
+            command, 0, output, ""
+        ),
+    )
+    expected = adb_device.get_current_app()
+
+    factory = AsyncDeviceFactory(DeviceType.ADB)
+    commands = record_async(factory, monkeypatch, stdout=output)
+
+    assert asyncio.run(factory.get_current_app()) == expected
+    assert commands == [adb_device.CURRENT_APP_COMMANDS[0]]
@@ -0,0 +1,66 @@
+"""ResponseCache lookups, persistence and key separation."""
+
+from phone_agent.model.cache import CacheKey, ResponseCache, ResponseCacheConfig
+
+
+def key(screen_hash: int, model: str = "autoglm-phone-9b", lang: str = "cn", task: str = "Open Settings"):
+    return CacheKey(model=model, lang=lang, task=task, history="0:start", screen_hash=screen_hash)
+
+
+def put(cache: ResponseCache, cache_key: CacheKey, action: str) -> None:
+    cache.put(cache_key, "thinking", action, f"thinking {action}")
+
+
+def test_similar_screen_hits(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.jsonl"))
+    put(cache, key(0b1011), 'do(action="Tap", element=[1,1])')
+
+    assert cache.get(key(0b1010)).action == 'do(action="Tap", element=[1,1])'
+    assert cache.get(key(2**200 - 1)) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_model_and_language_are_part_of_the_key(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.jsonl"))
+    put(cache, key(7), "finish()")
+
+    assert cache.get(key(7, model="other-model")) is None
+    assert cache.get(key(7, lang="en")) is None
+    assert cache.get(key(7)) is not None
+
+
+def test_entries_survive_reload_and_log_is_compacted(tmp_path):
+    path = tmp_path / "responses.jsonl"
+    config = ResponseCacheConfig(max_entries=2)
+    cache = ResponseCache(str(path), config)
+    for i in range(3):
+        put(cache, key(i << 100, task=f"task {i}"), f"action {i}")
+    put(cache, key(2 << 100, task="task 2"), "action 2 again")
+    cache.flush()
+    assert len(path.read_text().splitlines()) == 4
+
+    reloaded = ResponseCache(str(path), config)
+
+    assert reloaded.get(key(0, task="task 0")) is None  # Evicted
+    assert reloaded.get(key(1 << 100, task="task 1")).action == "action 1"
+    assert reloaded.get(key(2 << 100, task="task 2")).action == "action 2 again"
+    assert len(path.read_text().splitlines()) == 2
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.jsonl"), ResponseCacheConfig(ttl=-1))
+    put(cache, key(1), "finish()")
+
+    assert cache.get(key(1)) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_truncated_line_is_skipped(tmp_path):
+    path = tmp_path / "responses.jsonl"
+    cache = ResponseCache(str(path))
+    put(cache, key(3), "finish()")
+    cache.flush()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"id": "cut sh')
+
+    assert ResponseCache(str(path)).get(key(3)).action == "finish()"
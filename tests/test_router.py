@@ -0,0 +1,110 @@
+"""Endpoint routing against several mock OpenAI-compatible servers."""
+
+import time
+
+import openai
+import pytest
+
+from phone_agent.model import ModelClient, ModelConfig
+from phone_agent.model.router import Endpoint, ModelRouter, RouterConfig
+
+MESSAGES = [{"role": "user", "content": "Open Settings"}]
+
+
+def make_client(*servers) -> ModelClient:
+    endpoints = [Endpoint(base_url=server.base_url) for server in servers]
+    return ModelClient(ModelConfig(base_url=endpoints[0].base_url, endpoints=endpoints))
+
+
+def state_for(client: ModelClient, server):
+    return next(s for s in client.router.states if s.endpoint.base_url == server.base_url)
+
+
+def test_ewma_tracks_latency():
+    router = ModelRouter([Endpoint("http://a/v1")], RouterConfig(ewma_alpha=0.5))
+    state = router.states[0]
+
+    for total in (1.0, 3.0):
+        router.release(router.acquire(), ttft=total / 2, total=total)
+
+    assert state.ewma_total == pytest.approx(2.0)
+    assert state.ewma_ttft == pytest.approx(1.0)
+    assert state.in_flight == 0
+
+
+def test_routes_to_faster_endpoint(mock_openai):
+    fast = mock_openai(delay=0.01)
+    slow = mock_openai(delay=0.3)
+    client = make_client(slow, fast)
+
+    # Both endpoints get a first request to measure them
+    for _ in range(2):
+        client.request(MESSAGES)
+    fast_before, slow_before = fast.requests, slow.requests
+    for _ in range(5):
+        response = client.request(MESSAGES)
+        assert response.endpoint == fast.base_url
+
+    assert fast.requests == fast_before + 5
+    assert slow.requests == slow_before
+    assert state_for(client, fast).ewma_total < state_for(client, slow).ewma_total
+
+
+def test_failed_endpoint_is_ejected(mock_openai):
+    broken = mock_openai()
+    healthy = mock_openai()
+    broken.status = 503
+    client = make_client(broken, healthy)
+
+    for _ in range(3):
+        response = client.request(MESSAGES)
+        assert response.endpoint == healthy.base_url
+
+    # Only the first request reached the broken endpoint
+    assert broken.requests == 1
+    state = state_for(client, broken)
+    assert state.failures == 1
+    assert state.ejected_until > time.time()
+
+
+def test_ejected_endpoint_recovers(mock_openai):
+    flaky = mock_openai()
+    other = mock_openai(delay=0.1)
+    flaky.status = 503
+    client = make_client(flaky, other)
+    client.router.config.base_backoff = 0.5
+
+    client.request(MESSAGES)
+    assert state_for(client, flaky).ejected_until > time.time()
+
+    # Unmeasured and healthy again, so it is preferred over the slower one
+    flaky.status = 200
+    time.sleep(0.6)
+    response = client.request(MESSAGES)
+
+    assert response.endpoint == flaky.base_url
+    state = state_for(client, flaky)
+    assert state.consecutive_failures == 0
+    assert state.ejected_until == 0.0
+
+
+def test_all_endpoints_failing_raises(mock_openai):
+    first = mock_openai()
+    second = mock_openai()
+    first.status = second.status = 503
+    client = make_client(first, second)
+
+    with pytest.raises(openai.APIStatusError):
+        client.request(MESSAGES)
+    assert first.requests == second.requests == 1
+
+
+def test_single_endpoint_is_never_ejected():
+    router = ModelRouter([Endpoint("http://only/v1")])
+    state = router.acquire()
+
+    router.release(state, error=RuntimeError("connection reset"))
+
+    assert state.failures == 1
+    assert state.ejected_until == 0.0
+    assert router.acquire() is state
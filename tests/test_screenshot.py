@@ -0,0 +1,86 @@
+"""Preview frames sampled on the device match frames cut from full captures."""
+
+import struct
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from phone_agent.adb import screenshot
+from phone_agent.adb.screenshot import (
+    preview_command,
+    preview_from_raw,
+    preview_from_samples,
+)
+
+WIDTH, HEIGHT = 96, 200
+
+
+def raw_frame(seed: int) -> bytes:
+    """A RGBA raw screencap: 16-byte header (width, height, format, colorspace)."""
+    pixels = np.random.default_rng(seed).integers(0, 256, (HEIGHT, WIDTH, 4), np.uint8)
+    return struct.pack("<4I", WIDTH, HEIGHT, 1, 0) + pixels.tobytes()
+
+
+@pytest.fixture(autouse=True)
+def clear_geometry():
+    screenshot._PREVIEW_GEOMETRY.clear()
+    yield
+    screenshot._PREVIEW_GEOMETRY.clear()
+
+
+def run_on_fake_device(command: str, frame: bytes, tmp_path) -> bytes:
+    """
+    Run a device command locally, with a screencap that streams ``frame``.
+
+    The frame is written in small flushed pieces, so ``dd`` sees short reads
+    as it does from a real screencap pipe.
+    """
+    (tmp_path / "frame.raw").write_bytes(frame)
+    screencap = tmp_path / "screencap"
+    screencap.write_text(
+        f"#!{sys.executable}\n"
+        "import sys, time\n"
+        f"data = open({str(tmp_path / 'frame.raw')!r}, 'rb').read()\n"
+        "for i in range(0, len(data), 1000):\n"
+        "    sys.stdout.buffer.write(data[i:i + 1000])\n"
+        "    sys.stdout.buffer.flush()\n"
+        "    if i % 20000 == 0:\n"
+        "        time.sleep(0.001)\n"
+    )
+    screencap.chmod(0o755)
+    result = subprocess.run(
+        ["/bin/sh", "-c", command],
+        capture_output=True,
+        cwd=tmp_path,
+        env={"PATH": f"{tmp_path}:/usr/bin:/bin"},
+    )
+    return result.stdout
+
+
+def test_no_command_before_geometry_is_known():
+    assert preview_command("emulator-5554") is None
+
+
+def test_sampled_rows_match_full_capture(tmp_path):
+    first = preview_from_raw("emulator-5554", raw_frame(0), step=8)
+    command = preview_command("emulator-5554")
+
+    frame = raw_frame(1)
+    sampled = preview_from_samples(
+        "emulator-5554", run_on_fake_device(command, frame, tmp_path), step=8
+    )
+
+    assert sampled.shape == first.shape == (screenshot.PREVIEW_ROWS, WIDTH * 4 // 8)
+    np.testing.assert_array_equal(sampled, preview_from_raw("emulator-5554", frame, 8))
+    # Sampling never writes to device storage
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["frame.raw", "screencap"]
+    assert ">" not in command.replace("2>/dev/null", "")
+
+
+def test_malformed_samples_disable_sampling():
+    preview_from_raw(None, raw_frame(0), step=8)
+
+    assert preview_from_samples(None, b"screencap: not found\n", step=8) is None
+    assert preview_command(None) is None
@@ -0,0 +1,43 @@
+"""ADBShellSession against a fake adb binary that runs a local shell."""
+
+import pytest
+
+from phone_agent.adb.shell import ADBShellSession, ShellInterruptedError
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    adb = tmp_path / "adb"
+    adb.write_text('#!/bin/sh\n# "adb shell sh" -> sh\nshift\nexec "$@"\n')
+    adb.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}:/usr/bin:/bin")
+    session = ADBShellSession()
+    yield session
+    session.close()
+
+
+def test_commands_share_one_shell(session):
+    first = session.run("echo $$")
+    second = session.run("echo $$; exit_code() { return 4; }; exit_code")
+
+    assert first.returncode == 0
+    assert second.returncode == 4
+    assert first.stdout.split()[0] == second.stdout.split()[0]
+
+
+def test_dead_shell_is_restarted_before_sending(session):
+    session.run("true")
+    session._process.kill()
+    session._process.wait()
+
+    assert session.run("echo again").stdout == "again\n"
+
+
+def test_shell_exiting_mid_command_is_not_retried(session, tmp_path):
+    log = tmp_path / "runs"
+
+    with pytest.raises(ShellInterruptedError):
+        session.run(f"echo tap >> {log}; exit")
+
+    assert log.read_text() == "tap\n"
+    assert not session.is_alive
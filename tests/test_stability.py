@@ -0,0 +1,53 @@
+"""Sync and async stable-screen waits stop as soon as frames settle."""
+
+import asyncio
+
+import numpy as np
+
+from phone_agent.stability import wait_for_stable_screen, wait_for_stable_screen_async
+
+
+def frames(changing: int):
+    """Frames that change ``changing`` times, then stay the same."""
+    count = 0
+
+    def grab():
+        nonlocal count
+        count += 1
+        return np.full((8, 8), min(count, changing) * 50, np.uint8)
+
+    return grab
+
+
+def test_static_screen_returns_after_stable_duration():
+    waited = wait_for_stable_screen(frames(1), max_wait=2.0, stable_duration=0.1)
+    assert 0.1 <= waited < 0.5
+
+
+def test_changing_screen_waits_until_max_wait():
+    waited = wait_for_stable_screen(frames(1000), max_wait=0.3, stable_duration=0.1)
+    assert 0.3 <= waited < 0.6
+
+
+def test_min_wait_is_respected():
+    waited = wait_for_stable_screen(frames(1), max_wait=2.0, min_wait=0.4, stable_duration=0.05)
+    assert waited >= 0.4
+
+
+def test_capture_failure_sleeps_max_wait():
+    def broken():
+        raise RuntimeError("no frame")
+
+    assert wait_for_stable_screen(broken, max_wait=0.2) >= 0.2
+
+
+def test_async_matches_sync():
+    grab = frames(3)
+
+    async def grab_async():
+        return grab()
+
+    waited = asyncio.run(
+        wait_for_stable_screen_async(grab_async, max_wait=2.0, stable_duration=0.1)
+    )
+    assert 0.1 <= waited < 0.6
@@ -0,0 +1,154 @@
+"""AsyncWDAClient and AsyncPhoneAgent against a fake WebDriverAgent server."""
+
+import asyncio
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from phone_agent.agent import AgentConfig
+from phone_agent.agent_async import AsyncPhoneAgent
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.model import ModelConfig
+from phone_agent.xctest.client_async import AsyncWDAClient
+
+
+def png_base64(width: int = 90, height: int = 160) -> str:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "white").save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+class FakeWDAServer:
+    """
+    Answers the WDA endpoints used by AsyncWDAClient.
+
+    Attributes:
+        requests: (method, path, JSON body) of every request received.
+    """
+
+    def __init__(self):
+        self.requests: list[tuple[str, str, dict | None]] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def paths(self, method: str) -> list[str]:
+        return [path for m, path, _ in self.requests if m == method]
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _reply(self, method: str, path: str) -> dict:
+        if path == "/session":
+            return {"sessionId": "abc", "value": {"sessionId": "abc"}}
+        if path == "/screenshot":
+            return {"value": png_base64()}
+        if path == "/wda/activeAppInfo":
+            return {"value": {"bundleId": "com.apple.mobilesafari"}}
+        if path.endswith("/element/active"):
+            return {"value": {"ELEMENT": "field-1"}}
+        return {"value": None}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _answer(self, method: str):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                server.requests.append((method, self.path, body))
+                data = json.dumps(server._reply(method, self.path)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._answer("GET")
+
+            def do_POST(self):
+                self._answer("POST")
+
+        return Handler
+
+
+@pytest.fixture
+def wda():
+    server = FakeWDAServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture(autouse=True)
+def no_action_delays(monkeypatch):
+    for name in ("default_tap_delay", "default_swipe_delay", "default_home_delay"):
+        monkeypatch.setattr(TIMING_CONFIG.device, name, 0.0)
+
+
+def test_client_requests(wda):
+    async def scenario():
+        async with AsyncWDAClient(wda.url) as device:
+            assert await device.start_session() == "abc"
+            screenshot = await device.get_screenshot()
+            await device.tap(300, 600)
+            await device.swipe(0, 0, 300, 300)
+            await device.clear_text()
+            await device.type_text("hi")
+            return screenshot
+
+    screenshot = asyncio.run(scenario())
+
+    assert (screenshot.width, screenshot.height) == (90, 160)
+    posts = wda.paths("POST")
+    assert posts == [
+        "/session",
+        "/session/abc/actions",
+        "/session/abc/wda/dragfromtoforduration",
+        "/session/abc/element/field-1/clear",
+        "/session/abc/wda/keys",
+        "/wda/keyboard/dismiss",
+    ]
+    tap = wda.requests[2][2]["actions"][0]["actions"][0]
+    assert (tap["x"], tap["y"]) == (100, 200)  # Pixels to points
+    assert wda.requests[-2][2]["value"] == ["h", "i"]
+
+
+def test_async_agent_drives_ios(wda, mock_openai):
+    model = mock_openai()
+
+    async def scenario():
+        async with AsyncWDAClient(wda.url, session_id="abc") as device:
+            agent = AsyncPhoneAgent(
+                ModelConfig(base_url=model.base_url),
+                AgentConfig(max_steps=2, verbose=False),
+                device_factory=device,
+            )
+            result = await agent.run("Open Safari")
+            return result, agent
+
+    result, agent = asyncio.run(scenario())
+
+    assert result == "Max steps reached"
+    assert agent.step_count == 2
+    assert model.requests == 2
+    # Tap at [500, 500] of a 90x160 screenshot, in points
+    taps = [body for _, path, body in wda.requests if path == "/session/abc/actions"]
+    assert len(taps) == 2
+    move = taps[0]["actions"][0]["actions"][0]
+    assert (move["x"], move["y"]) == (15, pytest.approx(80 / 3))